@@ -55,7 +55,20 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def get_lock_timeout_ms() -> int | None:
+    # Caps how long any DDL waits for a lock (and so how long it can queue
+    # application traffic behind it). app.db.online retries on timeout.
+    value = os.getenv("MIGRATION_LOCK_TIMEOUT_MS")
+    return int(value) if value else None
+
+
 def do_run_migrations(connection: Connection) -> None:
+    lock_timeout_ms = get_lock_timeout_ms()
+    if lock_timeout_ms is not None:
+        connection.exec_driver_sql(f"SET lock_timeout = {lock_timeout_ms}")
+        # session-level; commit the autobegun transaction so alembic starts its own
+        connection.commit()
+
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
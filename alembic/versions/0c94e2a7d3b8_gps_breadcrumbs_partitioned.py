@@ -0,0 +1,69 @@
+"""gps_breadcrumbs (daily range partitions), truck_positions, ifta_dirty
+
+Revision ID: 0c94e2a7d3b8
+Revises: f1c7b8d24e65
+Create Date: 2026-10-19 18:02:17.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0c94e2a7d3b8"
+down_revision: Union[str, Sequence[str], None] = "f1c7b8d24e65"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Daily partitions are created on demand by app.core.eld_ingest.
+    # No FK to trucks: it would add a lookup per point on the ingest path;
+    # the ingest endpoint validates truck ids instead.
+    op.execute(
+        """
+        CREATE TABLE gps_breadcrumbs (
+            truck_id     integer          NOT NULL,
+            recorded_at  timestamptz      NOT NULL,
+            lat          double precision NOT NULL,
+            lon          double precision NOT NULL,
+            speed_kph    real,
+            odometer_km  double precision,
+            received_at  timestamptz      NOT NULL DEFAULT now(),
+            -- also the dedup key for retransmitted points
+            PRIMARY KEY (truck_id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+        """
+    )
+    # append-only, time-ordered: BRIN stays tiny and cheap to maintain
+    op.execute(
+        "CREATE INDEX ix_gps_breadcrumbs_recorded_at_brin ON gps_breadcrumbs "
+        "USING brin (recorded_at) WITH (pages_per_range = 32)"
+    )
+
+    op.create_table(
+        "truck_positions",
+        sa.Column("truck_id", sa.Integer(), primary_key=True),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("lat", sa.Float(), nullable=False),
+        sa.Column("lon", sa.Float(), nullable=False),
+        sa.Column("speed_kph", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    # truck-days whose IFTA mileage must be recomputed (late/new points)
+    op.create_table(
+        "ifta_dirty",
+        sa.Column("truck_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("marked_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("truck_id", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ifta_dirty")
+    op.drop_table("truck_positions")
+    op.execute("DROP TABLE gps_breadcrumbs")
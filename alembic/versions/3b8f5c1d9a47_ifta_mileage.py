@@ -0,0 +1,38 @@
+"""ifta_mileage: miles per truck, UTC day and jurisdiction
+
+Revision ID: 3b8f5c1d9a47
+Revises: 0c94e2a7d3b8
+Create Date: 2026-10-19 19:26:44.107285
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8f5c1d9a47"
+down_revision: Union[str, Sequence[str], None] = "0c94e2a7d3b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per day, so late points only recompute their own day; quarter
+    # totals are a SUM over the day range.
+    op.create_table(
+        "ifta_mileage",
+        sa.Column("truck_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("jurisdiction", sa.String(length=8), nullable=False),
+        sa.Column("miles", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("truck_id", "day", "jurisdiction"),
+    )
+    op.create_index("ix_ifta_mileage_day", "ifta_mileage", ["day"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ifta_mileage_day", table_name="ifta_mileage")
+    op.drop_table("ifta_mileage")
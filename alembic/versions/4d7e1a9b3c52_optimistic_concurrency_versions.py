@@ -0,0 +1,80 @@
+"""optimistic concurrency: version columns + driver date checks
+
+Revision ID: 4d7e1a9b3c52
+Revises: e8b4f02c6a19
+Create Date: 2026-10-19 11:41:09.562870
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4d7e1a9b3c52"
+down_revision: Union[str, Sequence[str], None] = "e8b4f02c6a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED = ("drivers", "driver_documents", "driver_document_files")
+
+# constraint -> rows it rejects
+DATE_CHECKS = {
+    "ck_drivers_termination_after_hire": "termination_date < hire_date",
+    "ck_drivers_terminated_inactive": "termination_date IS NOT NULL AND is_active",
+}
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    # constant default: metadata-only on PG11+, no table rewrite
+    for table in VERSIONED:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")))
+
+    # Cross-field rules from DriverCreate that PATCH used to re-check with an
+    # extra read; the DB now enforces them against the stored row. NOT VALID:
+    # only new writes are checked, no scan under the ACCESS EXCLUSIVE lock
+    # this transaction holds until it commits.
+    op.execute(
+        "ALTER TABLE drivers ADD CONSTRAINT ck_drivers_termination_after_hire "
+        "CHECK (termination_date IS NULL OR hire_date IS NULL OR termination_date >= hire_date) NOT VALID"
+    )
+    op.execute(
+        "ALTER TABLE drivers ADD CONSTRAINT ck_drivers_terminated_inactive "
+        "CHECK (termination_date IS NULL OR NOT is_active) NOT VALID"
+    )
+
+    # VALIDATE scans under SHARE UPDATE EXCLUSIVE only (writes continue), in
+    # its own transaction after the one above commits.
+    with op.get_context().autocommit_block():
+        for name, violation in DATE_CHECKS.items():
+            _validate_or_report(name, violation)
+
+
+def _validate_or_report(name: str, violation: str) -> None:
+    validate = f"ALTER TABLE drivers VALIDATE CONSTRAINT {name}"
+    if op.get_context().as_sql:
+        op.execute(validate)
+        return
+    # Existing violations are data for a person to fix (through the API, so
+    # versions, cascades and the audit log stay right), not for a migration:
+    # report them and leave the constraint NOT VALID; new writes are still
+    # checked.
+    bad = op.get_bind().execute(sa.text(f"SELECT id FROM drivers WHERE {violation} ORDER BY id")).scalars().all()
+    if bad:
+        logger.warning(
+            "%s left NOT VALID: %d driver(s) violate it (ids %s%s); fix them, then run %s",
+            name, len(bad), ", ".join(map(str, bad[:50])), ", ..." if len(bad) > 50 else "", validate,
+        )
+    else:
+        op.execute(validate)
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_drivers_terminated_inactive", "drivers", type_="check")
+    op.drop_constraint("ck_drivers_termination_after_hire", "drivers", type_="check")
+    for table in reversed(VERSIONED):
+        op.drop_column(table, "version")
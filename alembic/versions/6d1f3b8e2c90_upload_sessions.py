@@ -0,0 +1,74 @@
+"""upload_sessions / upload_chunks for resumable document uploads
+
+Revision ID: 6d1f3b8e2c90
+Revises: 8e2a4d6f0b13
+Create Date: 2026-10-19 21:26:52.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6d1f3b8e2c90"
+down_revision: Union[str, Sequence[str], None] = "8e2a4d6f0b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "upload_sessions",
+        sa.Column("id", sa.String(length=32), primary_key=True),
+        sa.Column(
+            "driver_document_id",
+            sa.Integer(),
+            sa.ForeignKey("driver_documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("original_filename", sa.String(length=255), nullable=True),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column("total_size", sa.BigInteger(), nullable=False),
+        sa.Column("expected_sha256", sa.String(length=64), nullable=True),
+        sa.Column("received_bytes", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="open"),
+        sa.Column(
+            "file_id",
+            sa.Integer(),
+            sa.ForeignKey("driver_document_files.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_upload_sessions_driver_document_id", "upload_sessions", ["driver_document_id"])
+    # expired-session purge
+    op.create_index(
+        "ix_upload_sessions_open_expires_at",
+        "upload_sessions",
+        ["expires_at"],
+        postgresql_where=sa.text("status = 'open'"),
+    )
+
+    op.create_table(
+        "upload_chunks",
+        sa.Column(
+            "upload_id",
+            sa.String(length=32),
+            sa.ForeignKey("upload_sessions.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("offset", sa.BigInteger(), primary_key=True),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("received_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("upload_chunks")
+    op.drop_index("ix_upload_sessions_open_expires_at", table_name="upload_sessions")
+    op.drop_index("ix_upload_sessions_driver_document_id", table_name="upload_sessions")
+    op.drop_table("upload_sessions")
@@ -0,0 +1,29 @@
+"""driver document files: deactivated_at / deactivated_reason
+
+Revision ID: 7f2c6d4e8a31
+Revises: 4d7e1a9b3c52
+Create Date: 2026-10-19 13:05:51.774026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7f2c6d4e8a31"
+down_revision: Union[str, Sequence[str], None] = "4d7e1a9b3c52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same soft-deactivate pattern as driver_phones / driver_documents
+    op.add_column("driver_document_files", sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("driver_document_files", sa.Column("deactivated_reason", sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("driver_document_files", "deactivated_reason")
+    op.drop_column("driver_document_files", "deactivated_at")
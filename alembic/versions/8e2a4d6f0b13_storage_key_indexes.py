@@ -0,0 +1,50 @@
+"""storage_key indexes for the storage scrubber's orphan check
+
+Revision ID: 8e2a4d6f0b13
+Revises: 3b8f5c1d9a47
+Create Date: 2026-10-19 20:41:05.338120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2a4d6f0b13"
+down_revision: Union[str, Sequence[str], None] = "3b8f5c1d9a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY: driver_document_files takes uploads all day
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_driver_document_files_storage_key",
+            "driver_document_files",
+            ["storage_key"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_archived_driver_document_files_storage_key",
+            "archived_driver_document_files",
+            ["storage_key"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_archived_driver_document_files_storage_key",
+            table_name="archived_driver_document_files",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_driver_document_files_storage_key",
+            table_name="driver_document_files",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""audit_log for driver/phone/document changes
+
+Revision ID: 9a3c5e7f1b24
+Revises: 6d1f3b8e2c90
+Create Date: 2026-10-19 23:02:15.381944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a3c5e7f1b24"
+down_revision: Union[str, Sequence[str], None] = "6d1f3b8e2c90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("entity", sa.String(length=40), nullable=False),
+        sa.Column("entity_id", sa.BigInteger(), nullable=False),
+        sa.Column("action", sa.String(length=20), nullable=False),
+        sa.Column("before", postgresql.JSONB(), nullable=True),
+        sa.Column("after", postgresql.JSONB(), nullable=True),
+        sa.Column("actor", sa.String(length=100), nullable=True),
+    )
+    # history of one entity, newest first
+    op.create_index("ix_audit_log_entity", "audit_log", ["entity", "entity_id", "id"])
+    # time-window queries across entities
+    op.create_index("ix_audit_log_occurred_at", "audit_log", ["occurred_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_log_occurred_at", table_name="audit_log")
+    op.drop_index("ix_audit_log_entity", table_name="audit_log")
+    op.drop_table("audit_log")
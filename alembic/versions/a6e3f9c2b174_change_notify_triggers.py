@@ -0,0 +1,84 @@
+"""NOTIFY erp_changes on driver table writes (SSE push)
+
+Revision ID: a6e3f9c2b174
+Revises: d5a8c3f1e7b2
+Create Date: 2026-10-19 16:31:08.219553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6e3f9c2b174"
+down_revision: Union[str, Sequence[str], None] = "d5a8c3f1e7b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> entity name used by /changes and /events
+FEED_TABLES = {
+    "drivers": "driver",
+    "driver_phones": "driver_phone",
+    "driver_documents": "driver_document",
+    "driver_document_files": "driver_document_file",
+}
+
+
+def upgrade() -> None:
+    # Small payload (NOTIFY caps at 8000 bytes); clients fetch rows via the API.
+    # Delivered only on COMMIT, so listeners never see rolled-back writes.
+    op.execute(
+        """
+        CREATE FUNCTION notify_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            v_op text;
+            v_driver_id bigint;
+            v_doc_type text;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                v_op := 'created';
+            ELSIF OLD.is_active AND NOT NEW.is_active THEN
+                v_op := 'deactivated';
+            ELSE
+                v_op := 'updated';
+            END IF;
+
+            IF TG_ARGV[0] = 'driver' THEN
+                v_driver_id := NEW.id;
+            ELSIF TG_ARGV[0] = 'driver_phone' THEN
+                v_driver_id := NEW.driver_id;
+            ELSIF TG_ARGV[0] = 'driver_document' THEN
+                v_driver_id := NEW.driver_id;
+                v_doc_type := NEW.doc_type;
+            ELSE
+                SELECT d.driver_id, d.doc_type INTO v_driver_id, v_doc_type
+                FROM driver_documents d WHERE d.id = NEW.driver_document_id;
+            END IF;
+
+            -- channel: app.core.events.CHANNEL
+            PERFORM pg_notify('erp_changes', json_build_object(
+                'entity', TG_ARGV[0],
+                'op', v_op,
+                'id', NEW.id,
+                'driver_id', v_driver_id,
+                'doc_type', v_doc_type,
+                'key', NEW.change_xid || '.' || NEW.change_seq,
+                'schema', TG_TABLE_SCHEMA
+            )::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, entity in FEED_TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_notify AFTER INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION notify_change('{entity}')"
+        )
+
+
+def downgrade() -> None:
+    for table in FEED_TABLES:
+        op.execute(f"DROP TRIGGER trg_{table}_notify ON {table}")
+    op.execute("DROP FUNCTION notify_change()")
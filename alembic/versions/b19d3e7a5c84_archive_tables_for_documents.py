@@ -0,0 +1,87 @@
+"""archive tables for inactive driver documents and files
+
+Revision ID: b19d3e7a5c84
+Revises: 7f2c6d4e8a31
+Create Date: 2026-10-19 14:22:36.118094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b19d3e7a5c84"
+down_revision: Union[str, Sequence[str], None] = "7f2c6d4e8a31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_driver_documents",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("driver_id", sa.Integer(), nullable=False),
+        sa.Column("doc_type", sa.String(length=50), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=True),
+        sa.Column("issue_date", sa.Date(), nullable=True),
+        sa.Column("expiry_date", sa.Date(), nullable=True),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("is_current", sa.Boolean(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("deactivated_reason", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_archived_driver_documents_driver_id", "archived_driver_documents", ["driver_id"])
+
+    op.create_table(
+        "archived_driver_document_files",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("driver_document_id", sa.Integer(), nullable=False),
+        sa.Column("storage_key", sa.String(length=1024), nullable=False),
+        sa.Column("original_filename", sa.String(length=255), nullable=True),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column("file_size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("sha256", sa.String(length=64), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("deactivated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("deactivated_reason", sa.String(length=255), nullable=True),
+        sa.Column("uploaded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_archived_driver_document_files_driver_document_id",
+        "archived_driver_document_files",
+        ["driver_document_id"],
+    )
+
+    # Small partial indexes the archiver walks (inactive rows only), so a
+    # batch never scans the active majority
+    op.create_index(
+        "ix_driver_documents_inactive_id",
+        "driver_documents",
+        ["id"],
+        postgresql_where=sa.text("NOT is_active"),
+    )
+    op.create_index(
+        "ix_driver_document_files_inactive_id",
+        "driver_document_files",
+        ["id"],
+        postgresql_where=sa.text("NOT is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_driver_document_files_inactive_id", table_name="driver_document_files")
+    op.drop_index("ix_driver_documents_inactive_id", table_name="driver_documents")
+    op.drop_index("ix_archived_driver_document_files_driver_document_id", table_name="archived_driver_document_files")
+    op.drop_table("archived_driver_document_files")
+    op.drop_index("ix_archived_driver_documents_driver_id", table_name="archived_driver_documents")
+    op.drop_table("archived_driver_documents")
@@ -0,0 +1,61 @@
+"""document_reminders / reminder_watermarks for the expiry reminder scheduler
+
+Revision ID: b7e2d4f6a813
+Revises: 9a3c5e7f1b24
+Create Date: 2026-10-19 23:48:37.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d4f6a813"
+down_revision: Union[str, Sequence[str], None] = "9a3c5e7f1b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_reminders",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column(
+            "driver_document_id",
+            sa.Integer(),
+            sa.ForeignKey("driver_documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("tier", sa.SmallInteger(), nullable=False),
+        sa.Column("expiry_date", sa.Date(), nullable=False),
+        sa.Column("days_left", sa.Integer(), nullable=False),
+        sa.Column("sink", sa.String(length=20), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("driver_document_id", "tier", "expiry_date", name="uq_document_reminders_doc_tier_expiry"),
+    )
+
+    op.create_table(
+        "reminder_watermarks",
+        sa.Column("name", sa.String(length=20), primary_key=True),
+        sa.Column("through_date", sa.Date(), nullable=True),
+        sa.Column("cursor", sa.String(length=64), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    # driver_documents is large and busy: build without blocking writes
+    online.create_index_concurrently(
+        "ix_driver_documents_expiry_open",
+        "driver_documents",
+        ["expiry_date", "id"],
+        postgresql_where=sa.text("is_active AND is_current AND expiry_date IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    online.drop_index_concurrently("ix_driver_documents_expiry_open", "driver_documents")
+    op.drop_table("reminder_watermarks")
+    op.drop_table("document_reminders")
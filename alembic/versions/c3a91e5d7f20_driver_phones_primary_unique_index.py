@@ -0,0 +1,62 @@
+"""driver phones: one active primary per driver
+
+Revision ID: c3a91e5d7f20
+Revises: 5b013e5ac73d
+Create Date: 2026-10-19 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a91e5d7f20"
+down_revision: Union[str, Sequence[str], None] = "5b013e5ac73d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # The name is still held by the index on the renamed pre-7de1d90c39eb table
+    owner = bind.execute(
+        sa.text(
+            "SELECT tablename FROM pg_indexes "
+            "WHERE schemaname = 'public' AND indexname = 'ux_driver_primary_phone'"
+        )
+    ).scalar()
+    if owner == "driver_phones_old":
+        op.execute("ALTER INDEX ux_driver_primary_phone RENAME TO ux_driver_primary_phone_old")
+
+    # Keep the lowest id as primary where a driver has several active primaries
+    op.execute(
+        """
+        UPDATE driver_phones p
+        SET is_primary = false
+        WHERE p.is_primary AND p.is_active
+          AND EXISTS (
+            SELECT 1 FROM driver_phones q
+            WHERE q.driver_id = p.driver_id AND q.is_primary AND q.is_active AND q.id < p.id
+          )
+        """
+    )
+
+    op.create_index(
+        "ux_driver_primary_phone",
+        "driver_phones",
+        ["driver_id"],
+        unique=True,
+        postgresql_where=sa.text("is_primary AND is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_driver_primary_phone", table_name="driver_phones")
+
+    bind = op.get_bind()
+    old = bind.execute(sa.text("SELECT to_regclass('public.ux_driver_primary_phone_old')")).scalar()
+    if old:
+        op.execute("ALTER INDEX ux_driver_primary_phone_old RENAME TO ux_driver_primary_phone")
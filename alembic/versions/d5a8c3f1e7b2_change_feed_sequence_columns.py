@@ -0,0 +1,102 @@
+"""change feed: change_xid/change_seq on driver tables
+
+Revision ID: d5a8c3f1e7b2
+Revises: b19d3e7a5c84
+Create Date: 2026-10-19 15:47:12.604381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a8c3f1e7b2"
+down_revision: Union[str, Sequence[str], None] = "b19d3e7a5c84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEED_TABLES = ("drivers", "driver_phones", "driver_documents", "driver_document_files")
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE change_seq")
+
+    # change_xid: writing transaction (orders commits safely, see app.core.changes)
+    # change_seq: total order within a transaction
+    op.execute(
+        """
+        CREATE FUNCTION set_change_seq() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            NEW.change_seq := nextval('change_seq');
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+
+    # nullable, no default: metadata-only; the triggers fill every new write
+    for table in FEED_TABLES:
+        op.add_column(table, sa.Column("change_xid", sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column("change_seq", sa.BigInteger(), nullable=True))
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_change_seq BEFORE INSERT OR UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION set_change_seq()"
+        )
+
+    # Existing rows, outside the migration transaction so these busy tables
+    # never sit under a long row or ACCESS EXCLUSIVE lock: committed batches
+    # through the trigger, SET NOT NULL behind a validated NOT VALID check
+    # (its scan skipped, PostgreSQL 12+), indexes built CONCURRENTLY.
+    with op.get_context().autocommit_block():
+        for table in FEED_TABLES:
+            _backfill(table)
+            check = f"ck_{table}_change_not_null"
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {check} "
+                "CHECK (change_xid IS NOT NULL AND change_seq IS NOT NULL) NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN change_xid SET NOT NULL, ALTER COLUMN change_seq SET NOT NULL")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {check}")
+            # INCLUDE (id): the feed's key scan is index-only
+            op.create_index(
+                f"ix_{table}_change",
+                table,
+                ["change_xid", "change_seq"],
+                postgresql_include=["id"],
+                postgresql_concurrently=True,
+            )
+
+
+def _backfill(table: str, batch_size: int = 5000) -> None:
+    # the trigger assigns both columns on any UPDATE
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} SET change_seq = NULL WHERE change_seq IS NULL")
+        return
+    stmt = sa.text(
+        f"""
+        UPDATE {table} SET change_seq = NULL
+        WHERE id IN (
+            SELECT id FROM {table} WHERE change_seq IS NULL AND id > :after ORDER BY id LIMIT :limit
+        )
+        RETURNING id
+        """
+    )
+    bind = op.get_bind()
+    after = bind.execute(sa.text(f"SELECT min(id) - 1 FROM {table} WHERE change_seq IS NULL")).scalar()
+    while after is not None:
+        ids = bind.execute(stmt, {"after": after, "limit": batch_size}).scalars().all()
+        after = max(ids) if ids else None
+
+
+def downgrade() -> None:
+    for table in reversed(FEED_TABLES):
+        op.drop_index(f"ix_{table}_change", table_name=table)
+        op.execute(f"DROP TRIGGER trg_{table}_change_seq ON {table}")
+        op.drop_column(table, "change_seq")
+        op.drop_column(table, "change_xid")
+    op.execute("DROP FUNCTION set_change_seq()")
+    op.execute("DROP SEQUENCE change_seq")
@@ -0,0 +1,87 @@
+"""notify_change: flag writes that affect the phone lookup map
+
+Revision ID: e4c1a7d9b352
+Revises: b7e2d4f6a813
+Create Date: 2026-10-20 09:12:44.318027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4c1a7d9b352"
+down_revision: Union[str, Sequence[str], None] = "b7e2d4f6a813"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same function as a6e3f9c2b174, plus 'lookup' in the payload: true when the
+# write can change what app.core.phone_lookup serves (a new row, or a
+# driver's phone/name/is_active, or a driver_phone's phone/label/is_active/
+# driver_id). Version bumps, status edits and document writes are false, so
+# workers keep their map.
+FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    v_op text;
+    v_driver_id bigint;
+    v_doc_type text;{declare}
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_op := 'created';
+    ELSIF OLD.is_active AND NOT NEW.is_active THEN
+        v_op := 'deactivated';
+    ELSE
+        v_op := 'updated';
+    END IF;
+
+    IF TG_ARGV[0] = 'driver' THEN
+        v_driver_id := NEW.id;
+    ELSIF TG_ARGV[0] = 'driver_phone' THEN
+        v_driver_id := NEW.driver_id;
+    ELSIF TG_ARGV[0] = 'driver_document' THEN
+        v_driver_id := NEW.driver_id;
+        v_doc_type := NEW.doc_type;
+    ELSE
+        SELECT d.driver_id, d.doc_type INTO v_driver_id, v_doc_type
+        FROM driver_documents d WHERE d.id = NEW.driver_document_id;
+    END IF;
+{lookup}
+    -- channel: app.core.events.CHANNEL
+    PERFORM pg_notify('erp_changes', json_build_object(
+        'entity', TG_ARGV[0],
+        'op', v_op,
+        'id', NEW.id,
+        'driver_id', v_driver_id,
+        'doc_type', v_doc_type,
+        'key', NEW.change_xid || '.' || NEW.change_seq,
+        'schema', TG_TABLE_SCHEMA{field}
+    )::text);
+    RETURN NULL;
+END
+$$
+"""
+
+LOOKUP = """
+    IF TG_ARGV[0] NOT IN ('driver', 'driver_phone') THEN
+        v_lookup := false;
+    ELSIF TG_OP = 'INSERT' THEN
+        v_lookup := true;
+    ELSIF TG_ARGV[0] = 'driver' THEN
+        v_lookup := (NEW.phone, NEW.first_name, NEW.last_name, NEW.is_active)
+            IS DISTINCT FROM (OLD.phone, OLD.first_name, OLD.last_name, OLD.is_active);
+    ELSE
+        v_lookup := (NEW.phone, NEW.label, NEW.is_active, NEW.driver_id)
+            IS DISTINCT FROM (OLD.phone, OLD.label, OLD.is_active, OLD.driver_id);
+    END IF;
+"""
+
+
+def upgrade() -> None:
+    # OR REPLACE keeps the function's oid; the existing triggers pick it up
+    op.execute(FUNCTION.format(declare="\n    v_lookup boolean;", lookup=LOOKUP, field=",\n        'lookup', v_lookup"))
+
+
+def downgrade() -> None:
+    op.execute(FUNCTION.format(declare="", lookup="", field=""))
@@ -0,0 +1,33 @@
+"""reverse phone lookup: indexes over normalized digits
+
+Revision ID: e8b4f02c6a19
+Revises: c3a91e5d7f20
+Create Date: 2026-10-19 10:03:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b4f02c6a19"
+down_revision: Union[str, Sequence[str], None] = "c3a91e5d7f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay byte-identical to app.core.phone_lookup.digits_reversed() so the
+# planner matches the expression. Reversed so "ends with" becomes a prefix
+# range scan; text_pattern_ops makes it collation-independent.
+DIGITS_REV = "reverse(regexp_replace(phone, '[^0-9]', '', 'g')) text_pattern_ops"
+
+
+def upgrade() -> None:
+    op.execute(f"CREATE INDEX ix_drivers_phone_digits_rev ON drivers ({DIGITS_REV}) WHERE phone IS NOT NULL")
+    op.execute(f"CREATE INDEX ix_driver_phones_phone_digits_rev ON driver_phones ({DIGITS_REV}) WHERE is_active")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_driver_phones_phone_digits_rev", table_name="driver_phones")
+    op.drop_index("ix_drivers_phone_digits_rev", table_name="drivers")
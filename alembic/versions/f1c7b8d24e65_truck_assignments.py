@@ -0,0 +1,77 @@
+"""truck_assignments: tstzrange periods with no-overlap exclusion
+
+Revision ID: f1c7b8d24e65
+Revises: a6e3f9c2b174
+Create Date: 2026-10-19 17:12:40.881306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c7b8d24e65"
+down_revision: Union[str, Sequence[str], None] = "a6e3f9c2b174"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# set on trucks when this revision created it, so downgrade drops only that
+CREATED_MARKER = "created by revision f1c7b8d24e65"
+
+
+def upgrade() -> None:
+    # app.models.truck.Truck was never migrated; create it where missing
+    if not sa.inspect(op.get_bind()).has_table("trucks"):
+        op.create_table(
+            "trucks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("plate_number", sa.String(length=50), nullable=False),
+            sa.Column("model", sa.String(length=100), nullable=False),
+            sa.Column("driver_name", sa.String(length=200), nullable=True),
+        )
+        op.create_index("ix_trucks_plate_number", "trucks", ["plate_number"], unique=True)
+        op.execute(f"COMMENT ON TABLE trucks IS '{CREATED_MARKER}'")
+
+    # "=" on integers inside a GiST exclusion constraint
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.create_table(
+        "truck_assignments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("truck_id", sa.Integer(), sa.ForeignKey("trucks.id"), nullable=False),
+        sa.Column("driver_id", sa.Integer(), sa.ForeignKey("drivers.id"), nullable=False),
+        sa.Column("period", postgresql.TSTZRANGE(), nullable=False),
+        sa.Column("note", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.CheckConstraint("NOT isempty(period) AND NOT lower_inf(period)", name="ck_truck_assignments_period"),
+    )
+    # The exclusion constraints' GiST indexes also serve the point-in-time
+    # lookups: truck_id = :id AND period @> :at (and the same for driver_id).
+    op.execute(
+        "ALTER TABLE truck_assignments ADD CONSTRAINT ex_truck_assignments_truck "
+        "EXCLUDE USING gist (truck_id WITH =, period WITH &&)"
+    )
+    op.execute(
+        "ALTER TABLE truck_assignments ADD CONSTRAINT ex_truck_assignments_driver "
+        "EXCLUDE USING gist (driver_id WITH =, period WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("truck_assignments")
+    # a trucks table that predates this revision stays; one it created goes
+    # (its index with it). Plain SQL so offline scripts get it too.
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF obj_description(to_regclass('trucks'), 'pg_class') = '{CREATED_MARKER}' THEN
+                DROP TABLE trucks;
+            END IF;
+        END
+        $$
+        """
+    )
@@ -0,0 +1,238 @@
+"""Audit log of changes to drivers, phones, documents and document files.
+
+ORM changes are captured from the session: after each flush (history is
+still intact then, and new rows have their ids) every audited object in
+session.new/dirty/deleted becomes one record holding only the columns that
+changed. Set-based UPDATE/INSERT ... RETURNING statements bypass the unit
+of work, so the handlers that issue them call record() with what they know.
+
+Records wait on the session until the transaction ends:
+
+- async mode (settings.audit_mode, default): on commit they are handed to
+  an in-process buffer, which a flusher task writes with multi-row INSERTs
+  every settings.audit_flush_interval_ms or as soon as
+  settings.audit_flush_batch_records are waiting. Rolled-back changes are
+  never written. A clean shutdown writes what is buffered; records still
+  buffered when a worker dies are lost, and past
+  settings.audit_buffer_max_records new ones are dropped (logged).
+- sync mode: they are inserted in the same transaction just before it
+  commits, so the change and its audit row stand or fall together.
+
+Sessions outside the API process (jobs, scripts), where the flusher is not
+running, always write in sync mode.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.core.config import settings
+from app.core.database import RoutingSession, engine
+from app.core.flusher import BackgroundFlusher
+from app.core.tenancy import current_tenant_schema
+from app.models.audit_log import AuditLog
+from app.models.driver import Driver
+from app.models.driver_document import DriverDocument
+from app.models.driver_document_file import DriverDocumentFile
+from app.models.driver_phone import DriverPhone
+
+logger = logging.getLogger(__name__)
+
+AUDITED = {
+    Driver: "driver",
+    DriverPhone: "driver_phone",
+    DriverDocument: "driver_document",
+    DriverDocumentFile: "driver_document_file",
+}
+# maintained by triggers; noise in a diff
+_IGNORED = {"change_xid", "change_seq"}
+
+_PENDING = "audit_pending"
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _values(values: dict | None) -> dict | None:
+    if values is None:
+        return None
+    return {k: _jsonable(v) for k, v in values.items() if k not in _IGNORED and not isinstance(v, ClauseElement)}
+
+
+def snapshot(obj) -> dict:
+    """Loaded column values of an ORM object."""
+    # loaded values only; touching an expired attribute would emit SQL mid-flush
+    state = inspect(obj)
+    return {a.key: state.dict[a.key] for a in state.mapper.column_attrs if a.key in state.dict}
+
+
+def _diff(state) -> tuple[dict, dict]:
+    before, after = {}, {}
+    for a in state.mapper.column_attrs:
+        if a.key in _IGNORED:
+            continue
+        hist = state.attrs[a.key].history
+        if hist.added and isinstance(hist.added[0], ClauseElement):
+            continue  # SQL expression (e.g. version + 1); the value is only known after the UPDATE
+        if not hist.has_changes():
+            continue
+        before[a.key] = hist.deleted[0] if hist.deleted else None
+        after[a.key] = hist.added[0] if hist.added else None
+    return before, after
+
+
+def change_action(before: dict, after: dict) -> str:
+    if "is_active" in after and before.get("is_active") != after["is_active"]:
+        return "reactivate" if after["is_active"] else "deactivate"
+    return "update"
+
+
+def record(
+    session,
+    entity: str,
+    entity_id: int,
+    action: str,
+    after: dict | None = None,
+    before: dict | None = None,
+) -> None:
+    """Queue one record on `session` (sync or async); written when it commits."""
+    if not settings.audit_enabled:
+        return
+    after, before = _values(after), _values(before)
+    session.info.setdefault(_PENDING, []).append(
+        {
+            "occurred_at": datetime.now(timezone.utc),
+            "entity": entity,
+            "entity_id": entity_id,
+            "action": action,
+            "before": before or None,
+            "after": after or None,
+            "actor": session.info.get("actor"),
+        }
+    )
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _capture(session, flush_context):
+    if not settings.audit_enabled:
+        return
+    for obj in session.new:
+        entity = AUDITED.get(type(obj))
+        if entity is not None:
+            record(session, entity, obj.id, "create", after=snapshot(obj))
+    for obj in session.dirty:
+        entity = AUDITED.get(type(obj))
+        if entity is None or not session.is_modified(obj, include_collections=False):
+            continue
+        before, after = _diff(inspect(obj))
+        if after:
+            record(session, entity, obj.id, change_action(before, after), after=after, before=before)
+    for obj in session.deleted:
+        entity = AUDITED.get(type(obj))
+        if entity is not None:
+            record(session, entity, obj.id, "delete", before=snapshot(obj))
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _write_in_transaction(session):
+    if not settings.audit_enabled or not _synchronous():
+        return
+    session.flush()  # commit would flush next anyway; capture those changes first
+    rows = session.info.pop(_PENDING, None)
+    if rows:
+        session.connection().execute(insert(AuditLog.__table__), rows)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _hand_to_writer(session):
+    rows = session.info.pop(_PENDING, None)
+    if rows and not audit_writer.offer(current_tenant_schema(), rows):
+        logger.error("audit buffer full; %d record(s) dropped", len(rows))
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING, None)
+
+
+def _synchronous() -> bool:
+    return settings.audit_mode == "sync" or not audit_writer.running
+
+
+class AuditWriter:
+    def __init__(self):
+        self._pending: dict[str | None, list[dict]] = defaultdict(list)
+        self._size = 0
+        self._flusher = BackgroundFlusher(
+            "audit buffer", self.flush, lambda: self._size, settings.audit_flush_interval_ms / 1000
+        )
+        self.stats = {"accepted": 0, "written": 0, "dropped": 0, "flush_failures": 0, "buffered": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._flusher.running
+
+    def offer(self, tenant: str | None, rows: list[dict]) -> bool:
+        """Queue rows for the flusher; False (rows dropped) when the buffer is full."""
+        if self._size + len(rows) > settings.audit_buffer_max_records:
+            self.stats["dropped"] += len(rows)
+            return False
+        self._pending[tenant].extend(rows)
+        self._size += len(rows)
+        self.stats["accepted"] += len(rows)
+        self.stats["buffered"] = self._size
+        if self._size >= settings.audit_flush_batch_records:
+            self._flusher.wake()
+        return True
+
+    async def flush(self) -> bool:
+        """Write everything buffered; False if any batch failed (and was requeued)."""
+        ok = True
+        pending, self._pending = self._pending, defaultdict(list)
+        self._size = 0
+        batch = settings.audit_flush_batch_records
+        for tenant, rows in pending.items():
+            for i in range(0, len(rows), batch):
+                chunk = rows[i:i + batch]
+                try:
+                    await self._write(tenant, chunk)
+                except Exception:
+                    ok = False
+                    self.stats["flush_failures"] += 1
+                    logger.warning("audit flush failed (%d records)", len(chunk), exc_info=True)
+                    if self.offer(tenant, chunk):
+                        self.stats["accepted"] -= len(chunk)
+                    else:
+                        logger.error("audit buffer full; %d record(s) dropped", len(chunk))
+        self.stats["buffered"] = self._size
+        return ok
+
+    async def _write(self, tenant: str | None, rows: list[dict]) -> None:
+        async with engine.connect() as conn:
+            async with conn.begin():
+                if tenant is not None:
+                    await conn.exec_driver_sql(f'SET LOCAL search_path TO "{tenant}"')
+                # executemany -> batched multi-row INSERT ... VALUES
+                await conn.execute(insert(AuditLog.__table__), rows)
+        self.stats["written"] += len(rows)
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    async def stop(self) -> None:
+        """Finish the flush in progress, then write what is still buffered."""
+        await self._flusher.stop()
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,32 @@
+"""ETag / If-Match helpers for version-column optimistic concurrency."""
+
+from __future__ import annotations
+
+from fastapi import HTTPException
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(value: str | None) -> set[int] | None:
+    """Versions the client accepts; None means "no precondition" (absent or *)."""
+    if value is None or value.strip() == "*":
+        return None
+    versions: set[int] = set()
+    for tag in value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if not tag.isdigit():
+            raise HTTPException(status_code=400, detail="If-Match must be an ETag returned by this API")
+        versions.add(int(tag))
+    return versions
+
+
+def precondition_failed(what: str) -> HTTPException:
+    return HTTPException(
+        status_code=412,
+        detail=f"{what} was modified by someone else; reload and retry",
+    )
@@ -7,6 +7,151 @@ class Settings(BaseSettings):
     # Canonical DB URL (loaded from .env as DATABASE_URL)
     database_url: str
 
+    # Optional streaming replica for read-only handlers (REPLICA_DATABASE_URL).
+    # Unset = everything goes to the primary.
+    replica_database_url: str | None = None
+    # Replica is skipped once replay lag goes past this many seconds
+    replica_max_lag_seconds: float = 5.0
+    # How long a replica status probe is reused before re-checking
+    replica_status_ttl_seconds: float = 1.0
+    # How long a client keeps its commit LSN cookie after a write
+    read_your_writes_seconds: int = 10
+
+    # Schema-per-tenant (blueprint phase 3). Off = single schema (public).
+    tenancy_enabled: bool = False
+    tenant_header: str = "X-Tenant"
+    # e.g. "erp.example.com" -> acme.erp.example.com resolves tenant "acme"
+    tenant_base_domain: str | None = None
+    tenant_schema_prefix: str = "tenant_"
+    # Existing tenant schemas are cached per worker; an unknown slug reloads
+    # the list at most this often, so a new tenant is reachable within it
+    tenant_list_cache_seconds: float = 10.0
+
+    # In-memory reverse phone map (GET /drivers/by-phone); rebuilt after
+    # phone changes in any worker (change events), and at the latest after
+    # this many seconds in case events were missed
+    phone_lookup_ttl_seconds: int = 300
+    # minimum gap between reloads of a tenant's lookup map
+    phone_lookup_rebuild_min_seconds: float = 5.0
+
+    # Archiver for inactive driver documents/files (app.jobs.archive_documents)
+    archive_after_days: int = 180
+    archive_batch_size: int = 500
+    archive_batch_sleep_seconds: float = 0.5
+    archive_lock_timeout_ms: int = 2000
+
+    # Server-sent events (GET /events), fed by one LISTEN connection per worker
+    # Buffered events per subscriber; a client that falls this far behind is
+    # disconnected and resumes via Last-Event-ID
+    events_queue_size: int = 256
+    # Recent events kept per worker for Last-Event-ID resume
+    events_replay_size: int = 5000
+    events_heartbeat_seconds: float = 15.0
+
+    # ELD breadcrumb ingestion (POST /eld/breadcrumbs, app.core.eld_ingest)
+    eld_flush_interval_ms: int = 500
+    eld_flush_batch_points: int = 5000
+    # beyond this many unflushed points the endpoint answers 503
+    eld_buffer_max_points: int = 200_000
+    # request body limit, after decompression
+    eld_max_body_bytes: int = 20 * 1024 * 1024
+    eld_max_point_age_days: int = 90
+    eld_truck_cache_seconds: int = 60
+
+    # IFTA mileage (app.jobs.ifta_mileage). GeoJSON FeatureCollection of
+    # state/province polygons; each feature's jurisdiction code is read from
+    # ifta_code_property.
+    ifta_boundaries_path: str | None = None
+    ifta_code_property: str = "code"
+    ifta_grid_degrees: float = 0.25
+    ifta_workers: int = 4
+    ifta_chunk_points: int = 100_000
+    # segments faster than this are GPS jumps and are not counted
+    ifta_max_speed_mph: float = 110.0
+
+    # Nearest-driver index (GET /dispatch/nearest-drivers, app.core.dispatch)
+    dispatch_cell_degrees: float = 0.5
+    # eligibility (assignments, active drivers, documents) re-read interval
+    dispatch_refresh_seconds: int = 30
+    # trucks without a position this recent are not offered
+    dispatch_max_position_age_minutes: int = 120
+
+    # Storage scrubber (app.jobs.storage_scrub)
+    scrub_checkpoint_path: str = "storage_scrub_checkpoint.json"
+    scrub_report_path: str = "storage_scrub_report.json"
+    scrub_workers: int = 4
+    # read budget shared by all hashing threads
+    scrub_max_mb_per_second: float = 50.0
+    scrub_orphan_min_age_hours: float = 24.0
+
+    # Multi-file POST /driver-documents/{id}/files/batch
+    upload_max_files_per_request: int = 20
+    # files copied and hashed at once per request
+    upload_parallelism: int = 4
+
+    # Resumable uploads (app.routers.uploads)
+    upload_max_chunk_bytes: int = 16 * 1024 * 1024
+    # per file, resumable or multi-file
+    upload_max_bytes: int = 512 * 1024 * 1024
+    # open sessions are purged this long after creation
+    upload_session_ttl_hours: int = 24
+    # per-worker incremental hashers kept in memory (LRU)
+    upload_max_hashers: int = 1000
+
+    # Rate limiting / load shedding (app.core.load_shedding), per worker
+    load_shedding_enabled: bool = True
+    rate_limit_key_header: str = "X-API-Key"
+    rate_limit_per_second: float = 50.0
+    rate_limit_burst: float = 100.0
+    # per-client rates, keyed "key:<api key>" or "ip:<address>"
+    rate_limit_overrides: dict[str, float] = {}
+    # API keys that get a bucket of their own (keys in rate_limit_overrides
+    # count too); requests with any other key are limited by address
+    rate_limit_api_keys: list[str] = []
+    # buckets kept per worker; the least recently seen client is evicted
+    rate_limit_max_clients: int = 10000
+    # in-flight requests per route class
+    concurrency_limits: dict[str, int] = {
+        "critical": 64, "default": 32, "ingest": 16, "export": 4, "import": 8, "search": 16,
+    }
+    # longest a request waits for a slot before it is shed; 0 = shed at once
+    queue_budget_ms: dict[str, int] = {"critical": 2000, "default": 500, "ingest": 250}
+    shed_retry_after_seconds: int = 2
+
+    # Audit log (app.core.audit). "async": committed changes are buffered and
+    # written in batches (lost if the worker dies before a flush); "sync":
+    # written in the same transaction as the change.
+    audit_enabled: bool = True
+    audit_mode: str = "async"
+    audit_flush_interval_ms: int = 1000
+    audit_flush_batch_records: int = 1000
+    # beyond this many unwritten records new ones are dropped (and logged)
+    audit_buffer_max_records: int = 100_000
+    # recorded as the actor of a change, when the client sends it
+    audit_actor_header: str = "X-Actor"
+
+    # Document expiry reminders (app.core.reminders, app.jobs.expiry_reminders)
+    expiry_reminders_enabled: bool = True
+    # days before expiry_date; 0 = on/after the expiry date
+    expiry_reminder_tiers: list[int] = [60, 30, 7, 0]
+    # daily in-process run at this UTC hour (every worker tries; one wins the lock)
+    expiry_reminder_hour_utc: int = 6
+    expiry_reminder_batch_size: int = 1000
+    # first run only: documents that expired longer ago than this are not reminded
+    expiry_reminder_lookback_days: int = 7
+    # log | email | webhook
+    expiry_reminder_sink: str = "log"
+    expiry_reminder_email_to: str | None = None
+    expiry_reminder_webhook_url: str | None = None
+    expiry_reminder_webhook_timeout_seconds: float = 10.0
+
+    # X-Total-Count on list endpoints (?count=exact|estimated|cached)
+    # cached: exact counts reused per tenant + filter for this long
+    total_count_cache_seconds: int = 30
+    total_count_cache_size: int = 1024
+    # estimated: below this many rows the exact count is cheap, so it is used
+    total_count_exact_below: int = 1000
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
@@ -0,0 +1,122 @@
+"""Total row counts for list endpoints (X-Total-Count).
+
+`SELECT count(*)` visits every matching row, which on a large table is a
+full scan per page view. Clients pick what they can live with:
+
+- exact: count(*) of the filtered query.
+- estimated: the planner's row estimate for the filtered query
+  (EXPLAIN, nothing is executed), or pg_class.reltuples when there is no
+  filter. Estimates below settings.total_count_exact_below are replaced by
+  an exact count, which is cheap at that size. Tables never analysed have
+  no reltuples and fall back to the planner.
+- cached: an exact count reused for settings.total_count_cache_seconds per
+  tenant and filter (this worker only).
+
+The mode that actually produced the number is returned with it
+(X-Total-Count-Mode), e.g. "exact" for a small estimated count or a cache
+miss.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from typing import Literal
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+from app.core.tenancy import current_tenant_schema
+
+CountMode = Literal["exact", "estimated", "cached"]
+
+_pg = postgresql.dialect()
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class CountCache:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+
+    def get(self, key: tuple) -> int | None:
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        expires, value = hit
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: int) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+count_cache = CountCache(settings.total_count_cache_seconds, settings.total_count_cache_size)
+
+
+def _signature(stmt) -> tuple:
+    compiled = stmt.compile(dialect=_pg)
+    return (current_tenant_schema(), str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+
+
+async def exact_count(db: AsyncSession, model, conds) -> int:
+    return (await db.execute(select(func.count()).select_from(model).where(*conds))).scalar_one()
+
+
+async def estimated_count(db: AsyncSession, model, conds) -> int:
+    if not conds:
+        res = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": model.__tablename__},
+        )
+        reltuples = res.scalar()
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+    raw = (await db.execute(_Explain(select(model.id).where(*conds)))).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return int(plan["Plan"]["Plan Rows"])
+
+
+async def total_count(db: AsyncSession, model, conds: list, mode: CountMode) -> tuple[int, str]:
+    """(count, mode used) for rows of `model` matching all of `conds`."""
+    if mode == "estimated":
+        n = await estimated_count(db, model, conds)
+        if n >= settings.total_count_exact_below:
+            return n, "estimated"
+        return await exact_count(db, model, conds), "exact"
+    if mode == "cached":
+        key = _signature(select(model.id).where(*conds))
+        n = count_cache.get(key)
+        if n is not None:
+            return n, "cached"
+        n = await exact_count(db, model, conds)
+        count_cache.put(key, n)
+        return n, "exact"
+    return await exact_count(db, model, conds), "exact"
+
+
+def count_headers(count: int, mode: str) -> dict[str, str]:
+    return {"X-Total-Count": str(count), "X-Total-Count-Mode": mode}
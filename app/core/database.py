@@ -1,5 +1,7 @@
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
 
@@ -9,16 +11,47 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+# Optional read replica pool; only used for sessions from get_read_db
+replica_engine = (
+    create_async_engine(settings.replica_database_url, pool_pre_ping=True)
+    if settings.replica_database_url
+    else None
+)
+
+
+class RoutingSession(Session):
+    """Primary by default; the replica only when the session was opened for a
+    read-only handler (info["use_replica"]) and nothing is being flushed."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if replica_engine is not None and self.info.get("use_replica") and not self._flushing:
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
+
 # Canonical async session factory
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
 )
 
 Base = declarative_base()
 
+
+@event.listens_for(RoutingSession, "after_commit")
+def _mark_request_committed(session):
+    # Picked up by ReadYourWritesMiddleware to hand the client a commit LSN
+    state = session.info.get("request_state")
+    if state is not None:
+        state.db_committed = True
+
+
 # Canonical DB dependency for FastAPI
-async def get_db() -> AsyncSession:
+async def get_db(request: Request) -> AsyncSession:
     async with AsyncSessionLocal() as session:
+        session.info["request_state"] = request.state
+        # recorded on audit_log rows (app.core.audit)
+        session.info["actor"] = (request.headers.get(settings.audit_actor_header) or "")[:100] or None
         yield session
@@ -0,0 +1,207 @@
+"""Nearest dispatchable drivers (GET /dispatch/nearest-drivers).
+
+Per worker and tenant we keep an in-memory grid of trucks that can take a
+load right now:
+
+- the truck has a recent position (truck_positions),
+- it has a current assignment (truck_assignments) to an active driver,
+- that driver has no current document past its expiry date.
+
+Positions move with ingestion: the ELD flusher calls apply_positions() for
+trucks it just wrote. Eligibility (assignments, deactivations, documents)
+is re-read every settings.dispatch_refresh_seconds; a stale snapshot keeps
+serving while the rebuild runs, like the phone lookup map.
+
+Lookups scan grid cells in rings around the pickup and stop as soon as the
+k-th best distance is closer than anything the next ring could hold.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.tenancy import current_tenant_schema, use_tenant
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+DISPATCHABLE = text(
+    """
+    SELECT p.truck_id, p.lat, p.lon, p.recorded_at, a.driver_id, d.first_name, d.last_name
+    FROM truck_positions p
+    JOIN truck_assignments a ON a.truck_id = p.truck_id AND a.period @> now()
+    JOIN drivers d ON d.id = a.driver_id AND d.is_active
+    WHERE p.recorded_at >= :fresh_after
+      AND NOT EXISTS (
+          SELECT 1 FROM driver_documents dd
+          WHERE dd.driver_id = d.id AND dd.is_active AND dd.is_current AND dd.expiry_date < current_date
+      )
+    """
+)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+@dataclass
+class TruckSpot:
+    truck_id: int
+    driver_id: int
+    first_name: str
+    last_name: str
+    lat: float
+    lon: float
+    recorded_at: datetime
+
+
+@dataclass
+class NearestDriver:
+    spot: TruckSpot
+    distance_km: float
+
+
+@dataclass
+class GridSnapshot:
+    cell_deg: float
+    built_at: float = field(default_factory=time.monotonic)
+    spots: dict[int, TruckSpot] = field(default_factory=dict)
+    cells: dict[tuple[int, int], set[int]] = field(default_factory=dict)
+    # occupied extent (min row, max row, min col, max col); only ever grows
+    extent: tuple[int, int, int, int] | None = None
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def put(self, spot: TruckSpot) -> None:
+        old = self.spots.get(spot.truck_id)
+        if old is not None:
+            self.cells.get(self._cell(old.lat, old.lon), set()).discard(spot.truck_id)
+        self.spots[spot.truck_id] = spot
+        self._occupy(self._cell(spot.lat, spot.lon), spot.truck_id)
+
+    def _occupy(self, cell: tuple[int, int], truck_id: int) -> None:
+        self.cells.setdefault(cell, set()).add(truck_id)
+        r, c = cell
+        if self.extent is None:
+            self.extent = (r, r, c, c)
+        else:
+            r0, r1, c0, c1 = self.extent
+            self.extent = (min(r0, r), max(r1, r), min(c0, c), max(c1, c))
+
+    def move(self, truck_id: int, lat: float, lon: float, recorded_at: datetime) -> None:
+        spot = self.spots.get(truck_id)
+        if spot is None or recorded_at <= spot.recorded_at:
+            return
+        old_cell, new_cell = self._cell(spot.lat, spot.lon), self._cell(lat, lon)
+        spot.lat, spot.lon, spot.recorded_at = lat, lon, recorded_at
+        if old_cell != new_cell:
+            self.cells.get(old_cell, set()).discard(truck_id)
+            self._occupy(new_cell, truck_id)
+
+    def _ring(self, cy: int, cx: int, r: int):
+        if r == 0:
+            yield cy, cx
+            return
+        for dx in range(-r, r + 1):
+            yield cy - r, cx + dx
+            yield cy + r, cx + dx
+        for dy in range(-r + 1, r):
+            yield cy + dy, cx - r
+            yield cy + dy, cx + r
+
+    def nearest(self, lat: float, lon: float, k: int, max_km: float | None, fresh_after: datetime) -> list[NearestDriver]:
+        if self.extent is None:
+            return []
+        cy, cx = self._cell(lat, lon)
+        r0, r1, c0, c1 = self.extent
+        last_ring = max(abs(r0 - cy), abs(r1 - cy), abs(c0 - cx), abs(c1 - cx))
+        found: list[NearestDriver] = []
+        for ring in range(last_ring + 1):
+            for cell in self._ring(cy, cx, ring):
+                for truck_id in self.cells.get(cell, ()):
+                    spot = self.spots[truck_id]
+                    if spot.recorded_at < fresh_after:
+                        continue
+                    d = haversine_km(lat, lon, spot.lat, spot.lon)
+                    if max_km is None or d <= max_km:
+                        found.append(NearestDriver(spot, d))
+            # anything in ring+1 or beyond is at least `ring` whole cells away
+            reach_deg = ring * self.cell_deg
+            shrink = math.cos(math.radians(min(89.9, abs(lat) + reach_deg + self.cell_deg)))
+            bound_km = reach_deg * KM_PER_DEGREE * shrink
+            if max_km is not None and bound_km > max_km:
+                break
+            if len(found) >= k:
+                found.sort(key=lambda n: n.distance_km)
+                del found[k:]
+                if found[-1].distance_km <= bound_km:
+                    break
+        found.sort(key=lambda n: n.distance_km)
+        return found[:k]
+
+
+class DispatchIndex:
+    def __init__(self, cell_deg: float, refresh_seconds: int):
+        self.cell_deg = cell_deg
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: dict[str | None, GridSnapshot] = {}
+        self._rebuilding: dict[str | None, asyncio.Task] = {}
+
+    async def _build(self, tenant: str | None) -> GridSnapshot:
+        fresh_after = datetime.now(timezone.utc) - timedelta(minutes=settings.dispatch_max_position_age_minutes)
+        with use_tenant(tenant):
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(DISPATCHABLE, {"fresh_after": fresh_after})).all()
+        snap = GridSnapshot(self.cell_deg)
+        for r in rows:
+            snap.put(TruckSpot(r.truck_id, r.driver_id, r.first_name, r.last_name, r.lat, r.lon, r.recorded_at))
+        self._snapshots[tenant] = snap
+        return snap
+
+    def _schedule_rebuild(self, tenant: str | None) -> None:
+        task = self._rebuilding.get(tenant)
+        if task is not None and not task.done():
+            return
+
+        async def run():
+            try:
+                await self._build(tenant)
+            except Exception:
+                logger.warning("dispatch index rebuild failed", exc_info=True)
+
+        self._rebuilding[tenant] = asyncio.create_task(run())
+
+    def apply_positions(self, tenant: str | None, positions: list[tuple[int, datetime, float, float]]) -> None:
+        """(truck_id, recorded_at, lat, lon) from ingestion; unknown trucks wait for the next rebuild."""
+        snap = self._snapshots.get(tenant)
+        if snap is None:
+            return
+        for truck_id, recorded_at, lat, lon in positions:
+            snap.move(truck_id, lat, lon, recorded_at)
+
+    async def nearest(self, lat: float, lon: float, k: int, max_km: float | None = None) -> list[NearestDriver]:
+        tenant = current_tenant_schema()
+        snap = self._snapshots.get(tenant)
+        if snap is None:
+            snap = await self._build(tenant)
+        elif time.monotonic() - snap.built_at > self.refresh_seconds:
+            self._schedule_rebuild(tenant)
+        fresh_after = datetime.now(timezone.utc) - timedelta(minutes=settings.dispatch_max_position_age_minutes)
+        return snap.nearest(lat, lon, k, max_km, fresh_after)
+
+
+dispatch_index = DispatchIndex(settings.dispatch_cell_degrees, settings.dispatch_refresh_seconds)
@@ -0,0 +1,280 @@
+"""ELD GPS breadcrumb ingestion.
+
+POST /eld/breadcrumbs parses and validates a batch, appends it to an
+in-process buffer and answers 202 straight away. A flusher task writes the
+buffer every settings.eld_flush_interval_ms (or as soon as
+settings.eld_flush_batch_points are waiting), per batch in one transaction:
+
+1. COPY the points into a session temp table (gps_staging),
+2. INSERT ... SELECT DISTINCT ... ON CONFLICT DO NOTHING into gps_breadcrumbs,
+   so retransmitted points are dropped by the (truck_id, recorded_at) key,
+3. from the rows actually inserted: advance truck_positions (latest point
+   per truck) and mark ifta_dirty truck-days for app.jobs.ifta_mileage.
+
+After commit the new positions are pushed into this worker's dispatch index.
+
+gps_breadcrumbs is range-partitioned by day with a BRIN index on
+recorded_at, so per-insert index work stays bounded no matter how much
+history accumulates. Partitions are created here, on first use of a day.
+
+Points are acknowledged (202) before they are written: a clean shutdown
+writes them, but they are lost if the worker dies first, or if a failed
+flush finds no room to requeue them (counted as "dropped" and logged). When the buffer is full the endpoint
+answers 503 + Retry-After, and vendors retransmit those; dedup makes
+retransmissions harmless.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.dispatch import dispatch_index
+from app.core.flusher import BackgroundFlusher
+from app.core.tenancy import use_tenant
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["truck_id", "recorded_at", "lat", "lon", "speed_kph", "odometer_km"]
+
+_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS gps_staging (
+    truck_id integer, recorded_at timestamptz, lat float8, lon float8, speed_kph real, odometer_km float8
+) ON COMMIT DELETE ROWS
+"""
+
+_MERGE = """
+WITH ins AS (
+    INSERT INTO gps_breadcrumbs (truck_id, recorded_at, lat, lon, speed_kph, odometer_km)
+    SELECT DISTINCT ON (truck_id, recorded_at) truck_id, recorded_at, lat, lon, speed_kph, odometer_km
+    FROM gps_staging
+    ORDER BY truck_id, recorded_at
+    ON CONFLICT DO NOTHING
+    RETURNING truck_id, recorded_at, lat, lon, speed_kph
+), latest AS (
+    INSERT INTO truck_positions AS p (truck_id, recorded_at, lat, lon, speed_kph)
+    SELECT DISTINCT ON (truck_id) truck_id, recorded_at, lat, lon, speed_kph
+    FROM ins
+    ORDER BY truck_id, recorded_at DESC
+    ON CONFLICT (truck_id) DO UPDATE
+        SET recorded_at = EXCLUDED.recorded_at, lat = EXCLUDED.lat, lon = EXCLUDED.lon,
+            speed_kph = EXCLUDED.speed_kph, updated_at = now()
+        WHERE p.recorded_at < EXCLUDED.recorded_at
+), dirty AS (
+    INSERT INTO ifta_dirty (truck_id, day)
+    SELECT DISTINCT truck_id, (recorded_at AT TIME ZONE 'UTC')::date FROM ins
+    -- re-mark: a recompute already running for this day must not clear it
+    ON CONFLICT (truck_id, day) DO UPDATE SET marked_at = now()
+)
+SELECT count(*) FROM ins
+"""
+
+
+class PayloadError(ValueError):
+    pass
+
+
+def gunzip(data: bytes, limit: int) -> bytes:
+    """gzip/zlib body -> bytes, refusing to inflate past `limit`."""
+    d = zlib.decompressobj(zlib.MAX_WBITS | 32)  # auto-detect gzip or zlib header
+    try:
+        out = d.decompress(data, limit)
+    except zlib.error:
+        raise PayloadError("body is not valid gzip/deflate data")
+    if d.unconsumed_tail:
+        raise PayloadError(f"decompressed body exceeds {limit} bytes")
+    return out
+
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, tz=timezone.utc)
+        except (OverflowError, OSError):
+            raise ValueError("epoch timestamp out of range")
+    if isinstance(value, str):
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if ts.tzinfo is None:
+            raise ValueError("timestamp needs a timezone offset")
+        return ts
+    raise ValueError("timestamp must be ISO 8601 or epoch seconds")
+
+
+def _optional_float(value) -> float | None:
+    return None if value is None else float(value)
+
+
+def parse_breadcrumbs(
+    body: bytes,
+    known_trucks: set[int] | None = None,
+    now: datetime | None = None,
+) -> tuple[list[tuple], dict[int, str]]:
+    """NDJSON -> (rows in COLUMNS order, {line_no: error}).
+
+    One point per line: {"truck_id": 12, "ts": "2026-10-19T14:03:30Z",
+    "lat": 43.65, "lon": -79.38, "speed_kph": 88.5, "odometer_km": 412345.2}
+    """
+    now = now or datetime.now(timezone.utc)
+    oldest = now - timedelta(days=settings.eld_max_point_age_days)
+    newest = now + timedelta(minutes=10)
+
+    rows: list[tuple] = []
+    errors: dict[int, str] = {}
+    for line_no, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            p = json.loads(line)
+            truck_id = int(p["truck_id"])
+            if known_trucks is not None and truck_id not in known_trucks:
+                raise ValueError(f"unknown truck_id {truck_id}")
+            ts = _timestamp(p["ts"])
+            lat, lon = float(p["lat"]), float(p["lon"])
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError("lat/lon out of range")
+            if not (oldest <= ts <= newest):
+                raise ValueError("ts outside the accepted window")
+            rows.append(
+                (truck_id, ts, lat, lon, _optional_float(p.get("speed_kph")), _optional_float(p.get("odometer_km")))
+            )
+        except (ValueError, TypeError, KeyError, AttributeError, OverflowError) as e:  # int(Infinity)
+            errors[line_no] = str(e) if not isinstance(e, KeyError) else f"missing field {e}"
+    return rows, errors
+
+
+def partition_name(day: date) -> str:
+    return f"gps_breadcrumbs_{day:%Y%m%d}"
+
+
+async def ensure_partitions(days: set[date]) -> set[date]:
+    """Create the daily partitions (current tenant's schema) if missing.
+
+    Returns the days whose partition exists afterwards; only those may be
+    cached as present.
+    """
+    present: set[date] = set()
+    async with AsyncSessionLocal() as db:
+        for day in sorted(days):
+            start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            error: Exception | None = None
+            try:
+                await db.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF gps_breadcrumbs "
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{(start + timedelta(days=1)).isoformat()}')"
+                    )
+                )
+                await db.commit()
+            except Exception as e:
+                # usually another worker created it concurrently; checked below
+                await db.rollback()
+                error = e
+            exists = (await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition_name(day)})).scalar()
+            await db.commit()
+            if exists:
+                present.add(day)
+            else:
+                logger.warning("partition %s is missing", partition_name(day), exc_info=error)
+    return present
+
+
+class EldIngestBuffer:
+    def __init__(self):
+        self._pending: dict[str | None, list[tuple]] = defaultdict(list)
+        self._size = 0
+        self._flusher = BackgroundFlusher(
+            "breadcrumb buffer", self.flush, lambda: self._size, settings.eld_flush_interval_ms / 1000
+        )
+        self._partitions: set[tuple[str | None, date]] = set()
+        self._trucks: dict[str | None, tuple[float, set[int]]] = {}
+        self.stats = {"accepted": 0, "inserted": 0, "duplicates": 0, "flush_failures": 0, "dropped": 0, "buffered": 0}
+
+    async def known_trucks(self, tenant: str | None) -> set[int]:
+        cached = self._trucks.get(tenant)
+        if cached is not None and time.monotonic() - cached[0] < settings.eld_truck_cache_seconds:
+            return cached[1]
+        with use_tenant(tenant):
+            async with AsyncSessionLocal() as db:
+                ids = set((await db.execute(text("SELECT id FROM trucks"))).scalars())
+        self._trucks[tenant] = (time.monotonic(), ids)
+        return ids
+
+    def offer(self, tenant: str | None, rows: list[tuple]) -> bool:
+        """Queue rows for the flusher; False when the buffer is full."""
+        if self._size + len(rows) > settings.eld_buffer_max_points:
+            return False
+        self._pending[tenant].extend(rows)
+        self._size += len(rows)
+        self.stats["accepted"] += len(rows)
+        self.stats["buffered"] = self._size
+        if self._size >= settings.eld_flush_batch_points:
+            self._flusher.wake()
+        return True
+
+    async def flush(self) -> bool:
+        """Write everything buffered; False if any batch failed (and was requeued)."""
+        ok = True
+        pending, self._pending = self._pending, defaultdict(list)
+        self._size = 0
+        batch = settings.eld_flush_batch_points
+        for tenant, rows in pending.items():
+            for i in range(0, len(rows), batch):
+                chunk = rows[i:i + batch]
+                try:
+                    await self._write(tenant, chunk)
+                except Exception:
+                    ok = False
+                    self.stats["flush_failures"] += 1
+                    logger.warning("breadcrumb flush failed (%d points)", len(chunk), exc_info=True)
+                    # already acknowledged (202): keep them for the next round if there is room
+                    if self.offer(tenant, chunk):
+                        self.stats["accepted"] -= len(chunk)
+                    else:
+                        self.stats["dropped"] += len(chunk)
+                        logger.error("breadcrumb buffer full; %d acknowledged point(s) dropped", len(chunk))
+        self.stats["buffered"] = self._size
+        return ok
+
+    async def _write(self, tenant: str | None, rows: list[tuple]) -> None:
+        days = {r[1].astimezone(timezone.utc).date() for r in rows}
+        missing = {d for d in days if (tenant, d) not in self._partitions}
+        if missing:
+            with use_tenant(tenant):
+                present = await ensure_partitions(missing)
+            # days still without a partition are retried on the next flush
+            self._partitions.update((tenant, d) for d in present)
+
+        async with engine.connect() as conn:
+            async with conn.begin():
+                if tenant is not None:
+                    await conn.exec_driver_sql(f'SET LOCAL search_path TO "{tenant}"')
+                await conn.exec_driver_sql(_STAGING)
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table("gps_staging", records=rows, columns=COLUMNS)
+                inserted = (await conn.exec_driver_sql(_MERGE)).scalar_one()
+        self.stats["inserted"] += inserted
+        self.stats["duplicates"] += len(rows) - inserted
+
+        latest: dict[int, tuple] = {}
+        for r in rows:
+            if r[0] not in latest or r[1] > latest[r[0]][1]:
+                latest[r[0]] = r
+        dispatch_index.apply_positions(tenant, [(r[0], r[1], r[2], r[3]) for r in latest.values()])
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    async def stop(self) -> None:
+        """Finish the flush in progress, then write what is still buffered."""
+        await self._flusher.stop()
+
+
+eld_buffer = EldIngestBuffer()
@@ -0,0 +1,242 @@
+"""Change events pushed to browsers over SSE (GET /events).
+
+Each worker holds ONE dedicated asyncpg connection that LISTENs on
+CHANNEL (fed by the notify_change trigger) and fans every
+notification out to its in-process subscribers:
+
+- subscribers are indexed by (schema, driver_id), so an event only visits
+  the subscribers that can want it, not all of them;
+- the SSE frame is rendered once per event and shared by every subscriber;
+- each subscriber has a bounded queue; a client that cannot keep up is
+  disconnected instead of buffering without limit. Browsers reconnect on
+  their own and send Last-Event-ID;
+- the last settings.events_replay_size events are kept for that resume.
+  If the id is no longer there (or the LISTEN connection dropped, so events
+  may have been missed) the client gets a `reset` event and should reload.
+
+In-process caches register with add_listener() to hear about writes made
+by other workers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Callable
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# hardcoded in notify_change() (migration a6e3f9c2b174); not configurable
+CHANNEL = "erp_changes"
+
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+PING_FRAME = b": ping\n\n"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    event_id: str
+    entity: str
+    op: str
+    id: int
+    driver_id: int | None
+    doc_type: str | None
+    schema: str
+    frame: bytes
+    # the write may change the phone lookup map (see migration e4c1a7d9b352)
+    lookup: bool = True
+
+
+def parse_notification(payload: str) -> ChangeEvent:
+    raw = json.loads(payload)
+    data = {k: raw[k] for k in ("entity", "op", "id", "driver_id", "doc_type")}
+    frame = f"id: {raw['key']}\nevent: {raw['entity']}.{raw['op']}\ndata: {json.dumps(data)}\n\n"
+    return ChangeEvent(
+        event_id=raw["key"],
+        entity=raw["entity"],
+        op=raw["op"],
+        id=raw["id"],
+        driver_id=raw["driver_id"],
+        doc_type=raw["doc_type"],
+        schema=raw["schema"],
+        frame=frame.encode(),
+        lookup=raw.get("lookup", True) is not False,
+    )
+
+
+class Subscriber:
+    def __init__(
+        self,
+        schema: str,
+        driver_ids: set[int] | None,
+        doc_types: set[str] | None,
+        entities: set[str] | None,
+    ):
+        self.schema = schema
+        self.driver_ids = driver_ids
+        self.doc_types = doc_types
+        self.entities = entities
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=settings.events_queue_size)
+        self.overflowed = False
+
+    def wants(self, ev: ChangeEvent) -> bool:
+        if ev.schema != self.schema:
+            return False
+        if self.driver_ids is not None and ev.driver_id not in self.driver_ids:
+            return False
+        if self.entities is not None and ev.entity not in self.entities:
+            return False
+        # doc_type only narrows document/file events
+        if self.doc_types is not None and ev.doc_type is not None and ev.doc_type not in self.doc_types:
+            return False
+        return True
+
+
+class EventHub:
+    def __init__(self, channel: str, replay_size: int):
+        self.channel = channel
+        self._recent: deque[ChangeEvent] = deque(maxlen=replay_size)
+        self._index: dict[tuple[str, int | None], set[Subscriber]] = defaultdict(set)
+        self._listeners: list[Callable[[ChangeEvent | None], None]] = []
+        self._task: asyncio.Task | None = None
+        self.stats = {"subscribers": 0, "events": 0, "delivered": 0, "dropped_subscribers": 0, "reconnects": 0}
+
+    # ---- subscribers ----
+
+    def _keys(self, sub: Subscriber):
+        if sub.driver_ids is None:
+            return [(sub.schema, None)]
+        return [(sub.schema, d) for d in sub.driver_ids]
+
+    def subscribe(self, sub: Subscriber, last_event_id: str | None) -> list[bytes] | None:
+        """Register sub; returns the frames to replay first, or None if
+        last_event_id can't be resumed from (send RESET_FRAME)."""
+        # no await in here: nothing can be published between replay and registration
+        backlog: list[bytes] | None = []
+        if last_event_id:
+            backlog = self._replay(sub, last_event_id)
+        for key in self._keys(sub):
+            self._index[key].add(sub)
+        self.stats["subscribers"] += 1
+        return backlog
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        removed = False
+        for key in self._keys(sub):
+            subs = self._index.get(key)
+            if subs is not None and sub in subs:
+                removed = True
+                subs.discard(sub)
+                if not subs:
+                    del self._index[key]
+        if removed:
+            self.stats["subscribers"] -= 1
+
+    def _replay(self, sub: Subscriber, last_event_id: str) -> list[bytes] | None:
+        events = list(self._recent)
+        for pos in range(len(events) - 1, -1, -1):
+            if events[pos].event_id == last_event_id:
+                return [ev.frame for ev in events[pos + 1:] if sub.wants(ev)]
+        return None
+
+    def add_listener(self, fn: Callable[[ChangeEvent | None], None]) -> None:
+        """Call fn(event) for every event, and fn(None) when events may have
+        been missed. Runs on the event loop; keep it cheap."""
+        self._listeners.append(fn)
+
+    def _notify_listeners(self, ev: ChangeEvent | None) -> None:
+        for fn in self._listeners:
+            try:
+                fn(ev)
+            except Exception:
+                logger.warning("change listener %r failed", fn, exc_info=True)
+
+    # ---- fan-out ----
+
+    def publish(self, ev: ChangeEvent) -> None:
+        self._recent.append(ev)
+        self.stats["events"] += 1
+        self._notify_listeners(ev)
+        targets = self._index.get((ev.schema, ev.driver_id), set()) | self._index.get((ev.schema, None), set())
+        for sub in targets:
+            if sub.wants(ev):
+                self._offer(sub, ev.frame)
+
+    def _offer(self, sub: Subscriber, frame: bytes) -> None:
+        try:
+            sub.queue.put_nowait(frame)
+            self.stats["delivered"] += 1
+        except asyncio.QueueFull:
+            # slow client: cut it loose, it resumes from its Last-Event-ID
+            sub.overflowed = True
+            self.unsubscribe(sub)
+            self.stats["dropped_subscribers"] += 1
+
+    def _reset_all(self) -> None:
+        # events may have been missed while LISTEN was down; old ids can't be resumed
+        self._recent.clear()
+        self._notify_listeners(None)
+        for sub in {s for subs in self._index.values() for s in subs}:
+            self._offer(sub, RESET_FRAME)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            ev = parse_notification(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("ignoring malformed %s payload: %r", channel, payload[:200])
+            return
+        self.publish(ev)
+
+    # ---- LISTEN connection ----
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen_forever(self) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        connected_before = False
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                await conn.add_listener(self.channel, self._on_notify)
+                if connected_before:
+                    self.stats["reconnects"] += 1
+                    self._reset_all()
+                connected_before = True
+                backoff = 1.0
+                # keepalive; raises once the connection is gone
+                while True:
+                    await asyncio.sleep(settings.events_heartbeat_seconds)
+                    await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("event LISTEN connection lost; retrying in %.0fs", backoff, exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+
+event_hub = EventHub(CHANNEL, settings.events_replay_size)
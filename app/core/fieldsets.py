@@ -0,0 +1,101 @@
+"""Sparse fieldsets for list endpoints (?fields=id,first_name,last_name).
+
+The requested names are checked against the endpoint's response schema,
+the SELECT is narrowed to those columns (so a covering index can answer it
+and wide columns such as notes are never read), and the rows are serialized
+with a trimmed copy of the schema built once per field combination. The copy
+keeps the schema's field validators for the selected fields, and its model
+validators (skipped when they need a field that was not selected), so a
+sparse row shows the same values as the full one. `id` is always included.
+
+Endpoints return the Response from sparse_response() as-is, skipping their
+full response_model, which would reject the missing fields.
+"""
+
+from __future__ import annotations
+
+import types
+from functools import lru_cache, wraps
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model, field_validator, model_validator
+
+# distinct combinations kept per process; clients use a handful
+_CACHE_SIZE = 256
+
+
+def parse_fields(raw: str | None, schema: type[BaseModel], model) -> tuple[str, ...] | None:
+    """'a,b' -> ('id', 'a', 'b') in schema order; None when not requested.
+    Only schema fields backed by a column of `model` can be selected."""
+    if raw is None or not raw.strip():
+        return None
+    wanted = {f.strip() for f in raw.split(",") if f.strip()}
+    allowed = [f for f in schema.model_fields if f in model.__table__.c]
+    unknown = sorted(wanted - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    wanted.add("id")
+    return tuple(f for f in allowed if f in wanted)
+
+
+def columns(model, fields: tuple[str, ...]) -> list:
+    return [model.__table__.c[f] for f in fields]
+
+
+def _skip_if_unselected(fn, dropped: frozenset[str]):
+    """Model validator that is skipped when it reads a field left out."""
+
+    @wraps(fn)
+    def check(self):
+        try:
+            return fn(self)
+        except AttributeError as e:
+            if e.name in dropped:
+                return self
+            raise
+
+    return check
+
+
+def _unbound(func):
+    # classmethod validators come back bound to the schema; rebind to the copy
+    return classmethod(func.__func__) if isinstance(func, types.MethodType) else func
+
+
+def _validators(schema: type[BaseModel], fields: tuple[str, ...]) -> dict:
+    decorators = schema.__pydantic_decorators__
+    out = {}
+    for name, d in decorators.field_validators.items():
+        selected = [f for f in d.info.fields if f in fields]
+        if selected:
+            out[name] = field_validator(*selected, mode=d.info.mode)(_unbound(d.func))
+    dropped = frozenset(schema.model_fields) - set(fields)
+    for name, d in decorators.model_validators.items():
+        func = _skip_if_unselected(d.func, dropped) if d.info.mode == "after" else _unbound(d.func)
+        out[name] = model_validator(mode=d.info.mode)(func)
+    return out
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def partial_schema(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        __validators__=_validators(schema, fields),
+        **{f: (schema.model_fields[f].annotation, schema.model_fields[f]) for f in fields},
+    )
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _list_adapter(schema: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(list[partial_schema(schema, fields)])
+
+
+def sparse_response(schema: type[BaseModel], fields: tuple[str, ...], rows) -> Response:
+    """rows: mappings with exactly `fields` (result.mappings().all())."""
+    adapter = _list_adapter(schema, fields)
+    items = adapter.validate_python([dict(r) for r in rows])
+    return Response(adapter.dump_json(items), media_type="application/json")
@@ -0,0 +1,71 @@
+"""Background flush loop for the in-process write buffers (ELD breadcrumbs,
+audit records).
+
+Buffered rows have already been acknowledged, so shutdown must not lose
+them: stop() never cancels a flush in progress. It asks the loop to exit,
+waits for the current flush to finish and then drains what is left.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundFlusher:
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[], Awaitable[bool]],
+        pending: Callable[[], int],
+        interval_seconds: float,
+    ):
+        self.name = name
+        self._flush = flush
+        self._pending = pending
+        self._interval = interval_seconds
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def _pause(self, event: asyncio.Event, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            await self._pause(self._wake, self._interval)
+            self._wake.clear()
+            if self._pending() and not await self._flush():
+                # DB trouble: don't spin on the requeued rows
+                await self._pause(self._stopping, self._interval)
+
+    def start(self) -> None:
+        if not self.running:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Let a flush in progress finish, then write what is still buffered."""
+        if self._task is not None:
+            self._stopping.set()
+            self._wake.set()
+            try:
+                await self._task
+            except Exception:
+                logger.warning("%s flusher failed", self.name, exc_info=True)
+            self._task = None
+        if self._pending() and not await self._flush():
+            logger.error("%s: %d buffered row(s) not written at shutdown", self.name, self._pending())
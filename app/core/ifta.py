@@ -0,0 +1,230 @@
+"""IFTA jurisdiction mileage: vectorized distance + grid-indexed point-in-polygon.
+
+Pure NumPy, no database access, so it can run in worker processes
+(app.jobs.ifta_mileage feeds it breadcrumb chunks).
+
+Boundaries come from a GeoJSON FeatureCollection (settings.ifta_boundaries_path)
+of Polygon/MultiPolygon features, each carrying its jurisdiction code (ON,
+MI, ...) in settings.ifta_code_property.
+
+GridIndex splits the boundaries' bounding box into square cells of
+settings.ifta_grid_degrees:
+
+- a cell no boundary passes through lies wholly inside one jurisdiction (or
+  none); its answer is precomputed (scanline fill), so most points resolve
+  with a single array lookup;
+- a cell a boundary passes through is "mixed": its points are tested with
+  even-odd ray casting, but only against that jurisdiction's edges in the
+  cell's row band (a horizontal ray from a point can only cross those).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+OUTSIDE = -1
+MIXED = -2
+UNKNOWN_JURISDICTION = "UNK"
+
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _ring_edges(ring) -> np.ndarray:
+    pts = np.asarray(ring, dtype=np.float64)[:, :2]
+    if len(pts) and not np.array_equal(pts[0], pts[-1]):
+        pts = np.vstack([pts, pts[:1]])
+    return np.hstack([pts[:-1], pts[1:]])  # x1, y1, x2, y2 (lon/lat)
+
+
+def load_boundaries(path: str | Path, code_property: str) -> tuple[list[str], list[np.ndarray]]:
+    """-> (codes, edges per jurisdiction). All rings (holes included) are kept;
+    even-odd ray casting handles holes and multipolygons."""
+    with open(path) as f:
+        data = json.load(f)
+    edges: dict[str, list[np.ndarray]] = {}
+    for feature in data["features"]:
+        code = str(feature["properties"][code_property]).upper()
+        geom = feature["geometry"]
+        polygons = [geom["coordinates"]] if geom["type"] == "Polygon" else geom["coordinates"]
+        for polygon in polygons:
+            for ring in polygon:
+                edges.setdefault(code, []).append(_ring_edges(ring))
+    codes = sorted(edges)
+    return codes, [np.vstack(edges[c]) for c in codes]
+
+
+def points_in_edges(x: np.ndarray, y: np.ndarray, edges: np.ndarray, block_cells: int = 4_000_000) -> np.ndarray:
+    """Even-odd ray casting (ray towards +x) of points against an edge set."""
+    inside = np.zeros(len(x), dtype=bool)
+    if not len(x) or not len(edges):
+        return inside
+    step = max(1, block_cells // len(x))
+    xc, yc = x[:, None], y[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(0, len(edges), step):
+            x1, y1, x2, y2 = edges[i:i + step].T
+            straddles = (y1 > yc) != (y2 > yc)
+            x_cross = x1 + (yc - y1) * (x2 - x1) / (y2 - y1)
+            inside ^= (np.count_nonzero(straddles & (xc < x_cross), axis=1) % 2).astype(bool)
+    return inside
+
+
+@dataclass
+class GridIndex:
+    codes: list[str]
+    x0: float
+    y0: float
+    cell_deg: float
+    nx: int
+    ny: int
+    # per cell: jurisdiction index, OUTSIDE or MIXED
+    cells: np.ndarray
+    # mixed cell (flat id) -> candidate jurisdiction indexes
+    candidates: dict[int, tuple[int, ...]] = field(default_factory=dict)
+    # (jurisdiction, row) -> that jurisdiction's edges overlapping the row band
+    band_edges: dict[tuple[int, int], np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, codes: list[str], edges: list[np.ndarray], cell_deg: float) -> "GridIndex":
+        all_edges = np.vstack(edges)
+        x0 = float(min(all_edges[:, 0].min(), all_edges[:, 2].min()))
+        y0 = float(min(all_edges[:, 1].min(), all_edges[:, 3].min()))
+        x1 = float(max(all_edges[:, 0].max(), all_edges[:, 2].max()))
+        y1 = float(max(all_edges[:, 1].max(), all_edges[:, 3].max()))
+        nx = int(np.ceil((x1 - x0) / cell_deg)) + 1
+        ny = int(np.ceil((y1 - y0) / cell_deg)) + 1
+        cells = np.full((ny, nx), OUTSIDE, dtype=np.int16)
+        grid = cls(codes, x0, y0, cell_deg, nx, ny, cells)
+
+        centers_x = x0 + (np.arange(nx) + 0.5) * cell_deg
+        touched: dict[int, set[int]] = {}
+        for j, e in enumerate(edges):
+            # interiors, row by row (scanline through cell centers)
+            for row in range(ny):
+                yc = y0 + (row + 0.5) * cell_deg
+                ex1, ey1, ex2, ey2 = e.T
+                hit = (ey1 > yc) != (ey2 > yc)
+                if not hit.any():
+                    continue
+                xs = np.sort(ex1[hit] + (yc - ey1[hit]) * (ex2[hit] - ex1[hit]) / (ey2[hit] - ey1[hit]))
+                for a, b in zip(xs[0::2], xs[1::2]):
+                    cols = np.nonzero((centers_x >= a) & (centers_x < b))[0]
+                    cells[row, cols] = j
+
+            # cells its boundary passes through (edge bounding boxes, conservative)
+            cx0, cx1 = grid._col(np.minimum(e[:, 0], e[:, 2])), grid._col(np.maximum(e[:, 0], e[:, 2]))
+            cy0, cy1 = grid._row(np.minimum(e[:, 1], e[:, 3])), grid._row(np.maximum(e[:, 1], e[:, 3]))
+            single = (cx0 == cx1) & (cy0 == cy1)
+            flat = set((cy0[single] * nx + cx0[single]).tolist())
+            for a, b, c, d in zip(cx0[~single], cx1[~single], cy0[~single], cy1[~single]):
+                flat.update(r * nx + col for r in range(c, d + 1) for col in range(a, b + 1))
+            for cell in flat:
+                touched.setdefault(cell, set()).add(j)
+
+            for row in range(ny):
+                lo, hi = y0 + row * cell_deg, y0 + (row + 1) * cell_deg
+                in_band = (np.maximum(e[:, 1], e[:, 3]) >= lo) & (np.minimum(e[:, 1], e[:, 3]) <= hi)
+                if in_band.any():
+                    grid.band_edges[(j, row)] = e[in_band]
+
+        for cell, js in touched.items():
+            row, col = divmod(cell, nx)
+            inner = int(cells[row, col])
+            if inner >= 0:
+                js = js | {inner}  # boundary of a neighbour cutting into this one
+            cells[row, col] = MIXED
+            grid.candidates[cell] = tuple(sorted(js))
+        return grid
+
+    @classmethod
+    def from_geojson(cls, path: str | Path, code_property: str, cell_deg: float) -> "GridIndex":
+        codes, edges = load_boundaries(path, code_property)
+        return cls.build(codes, edges, cell_deg)
+
+    def _col(self, lon) -> np.ndarray:
+        return np.clip(((np.asarray(lon) - self.x0) / self.cell_deg).astype(np.int64), 0, self.nx - 1)
+
+    def _row(self, lat) -> np.ndarray:
+        return np.clip(((np.asarray(lat) - self.y0) / self.cell_deg).astype(np.int64), 0, self.ny - 1)
+
+    def lookup(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Jurisdiction index per point (OUTSIDE where none)."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        in_grid = (
+            (lon >= self.x0) & (lon < self.x0 + self.nx * self.cell_deg)
+            & (lat >= self.y0) & (lat < self.y0 + self.ny * self.cell_deg)
+        )
+        rows, cols = self._row(lat), self._col(lon)
+        out = np.where(in_grid, self.cells[rows, cols], OUTSIDE).astype(np.int16)
+
+        mixed = np.nonzero(out == MIXED)[0]
+        if not len(mixed):
+            return out
+        out[mixed] = OUTSIDE
+        flat = rows[mixed] * self.nx + cols[mixed]
+        order = np.argsort(flat, kind="stable")
+        flat, mixed = flat[order], mixed[order]
+        starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+        for s, e in zip(starts, np.r_[starts[1:], len(flat)]):
+            cell = int(flat[s])
+            row = cell // self.nx
+            pts = mixed[s:e]
+            for j in self.candidates[cell]:
+                todo = pts[out[pts] == OUTSIDE]
+                if not len(todo):
+                    break
+                band = self.band_edges.get((j, row))
+                if band is None:
+                    continue
+                hit = points_in_edges(lon[todo], lat[todo], band)
+                out[todo[hit]] = j
+        return out
+
+    def code(self, index: int) -> str:
+        return self.codes[index] if index >= 0 else UNKNOWN_JURISDICTION
+
+
+def segment_mileage(
+    grid: GridIndex,
+    ts: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    max_speed_mph: float,
+) -> list[tuple[int, str, float]]:
+    """Miles per (UTC day, jurisdiction) for one truck's time-ordered points.
+
+    Each segment between consecutive points is charged to the jurisdiction
+    of its midpoint and the day of its end point. Segments implying more
+    than max_speed_mph are GPS jumps and are dropped.
+    Returns [(days since epoch, code, miles)].
+    """
+    if len(ts) < 2:
+        return []
+    miles = haversine_miles(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    dt = np.diff(ts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plausible = (dt > 0) & (miles / dt * 3600 <= max_speed_mph)
+    if not plausible.any():
+        return []
+    miles = miles[plausible]
+    mid_lat = ((lat[:-1] + lat[1:]) / 2)[plausible]
+    mid_lon = ((lon[:-1] + lon[1:]) / 2)[plausible]
+    days = (ts[1:][plausible] // 86400).astype(np.int64)
+    jur = grid.lookup(mid_lat, mid_lon).astype(np.int64)
+
+    # aggregate by (day, jurisdiction) in one pass
+    key = days * (len(grid.codes) + 1) + (jur + 1)
+    uniq, inverse = np.unique(key, return_inverse=True)
+    totals = np.bincount(inverse, weights=miles)
+    width = len(grid.codes) + 1
+    return [(int(k // width), grid.code(int(k % width) - 1), float(m)) for k, m in zip(uniq, totals)]
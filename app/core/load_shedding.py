@@ -0,0 +1,253 @@
+"""Per-client rate limiting and priority-aware load shedding (pure ASGI).
+
+Two checks run before a request reaches the app, in this worker's memory
+(no shared store; each worker enforces its own share):
+
+1. Token bucket per client: the API key header (settings.rate_limit_key_header)
+   when it carries a known key (settings.rate_limit_api_keys or a "key:"
+   entry of settings.rate_limit_overrides), otherwise the client address, so
+   made-up keys cannot mint fresh buckets. At most
+   settings.rate_limit_max_clients buckets are kept (least recently seen
+   evicted). Empty bucket -> 429 with Retry-After.
+2. Concurrency cap per route class. A request waits for a free slot for at
+   most its class's queue budget, then gets 503 with Retry-After.
+   Low-priority classes (exports, imports, searches) have no budget to spare:
+   while any higher class has requests waiting they are shed at once, so
+   critical reads keep their slots and their latency.
+
+The SSE stream and health endpoints bypass both checks. Counters are served
+by GET /api/v1/health/metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+API = "/api/v1"
+
+_BYPASS = (f"{API}/events", f"{API}/health")
+
+# first match wins; (class, methods or None for any, path pattern)
+ROUTE_CLASSES: list[tuple[str, set[str] | None, re.Pattern]] = [
+    ("critical", {"GET"}, re.compile(rf"^{API}/drivers/(\d+|by-phone/[^/]+)$")),
+    ("critical", {"GET"}, re.compile(rf"^{API}/(trucks/\d+/driver|drivers/\d+/truck|dispatch/nearest-drivers)$")),
+    ("ingest", {"POST"}, re.compile(rf"^{API}/eld/breadcrumbs$")),
+    ("export", {"GET"}, re.compile(rf"^{API}/(.*\.zip|changes|ifta/mileage)$")),
+    ("import", {"POST", "PUT"}, re.compile(rf"^{API}/(driver-documents/\d+/files(/batch)?|uploads/[^/]+|drivers/deactivate|truck-assignments/resolve)$")),
+    ("search", {"GET"}, re.compile(rf"^{API}/(drivers|driver-documents|driver-phones)$")),
+]
+DEFAULT_CLASS = "default"
+LOW_PRIORITY = {"export", "import", "search"}
+
+
+class Shed(Exception):
+    pass
+
+
+@dataclass
+class RouteClass:
+    name: str
+    limit: int
+    budget_seconds: float
+    in_flight: int = 0
+    waiters: deque = field(default_factory=deque)
+    stats: dict = field(
+        default_factory=lambda: {"admitted": 0, "queued": 0, "shed": 0, "queue_wait_ms_total": 0.0, "queue_wait_ms_max": 0.0}
+    )
+
+    async def acquire(self, shed_now: bool) -> None:
+        if shed_now:
+            self.stats["shed"] += 1
+            raise Shed
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return
+        if self.budget_seconds <= 0:
+            self.stats["shed"] += 1
+            raise Shed
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        self.stats["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.budget_seconds)
+        except BaseException as e:  # budget ran out or the client went away
+            if fut.done() and not fut.cancelled():
+                self.release()  # the slot was handed over at the last moment
+            else:
+                fut.cancel()
+                try:
+                    self.waiters.remove(fut)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["shed"] += 1
+                raise Shed
+            raise
+        waited = (time.monotonic() - started) * 1000
+        self.stats["admitted"] += 1
+        self.stats["queue_wait_ms_total"] += waited
+        self.stats["queue_wait_ms_max"] = max(self.stats["queue_wait_ms_max"], waited)
+
+    def release(self) -> None:
+        while self.waiters:
+            fut = self.waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # slot passes straight to the waiter
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": len(self.waiters), **self.stats}
+
+
+class TokenBuckets:
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        overrides: dict[str, float] | None = None,
+        idle_seconds: float = 600,
+        max_clients: int = 10000,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.idle_seconds = idle_seconds
+        self.max_clients = max_clients
+        # key -> [tokens, last refill], least recently seen first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self.stats = {"allowed": 0, "limited": 0, "evicted": 0}
+
+    def take(self, key: str) -> float:
+        """0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        self._prune(now)
+        rate = self.overrides.get(key, self.rate)
+        burst = max(self.burst, rate)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+                self.stats["evicted"] += 1
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            self.stats["allowed"] += 1
+            return 0.0
+        bucket[0] = tokens
+        self.stats["limited"] += 1
+        return (1 - tokens) / rate if rate > 0 else 60.0
+
+    def _prune(self, now: float) -> None:
+        # idle buckets are full again anyway; oldest are at the front
+        cutoff = now - self.idle_seconds
+        while self._buckets and next(iter(self._buckets.values()))[1] < cutoff:
+            self._buckets.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        return {"clients": len(self._buckets), **self.stats}
+
+
+class LoadShedder:
+    def __init__(self):
+        names = {c for c, _, _ in ROUTE_CLASSES} | {DEFAULT_CLASS}
+        self.classes = {
+            name: RouteClass(
+                name,
+                settings.concurrency_limits.get(name, settings.concurrency_limits.get(DEFAULT_CLASS, 32)),
+                settings.queue_budget_ms.get(name, 0) / 1000,
+            )
+            for name in names
+        }
+        self.buckets = TokenBuckets(
+            settings.rate_limit_per_second,
+            settings.rate_limit_burst,
+            settings.rate_limit_overrides,
+            max_clients=settings.rate_limit_max_clients,
+        )
+        self.api_keys = set(settings.rate_limit_api_keys) | {
+            k.removeprefix("key:") for k in settings.rate_limit_overrides if k.startswith("key:")
+        }
+
+    def classify(self, method: str, path: str) -> str:
+        for name, methods, pattern in ROUTE_CLASSES:
+            if (methods is None or method in methods) and pattern.match(path):
+                return name
+        return DEFAULT_CLASS
+
+    def under_pressure(self) -> bool:
+        return any(c.waiters for name, c in self.classes.items() if name not in LOW_PRIORITY)
+
+    def snapshot(self) -> dict:
+        return {
+            "rate_limit": self.buckets.snapshot(),
+            "route_classes": {name: c.snapshot() for name, c in sorted(self.classes.items())},
+        }
+
+
+load_shedder = LoadShedder()
+
+
+def _client_key(scope, header: bytes, api_keys: set[str]) -> str:
+    for name, value in scope.get("headers") or []:
+        if name == header and value:
+            key = value.decode("latin-1")
+            if key in api_keys:
+                return "key:" + key
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app, shedder: LoadShedder = load_shedder):
+        self.app = app
+        self.shedder = shedder
+        self.key_header = settings.rate_limit_key_header.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.load_shedding_enabled:
+            return await self.app(scope, receive, send)
+        path = scope.get("path", "")
+        if not path.startswith(API) or path.startswith(_BYPASS):
+            return await self.app(scope, receive, send)
+
+        wait = self.shedder.buckets.take(_client_key(scope, self.key_header, self.shedder.api_keys))
+        if wait:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            return await response(scope, receive, send)
+
+        name = self.shedder.classify(scope["method"], path)
+        route_class = self.shedder.classes[name]
+        try:
+            await route_class.acquire(shed_now=name in LOW_PRIORITY and self.shedder.under_pressure())
+        except Shed:
+            response = JSONResponse(
+                {"detail": "Server busy; retry later"},
+                status_code=503,
+                headers={"Retry-After": str(settings.shed_retry_after_seconds)},
+            )
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release()
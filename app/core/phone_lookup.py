@@ -0,0 +1,224 @@
+"""Reverse phone lookup: caller number -> driver(s).
+
+Two paths, same semantics:
+
+- a per-worker in-memory map keyed by every digit suffix (7+ digits) of
+  Driver.phone and active DriverPhone.phone, warmed at startup;
+- an indexed SQL query over reverse(digits) (see migration e8b4f02c6a19),
+  used while the map is cold or stale.
+
+A stored number matches when it ends with one of the lookup keys, so a
+caller ID without a country code still finds "+1 416 555 0102".
+Local phone writes call invalidate(); writes from other workers arrive as
+change events (app/core/events.py) and invalidate the tenant's map the same
+way, but only those flagged as touching a phone, name or is_active. Rebuilds
+start at most every settings.phone_lookup_rebuild_min_seconds, so a burst
+of writes (a cascade, an import) costs one reload rather than one each.
+settings.phone_lookup_ttl_seconds bounds how stale the map can get while
+the LISTEN connection is down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import bindparam, func, literal_column, select, String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import ChangeEvent, event_hub
+from app.core.tenancy import current_tenant_schema, use_tenant
+from app.core.validators import normalize_country_code, normalize_phone_number
+from app.models.driver import Driver
+from app.models.driver_phone import DriverPhone
+
+logger = logging.getLogger(__name__)
+
+MIN_SUFFIX = 7  # same floor as normalize_phone_number
+
+
+def phone_digits(value: str | None) -> str:
+    # same cleanup as normalize_phone_number, without the length rules
+    return "".join(ch for ch in (value or "") if "0" <= ch <= "9")
+
+
+def phone_lookup_keys(number: str, country_code: str | None = None) -> list[str]:
+    digits = normalize_phone_number(number)
+    keys = [digits]
+    if country_code:
+        cc = normalize_country_code(country_code)[1:]
+        if digits.startswith(cc) and len(digits) - len(cc) >= MIN_SUFFIX:
+            keys.append(digits[len(cc):])
+        else:
+            keys.append(cc + digits)
+    return keys
+
+
+def digits_reversed(col):
+    # Literal constants (not bind params) so the expression matches the index
+    return func.reverse(
+        func.regexp_replace(col, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'"))
+    )
+
+
+@dataclass(frozen=True)
+class PhoneMatch:
+    driver_id: int
+    first_name: str
+    last_name: str
+    is_active: bool
+    source: str  # "driver" (drivers.phone) | "driver_phone"
+    phone_id: int | None
+    phone: str
+    label: str | None
+    digits: str
+
+
+def _sorted(matches, keys: list[str]) -> list[PhoneMatch]:
+    exact = set(keys)
+    uniq = {(m.source, m.phone_id, m.driver_id): m for m in matches}
+    return sorted(uniq.values(), key=lambda m: (m.digits not in exact, m.driver_id, m.phone_id or 0))
+
+
+async def _load_all(db: AsyncSession) -> list[PhoneMatch]:
+    out: list[PhoneMatch] = []
+    res = await db.execute(
+        select(Driver.id, Driver.first_name, Driver.last_name, Driver.is_active, Driver.phone).where(
+            Driver.phone.is_not(None)
+        )
+    )
+    for d_id, first, last, active, phone in res:
+        out.append(PhoneMatch(d_id, first, last, active, "driver", None, phone, None, phone_digits(phone)))
+
+    res = await db.execute(
+        select(
+            Driver.id, Driver.first_name, Driver.last_name, Driver.is_active,
+            DriverPhone.id, DriverPhone.phone, DriverPhone.label,
+        )
+        .join(Driver, Driver.id == DriverPhone.driver_id)
+        .where(DriverPhone.is_active.is_(True))
+    )
+    for d_id, first, last, active, p_id, phone, label in res:
+        out.append(PhoneMatch(d_id, first, last, active, "driver_phone", p_id, phone, label, phone_digits(phone)))
+    return out
+
+
+async def query_db(db: AsyncSession, keys: list[str]) -> list[PhoneMatch]:
+    """Indexed suffix match: reverse(digits) in [reverse(key), reverse(key) || ':')."""
+    matches: list[PhoneMatch] = []
+    for n, key in enumerate(keys):
+        lo = bindparam(f"lo{n}", key[::-1], type_=String)
+        hi = bindparam(f"hi{n}", key[::-1] + ":", type_=String)  # ':' sorts right after '9'
+
+        drev = digits_reversed(Driver.phone)
+        res = await db.execute(
+            select(Driver.id, Driver.first_name, Driver.last_name, Driver.is_active, Driver.phone).where(
+                Driver.phone.is_not(None), drev.op("~>=~")(lo), drev.op("~<~")(hi)
+            )
+        )
+        for d_id, first, last, active, phone in res:
+            matches.append(PhoneMatch(d_id, first, last, active, "driver", None, phone, None, phone_digits(phone)))
+
+        prev = digits_reversed(DriverPhone.phone)
+        res = await db.execute(
+            select(
+                Driver.id, Driver.first_name, Driver.last_name, Driver.is_active,
+                DriverPhone.id, DriverPhone.phone, DriverPhone.label,
+            )
+            .join(Driver, Driver.id == DriverPhone.driver_id)
+            .where(DriverPhone.is_active.is_(True), prev.op("~>=~")(lo), prev.op("~<~")(hi))
+        )
+        for d_id, first, last, active, p_id, phone, label in res:
+            matches.append(
+                PhoneMatch(d_id, first, last, active, "driver_phone", p_id, phone, label, phone_digits(phone))
+            )
+    return _sorted(matches, keys)
+
+
+@dataclass
+class _Snapshot:
+    generation: int
+    built_at: float
+    by_suffix: dict[str, list[PhoneMatch]] = field(default_factory=dict)
+
+
+class PhoneLookupCache:
+    def __init__(self, ttl_seconds: int, rebuild_min_seconds: float = 0):
+        self.ttl_seconds = ttl_seconds
+        self.rebuild_min_seconds = rebuild_min_seconds
+        self._last_build: dict[str | None, float] = {}
+        self._snapshots: dict[str | None, _Snapshot] = {}
+        self._generation: dict[str | None, int] = defaultdict(int)
+        self._rebuilding: dict[str | None, asyncio.Task] = {}
+
+    def invalidate(self) -> None:
+        self._generation[current_tenant_schema()] += 1
+
+    def on_change(self, ev: ChangeEvent | None) -> None:
+        if ev is None:
+            # events may have been missed
+            for tenant in list(self._snapshots):
+                self._generation[tenant] += 1
+        elif ev.lookup and ev.entity in ("driver", "driver_phone"):
+            self._generation[ev.schema if settings.tenancy_enabled else None] += 1
+
+    def _fresh(self, tenant: str | None) -> _Snapshot | None:
+        snap = self._snapshots.get(tenant)
+        if snap is None or snap.generation != self._generation[tenant]:
+            return None
+        if time.monotonic() - snap.built_at > self.ttl_seconds:
+            return None
+        return snap
+
+    async def _build(self, tenant: str | None) -> None:
+        generation = self._generation[tenant]
+        with use_tenant(tenant):
+            async with AsyncSessionLocal() as db:
+                rows = await _load_all(db)
+        by_suffix: dict[str, list[PhoneMatch]] = defaultdict(list)
+        for m in rows:
+            for n in range(MIN_SUFFIX, len(m.digits) + 1):
+                by_suffix[m.digits[-n:]].append(m)
+        self._snapshots[tenant] = _Snapshot(generation, time.monotonic(), dict(by_suffix))
+
+    def _schedule_rebuild(self, tenant: str | None) -> None:
+        task = self._rebuilding.get(tenant)
+        if task is not None and not task.done():
+            return
+
+        async def run():
+            # debounce: later invalidations in the wait are covered by this build
+            wait = self._last_build.get(tenant, float("-inf")) + self.rebuild_min_seconds - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_build[tenant] = time.monotonic()
+            try:
+                await self._build(tenant)
+            except Exception:
+                logger.warning("phone lookup rebuild failed", exc_info=True)
+
+        self._rebuilding[tenant] = asyncio.create_task(run())
+
+    async def warm(self) -> None:
+        await self._build(current_tenant_schema())
+
+    async def lookup(self, db: AsyncSession, keys: list[str]) -> list[PhoneMatch]:
+        tenant = current_tenant_schema()
+        snap = self._fresh(tenant)
+        if snap is None:
+            self._schedule_rebuild(tenant)
+            return await query_db(db, keys)
+        matches = [m for key in keys for m in snap.by_suffix.get(key, ())]
+        return _sorted(matches, keys)
+
+
+phone_lookup = PhoneLookupCache(
+    ttl_seconds=settings.phone_lookup_ttl_seconds,
+    rebuild_min_seconds=settings.phone_lookup_rebuild_min_seconds,
+)
+event_hub.add_listener(phone_lookup.on_change)
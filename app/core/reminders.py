@@ -0,0 +1,384 @@
+"""Driver document expiry reminders.
+
+A document gets one reminder per tier (settings.expiry_reminder_tiers, days
+before expiry_date; 0 = expired) as it crosses it, and only the most urgent
+tier it has reached: a run that was missed for a week does not send 60 and
+30 at once.
+
+Each tier keeps a watermark (reminder_watermarks "tier:<days>"): expiry
+dates up to it have been scanned for that tier. A run scans, per tier,
+
+    watermark < expiry_date <= today + tier
+
+minus dates already inside the next, more urgent tier, in (expiry_date, id)
+keyset batches over the partial index ix_driver_documents_expiry_open. A
+daily run therefore reads one day of expiry dates per tier, whatever the
+table size, and a notified row is never read again by the window scan.
+
+Documents created or edited behind a watermark (new upload expiring next
+week, corrected expiry_date) are picked up from the change feed
+(app.core.changes) since the previous run instead.
+
+Every reminder is inserted into document_reminders, unique on (document,
+tier, expiry_date), before it is handed to the sink; only newly inserted
+rows are sent, and the batch commits after the sink accepted it, so reruns
+are idempotent and a failing sink leaves the batch for the next run (a
+commit failing after a send may repeat that batch: at-least-once).
+
+One run per tenant at a time (advisory lock). Runs daily in every API
+worker (ReminderScheduler; one wins the lock), on demand via
+POST /expiry-reminders/run, or from app.jobs.expiry_reminders.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import urllib.request
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.changes import ChangeKey, changed_keys, decode_cursor, encode_cursor
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.tenancy import current_tenant_schema, tenant_schemas, use_tenant
+from app.models.document_reminder import DocumentReminder, ReminderWatermark
+from app.models.driver import Driver
+from app.models.driver_document import DriverDocument
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "expiry_reminders"
+CHANGES = "changes"
+
+
+@dataclass
+class Reminder:
+    document_id: int
+    driver_id: int
+    driver_name: str
+    doc_type: str
+    title: str | None
+    expiry_date: date
+    days_left: int
+    tier: int
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "expiry_date": self.expiry_date.isoformat()}
+
+
+class LogSink:
+    name = "log"
+
+    async def send(self, reminders: list[Reminder]) -> None:
+        for r in reminders:
+            logger.info(
+                "document %d (%s) of driver %d %s expires %s (%d days, tier %d)",
+                r.document_id, r.doc_type, r.driver_id, r.driver_name, r.expiry_date, r.days_left, r.tier,
+            )
+
+
+class EmailSink:
+    """Stub: renders one message per driver and logs it; nothing is sent."""
+
+    name = "email"
+
+    def __init__(self, to: str | None):
+        self.to = to or "compliance@localhost"
+
+    async def send(self, reminders: list[Reminder]) -> None:
+        by_driver: dict[int, list[Reminder]] = defaultdict(list)
+        for r in reminders:
+            by_driver[r.driver_id].append(r)
+        for rs in by_driver.values():
+            subject = f"{len(rs)} document(s) of {rs[0].driver_name} expiring"
+            body = "\n".join(f"- {r.doc_type} {r.title or ''}: {r.expiry_date} ({r.days_left} days)" for r in rs)
+            logger.info("email to %s: %s\n%s", self.to, subject, body)
+
+
+class WebhookSink:
+    """Stub: one JSON POST per batch, no signing or retries of its own (a
+    failed batch is retried by the next run)."""
+
+    name = "webhook"
+
+    def __init__(self, url: str | None, timeout: float):
+        if not url:
+            raise ValueError("expiry_reminder_webhook_url is not set")
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, reminders: list[Reminder]) -> None:
+        body = json.dumps({"reminders": [r.as_dict() for r in reminders]}).encode()
+        await asyncio.to_thread(self._post, body)
+
+    def _post(self, body: bytes) -> None:
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            if resp.status >= 300:
+                raise RuntimeError(f"webhook answered {resp.status}")
+
+
+SINKS = {
+    "log": LogSink,
+    "email": lambda: EmailSink(settings.expiry_reminder_email_to),
+    "webhook": lambda: WebhookSink(settings.expiry_reminder_webhook_url, settings.expiry_reminder_webhook_timeout_seconds),
+}
+
+
+def get_sink(name: str | None = None):
+    name = name or settings.expiry_reminder_sink
+    factory = SINKS.get(name)
+    if factory is None:
+        raise ValueError(f"unknown reminder sink {name!r}; one of {', '.join(SINKS)}")
+    return factory()
+
+
+def tiers() -> list[int]:
+    return sorted(set(settings.expiry_reminder_tiers), reverse=True)
+
+
+def tier_for(days_left: int, tier_list: list[int]) -> int | None:
+    """Most urgent tier reached, None if none yet."""
+    reached = [t for t in tier_list if days_left <= t]
+    return min(reached) if reached else None
+
+
+def window(tier_list: list[int], i: int, today: date, through: date | None) -> tuple[date, date]:
+    """(lower, upper]: expiry dates to scan for tier_list[i] today."""
+    upper = today + timedelta(days=tier_list[i])
+    if i + 1 < len(tier_list):
+        # closer dates belong to the next tier
+        floor = today + timedelta(days=tier_list[i + 1])
+        return (max(through, floor) if through else floor), upper
+    # most urgent tier: catch up from the watermark; first run looks back a little
+    return through or today - timedelta(days=settings.expiry_reminder_lookback_days + 1), upper
+
+
+def _open_documents():
+    return (
+        select(
+            DriverDocument.id,
+            DriverDocument.driver_id,
+            DriverDocument.doc_type,
+            DriverDocument.title,
+            DriverDocument.expiry_date,
+            Driver.first_name,
+            Driver.last_name,
+        )
+        .join(Driver, Driver.id == DriverDocument.driver_id)
+        .where(
+            DriverDocument.is_active.is_(True),
+            DriverDocument.is_current.is_(True),
+            DriverDocument.expiry_date.is_not(None),
+        )
+    )
+
+
+def _reminder(row, today: date, tier: int) -> Reminder:
+    return Reminder(
+        document_id=row.id,
+        driver_id=row.driver_id,
+        driver_name=f"{row.first_name} {row.last_name}",
+        doc_type=row.doc_type,
+        title=row.title,
+        expiry_date=row.expiry_date,
+        days_left=(row.expiry_date - today).days,
+        tier=tier,
+    )
+
+
+async def _deliver(db, reminders: list[Reminder], sink) -> list[Reminder]:
+    """Record and send the reminders not sent before; the caller commits."""
+    if not reminders:
+        return []
+    stmt = (
+        pg_insert(DocumentReminder)
+        .values(
+            [
+                {
+                    "driver_document_id": r.document_id,
+                    "tier": r.tier,
+                    "expiry_date": r.expiry_date,
+                    "days_left": r.days_left,
+                    "sink": sink.name,
+                }
+                for r in reminders
+            ]
+        )
+        .on_conflict_do_nothing(constraint="uq_document_reminders_doc_tier_expiry")
+        .returning(DocumentReminder.driver_document_id)
+    )
+    new = set((await db.execute(stmt)).scalars())
+    fresh = [r for r in reminders if r.document_id in new]
+    if fresh:
+        await sink.send(fresh)
+    return fresh
+
+
+def _count(stats: dict, sent: list[Reminder]) -> None:
+    stats["sent"] += len(sent)
+    for r in sent:
+        stats["by_tier"][r.tier] += 1
+
+
+async def _save_mark(db, name: str, through_date: date | None = None, cursor: str | None = None) -> None:
+    values = {"name": name, "through_date": through_date, "cursor": cursor}
+    stmt = pg_insert(ReminderWatermark).values(**values)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ReminderWatermark.name],
+            set_={k: stmt.excluded[k] for k in ("through_date", "cursor")} | {"updated_at": text("now()")},
+        )
+    )
+
+
+async def _scan_tier(tier_list: list[int], i: int, today: date, sink, stats: dict) -> None:
+    tier = tier_list[i]
+    name = f"tier:{tier}"
+    async with AsyncSessionLocal() as db:
+        mark = await db.get(ReminderWatermark, name)
+    lower, upper = window(tier_list, i, today, mark.through_date if mark else None)
+    if lower < upper:
+        batch = settings.expiry_reminder_batch_size
+        last: tuple[date, int] | None = None
+        while True:
+            q = _open_documents().where(DriverDocument.expiry_date <= upper)
+            if last is None:
+                q = q.where(DriverDocument.expiry_date > lower)
+            else:
+                q = q.where(tuple_(DriverDocument.expiry_date, DriverDocument.id) > tuple_(*last))
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(q.order_by(DriverDocument.expiry_date, DriverDocument.id).limit(batch))).all()
+                sent = await _deliver(db, [_reminder(r, today, tier) for r in rows], sink)
+                await db.commit()
+            stats["scanned"] += len(rows)
+            _count(stats, sent)
+            if len(rows) < batch:
+                break
+            last = (rows[-1].expiry_date, rows[-1].id)
+    if mark is None or mark.through_date is None or upper > mark.through_date:
+        async with AsyncSessionLocal() as db:
+            await _save_mark(db, name, through_date=upper)
+            await db.commit()
+
+
+async def _scan_changes(tier_list: list[int], today: date, sink, stats: dict) -> None:
+    async with AsyncSessionLocal() as db:
+        mark = await db.get(ReminderWatermark, CHANGES)
+        if mark is None or not mark.cursor:
+            # first run: existing rows are covered by the window scans
+            latest = (
+                await db.execute(
+                    select(DriverDocument.change_xid, DriverDocument.change_seq)
+                    .order_by(DriverDocument.change_xid.desc(), DriverDocument.change_seq.desc())
+                    .limit(1)
+                )
+            ).first()
+            key = ChangeKey(*latest) if latest else ChangeKey(0, 0)
+            await _save_mark(db, CHANGES, cursor=encode_cursor(key))
+            await db.commit()
+            return
+    after = decode_cursor(mark.cursor)
+    oldest = today - timedelta(days=settings.expiry_reminder_lookback_days)
+    batch = settings.expiry_reminder_batch_size
+    while True:
+        async with AsyncSessionLocal() as db:
+            refs, has_more = await changed_keys(db, after, batch, ["driver_document"])
+            if not refs:
+                break
+            rows = (
+                await db.execute(
+                    _open_documents().where(
+                        DriverDocument.id.in_([r.id for r in refs]),
+                        DriverDocument.expiry_date >= oldest,
+                        DriverDocument.expiry_date <= today + timedelta(days=tier_list[0]),
+                    )
+                )
+            ).all()
+            reminders = []
+            for r in rows:
+                tier = tier_for((r.expiry_date - today).days, tier_list)
+                if tier is not None:
+                    reminders.append(_reminder(r, today, tier))
+            sent = await _deliver(db, reminders, sink)
+            after = refs[-1].key
+            await _save_mark(db, CHANGES, cursor=encode_cursor(after))
+            await db.commit()
+        stats["changed_documents"] += len(refs)
+        _count(stats, sent)
+        if not has_more:
+            break
+
+
+async def run_reminders(sink=None, today: date | None = None) -> dict | None:
+    """One run for the current tenant; None if another run holds the lock."""
+    today = today or datetime.now(timezone.utc).date()
+    sink = sink or get_sink()
+    tier_list = tiers()
+    stats = {"date": today.isoformat(), "sink": sink.name, "scanned": 0, "changed_documents": 0, "sent": 0,
+             "by_tier": {t: 0 for t in tier_list}}
+    lock_key = f"{LOCK_KEY}:{current_tenant_schema() or 'public'}"
+    async with engine.connect() as lock_conn:
+        if not await lock_conn.scalar(text("SELECT pg_try_advisory_lock(hashtext(:k))"), {"k": lock_key}):
+            return None
+        try:
+            await _scan_changes(tier_list, today, sink, stats)
+            for i in range(len(tier_list)):
+                await _scan_tier(tier_list, i, today, sink, stats)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext(:k))"), {"k": lock_key})
+    return stats
+
+
+def _seconds_until(hour_utc: int, now: datetime | None = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    at = now.replace(hour=hour_utc, minute=0, second=0, microsecond=0)
+    if at <= now:
+        at += timedelta(days=1)
+    return (at - now).total_seconds()
+
+
+class ReminderScheduler:
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.stats = {"runs": 0, "failures": 0, "last_run_at": None, "last_result": None}
+
+    async def run_all(self, sink=None) -> dict:
+        results = {}
+        for schema in await tenant_schemas():
+            with use_tenant(schema):
+                results[schema or "public"] = await run_reminders(sink)
+        return results
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(_seconds_until(settings.expiry_reminder_hour_utc))
+            try:
+                self.stats["last_result"] = await self.run_all()
+                self.stats["runs"] += 1
+            except Exception:
+                self.stats["failures"] += 1
+                logger.exception("expiry reminder run failed")
+            self.stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+reminder_scheduler = ReminderScheduler()
@@ -0,0 +1,162 @@
+"""Read-replica routing with read-your-writes.
+
+Writes always go to the primary. After a request commits, the middleware
+stamps the response with the primary's current WAL LSN (cookie + header).
+Read-only handlers use get_read_db, which picks the replica only when:
+
+- a replica is configured and reachable,
+- its replay lag is under settings.replica_max_lag_seconds,
+- it has replayed at least the LSN the client presented (if any).
+
+Otherwise the read falls back to the primary.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+LSN_COOKIE = "erp_min_lsn"
+LSN_HEADER = "X-Min-LSN"
+
+
+def parse_lsn(value: str | None) -> int | None:
+    """'16/B374D848' -> int. Returns None for missing/garbage values."""
+    if not value:
+        return None
+    hi, sep, lo = value.strip().partition("/")
+    if not sep:
+        return None
+    try:
+        return (int(hi, 16) << 32) | int(lo, 16)
+    except ValueError:
+        return None
+
+
+def required_lsn(request: Request) -> int | None:
+    return parse_lsn(request.headers.get(LSN_HEADER) or request.cookies.get(LSN_COOKIE))
+
+
+@dataclass(frozen=True)
+class ReplicaStatus:
+    healthy: bool
+    in_recovery: bool = False
+    replay_lsn: int | None = None
+    lag_seconds: float | None = None
+
+
+class ReplicaMonitor:
+    """Caches the replica's replay position so reads don't probe on every request."""
+
+    def __init__(self, replica: AsyncEngine | None, max_lag_seconds: float, ttl_seconds: float):
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.ttl_seconds = ttl_seconds
+        self._status: ReplicaStatus | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _probe(self) -> ReplicaStatus:
+        try:
+            async with self.replica.connect() as conn:
+                row = (
+                    await conn.execute(
+                        text(
+                            "SELECT pg_is_in_recovery(), "
+                            "pg_last_wal_replay_lsn()::text, "
+                            "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                        )
+                    )
+                ).one()
+        except Exception:
+            logger.warning("replica probe failed; routing reads to primary", exc_info=True)
+            return ReplicaStatus(healthy=False)
+
+        in_recovery, replay_lsn, lag = row
+        return ReplicaStatus(
+            healthy=True,
+            in_recovery=bool(in_recovery),
+            replay_lsn=parse_lsn(replay_lsn),
+            lag_seconds=float(lag) if lag is not None else None,
+        )
+
+    async def status(self) -> ReplicaStatus:
+        if time.monotonic() - self._checked_at < self.ttl_seconds and self._status is not None:
+            return self._status
+        async with self._lock:
+            if time.monotonic() - self._checked_at >= self.ttl_seconds or self._status is None:
+                self._status = await self._probe()
+                self._checked_at = time.monotonic()
+        return self._status
+
+    async def can_serve(self, min_lsn: int | None) -> bool:
+        if self.replica is None:
+            return False
+        st = await self.status()
+        if not st.healthy:
+            return False
+        if not st.in_recovery:
+            # Not a physical standby (e.g. a second local database standing in
+            # for one in dev/tests): nothing to measure, treat as caught up.
+            return True
+        if st.lag_seconds is None or st.lag_seconds > self.max_lag_seconds:
+            return False
+        if min_lsn is not None and (st.replay_lsn is None or st.replay_lsn < min_lsn):
+            return False
+        return True
+
+
+replica_monitor = ReplicaMonitor(
+    replica_engine,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    ttl_seconds=settings.replica_status_ttl_seconds,
+)
+
+
+# DB dependency for read-only handlers
+async def get_read_db(request: Request) -> AsyncSession:
+    use_replica = await replica_monitor.can_serve(required_lsn(request))
+    async with AsyncSessionLocal() as session:
+        session.info["use_replica"] = use_replica
+        yield session
+
+
+async def current_primary_lsn() -> str:
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar_one()
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """After a committed write, hand the client the primary LSN it must see."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if replica_engine is None or not getattr(request.state, "db_committed", False):
+            return response
+        try:
+            lsn = await current_primary_lsn()
+        except Exception:
+            logger.warning("could not read primary LSN after commit", exc_info=True)
+            return response
+        response.headers[LSN_HEADER] = lsn
+        response.set_cookie(
+            LSN_COOKIE,
+            lsn,
+            max_age=settings.read_your_writes_seconds,
+            httponly=True,
+            samesite="lax",
+        )
+        return response
@@ -5,10 +5,13 @@ import os
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
 from fastapi import UploadFile
 
 DEFAULT_LOCAL_DIR = Path("/home/admin/trucking_erp/storage/driver_docs")
+# in-progress resumable uploads (app.core.uploads); not blobs yet
+UPLOADS_SUBDIR = ".uploads"
 
 
 @dataclass(frozen=True)
@@ -26,31 +29,113 @@ def _safe_filename(name: str | None) -> str:
     return os.path.basename(name).replace("\x00", "")
 
 
-def _local_dir() -> Path:
+def storage_root() -> Path:
     d = os.getenv("LOCAL_STORAGE_DIR")
     return Path(d) if d else DEFAULT_LOCAL_DIR
 
 
-async def save_driver_doc_upload_local(file: UploadFile) -> StoredFile:
-    base = _local_dir()
-    base.mkdir(parents=True, exist_ok=True)
+def storage_path(storage_key: str) -> Path:
+    return storage_root() / storage_key
 
-    original = _safe_filename(file.filename)
-    ext = Path(original).suffix.lower()[:10]
-    key = f"{uuid.uuid4().hex}{ext}"
-    dest = base / key
 
+def new_storage_key(original_filename: str | None) -> str:
+    ext = Path(_safe_filename(original_filename)).suffix.lower()[:10]
+    return f"{uuid.uuid4().hex}{ext}"
+
+
+def upload_part_path(upload_id: str) -> Path:
+    return storage_root() / UPLOADS_SUBDIR / f"{upload_id}.part"
+
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024, before_read=None) -> tuple[int, str]:
+    """(size, sha256 hex) of a stored file. before_read(n) is called ahead of
+    each chunk read (rate limiting)."""
     h = hashlib.sha256()
     size = 0
-
-    with open(dest, "wb") as f:
+    with open(path, "rb") as f:
         while True:
-            chunk = await file.read(1024 * 1024)  # 1MB
+            if before_read is not None:
+                before_read(chunk_size)
+            chunk = f.read(chunk_size)
             if not chunk:
                 break
-            f.write(chunk)
             h.update(chunk)
             size += len(chunk)
+    return size, h.hexdigest()
+
+
+def remove_stored(storage_key: str) -> None:
+    try:
+        storage_path(storage_key).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def save_stream_local(
+    src: BinaryIO,
+    filename: str | None,
+    content_type: str | None,
+    max_bytes: int | None = None,
+) -> StoredFile:
+    """Blocking copy + sha256 of one file object (run it in a thread). A
+    partially written blob is removed if anything fails."""
+    base = storage_root()
+    base.mkdir(parents=True, exist_ok=True)
+
+    original = _safe_filename(filename)
+    key = new_storage_key(original)
+    dest = base / key
+
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest, "wb") as f:
+            while True:
+                chunk = src.read(1024 * 1024)  # 1MB
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise ValueError(f"File exceeds {max_bytes} bytes")
+                f.write(chunk)
+                h.update(chunk)
+    except BaseException:
+        remove_stored(key)
+        raise
+
+    return StoredFile(
+        storage_key=key,
+        original_filename=original,
+        content_type=content_type,
+        file_size_bytes=size,
+        sha256=h.hexdigest(),
+    )
+
+
+async def save_driver_doc_upload_local(file: UploadFile) -> StoredFile:
+    base = storage_root()
+    base.mkdir(parents=True, exist_ok=True)
+
+    original = _safe_filename(file.filename)
+    key = new_storage_key(original)
+    dest = base / key
+
+    h = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(dest, "wb") as f:
+            while True:
+                chunk = await file.read(1024 * 1024)  # 1MB
+                if not chunk:
+                    break
+                f.write(chunk)
+                h.update(chunk)
+                size += len(chunk)
+    except BaseException:
+        # client gone or disk full: don't leave half a blob behind
+        remove_stored(key)
+        raise
 
     return StoredFile(
         storage_key=key,
@@ -0,0 +1,167 @@
+"""Schema-per-tenant routing on one shared pool.
+
+TenantMiddleware resolves the tenant from the request subdomain or, on hosts
+without a tenant subdomain, the X-Tenant header (a header naming a different
+tenant than the subdomain is rejected with 400, as is a tenant without a
+schema), and stores its schema in a context variable. Every transaction a
+RoutingSession begins then runs `SET LOCAL search_path` to that schema, so:
+
+- all tenants share the same engine/pool; nothing tenant-specific survives
+  on a pooled connection after COMMIT/ROLLBACK,
+- SQL text is identical for every tenant (tables stay unqualified), so the
+  SQLAlchemy compiled cache and asyncpg's per-connection prepared statement
+  cache are shared instead of growing per tenant, which schema_translate_map
+  would do.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.database import RoutingSession, engine
+
+_tenant_slug = re.compile(r"[a-z0-9][a-z0-9_-]{0,40}")
+
+# Reachable without a tenant (load balancer probes, docs)
+_PUBLIC_PATHS = ("/", "/docs", "/openapi.json", "/api/v1/health")
+
+_current_schema: ContextVar[str | None] = ContextVar("tenant_schema", default=None)
+
+
+def tenant_schema(slug: str) -> str:
+    v = (slug or "").strip().lower()
+    if not _tenant_slug.fullmatch(v):
+        raise ValueError("invalid tenant")
+    return settings.tenant_schema_prefix + v.replace("-", "_")
+
+
+def current_tenant_schema() -> str | None:
+    return _current_schema.get()
+
+
+@contextmanager
+def use_tenant(schema: str | None):
+    """For jobs/scripts running outside a request."""
+    token = _current_schema.set(schema)
+    try:
+        yield
+    finally:
+        _current_schema.reset(token)
+
+
+async def tenant_schemas() -> list[str | None]:
+    """Every tenant's schema, for background work that covers all tenants;
+    [None] (the default schema) without tenancy."""
+    if not settings.tenancy_enabled:
+        return [None]
+    async with engine.connect() as conn:
+        res = await conn.execute(
+            text("SELECT nspname FROM pg_namespace WHERE left(nspname, length(:p)) = :p ORDER BY nspname"),
+            {"p": settings.tenant_schema_prefix},
+        )
+        return list(res.scalars())
+
+
+def _subdomain_slug(host: str | None) -> str | None:
+    base = settings.tenant_base_domain
+    if not host or not base:
+        return None
+    hostname = host.split(":", 1)[0].lower()
+    suffix = "." + base.lower()
+    if not hostname.endswith(suffix):
+        return None
+    sub = hostname[: -len(suffix)]
+    # only the left-most label; nested subdomains are not tenants
+    return sub if sub and "." not in sub else None
+
+
+class _KnownSchemas:
+    """tenant_schemas(), cached; reloaded on a miss at most every
+    settings.tenant_list_cache_seconds."""
+
+    def __init__(self):
+        self._schemas: frozenset[str | None] = frozenset()
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def contains(self, schema: str) -> bool:
+        if schema in self._schemas:
+            return True
+        if time.monotonic() - self._loaded_at < settings.tenant_list_cache_seconds:
+            return False
+        async with self._lock:
+            if time.monotonic() - self._loaded_at >= settings.tenant_list_cache_seconds:
+                self._schemas = frozenset(await tenant_schemas())
+                self._loaded_at = time.monotonic()
+        return schema in self._schemas
+
+
+known_schemas = _KnownSchemas()
+
+
+def resolve_tenant_slug(host: str | None, header_value: str | None) -> str | None:
+    """The subdomain's tenant; the header only where the host names none.
+
+    Raises ValueError when the header names a different tenant than the
+    subdomain, so a client on one tenant's host cannot reach another.
+    """
+    sub = _subdomain_slug(host)
+    if sub is None:
+        return header_value or None
+    if header_value and header_value.strip().lower() != sub:
+        raise ValueError("Tenant header does not match host")
+    return sub
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _apply_search_path(session, transaction, connection):
+    schema = _current_schema.get()
+    if schema is not None:
+        # schema is built from a validated slug, quoting is belt and braces
+        connection.exec_driver_sql(f'SET LOCAL search_path TO "{schema}"')
+
+
+class TenantMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.tenant_header.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not settings.tenancy_enabled:
+            return await self.app(scope, receive, send)
+
+        path = scope.get("path", "")
+        if path in _PUBLIC_PATHS or path.startswith("/api/v1/health"):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        host = headers.get(b"host", b"").decode("latin-1")
+        header_value = headers.get(self.header, b"").decode("latin-1") or None
+
+        try:
+            slug = resolve_tenant_slug(host, header_value)
+        except ValueError as e:
+            response = JSONResponse({"detail": str(e)}, status_code=400)
+            return await response(scope, receive, send)
+        try:
+            schema = tenant_schema(slug) if slug else None
+        except ValueError:
+            schema = None
+        # a well-formed slug without a schema would fail every query with 500
+        if schema is None or not await known_schemas.contains(schema):
+            response = JSONResponse({"detail": "Unknown tenant"}, status_code=400)
+            return await response(scope, receive, send)
+
+        token = _current_schema.set(schema)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_schema.reset(token)
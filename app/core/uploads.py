@@ -0,0 +1,148 @@
+"""Resumable uploads: chunk I/O and incremental sha256 (app.routers.uploads).
+
+Chunks are written in place into one pre-created part file with pwrite, so
+they may arrive in any order and nothing already stored is rewritten.
+
+The file's sha256 is computed as chunks arrive. sha256 is sequential, so
+each worker keeps a hasher per open session that has consumed the
+contiguous prefix [0, hashed_upto): a chunk starting at hashed_upto is fed
+from the request body it came in; chunks that arrived earlier out of order
+are read back from disk once the gap before them is filled. Finalize then
+only digests what is left, which for a sequential client is nothing.
+
+Hashers are in-process state. A chunk served by another worker (or a
+restart, or LRU eviction) leaves this worker's hasher behind; it catches up
+from disk when it next sees a chunk or at finalize, so the result is always
+correct, only cheaper when a session's requests stick to one worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+from app.core.config import settings
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+READ_CHUNK = 1024 * 1024
+
+
+def parse_content_range(value: str | None) -> tuple[int, int, int]:
+    """'bytes a-b/total' -> (start, end exclusive, total)."""
+    m = _CONTENT_RANGE.match((value or "").strip())
+    if not m:
+        raise ValueError("Content-Range must be 'bytes <first>-<last>/<total>'")
+    first, last, total = (int(g) for g in m.groups())
+    if first > last or last >= total:
+        raise ValueError("Content-Range is not a valid byte range")
+    return first, last + 1, total
+
+
+def merge_ranges(chunks: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """(offset, length) pairs -> sorted, merged [start, end) ranges."""
+    ranges: list[tuple[int, int]] = []
+    for offset, length in sorted(chunks):
+        if ranges and offset == ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], offset + length)
+        else:
+            ranges.append((offset, offset + length))
+    return ranges
+
+
+def create_part(path: Path, size: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.truncate(size)  # sparse; chunks fill it in
+
+
+def write_chunk(path: Path, offset: int, data: bytes) -> None:
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        view = memoryview(data)
+        while view:
+            n = os.pwrite(fd, view, offset)
+            view, offset = view[n:], offset + n
+    finally:
+        os.close(fd)
+
+
+def remove_part(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _Hasher:
+    def __init__(self):
+        self.h = hashlib.sha256()
+        self.upto = 0
+        self.lock = asyncio.Lock()
+
+
+def _feed_from_disk(h, path: Path, start: int, end: int) -> None:
+    with open(path, "rb") as f:
+        f.seek(start)
+        left = end - start
+        while left:
+            block = f.read(min(READ_CHUNK, left))
+            if not block:
+                raise OSError(f"{path} is shorter than {end} bytes")
+            h.update(block)
+            left -= len(block)
+
+
+class IncrementalHashers:
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._hashers: OrderedDict[str, _Hasher] = OrderedDict()
+
+    def _get(self, upload_id: str) -> _Hasher:
+        hasher = self._hashers.get(upload_id)
+        if hasher is None:
+            hasher = self._hashers[upload_id] = _Hasher()
+            while len(self._hashers) > self.max_sessions:
+                self._hashers.popitem(last=False)
+        else:
+            self._hashers.move_to_end(upload_id)
+        return hasher
+
+    async def _advance(self, hasher: _Hasher, path: Path, ranges: list[tuple[int, int]], data_at: int = -1, data: bytes = b"") -> None:
+        """Hash forward through the received prefix. Bytes at data_at come
+        from memory; everything else up to the end of the prefix from disk."""
+        prefix_end = ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+        if hasher.upto >= prefix_end:
+            return
+        if data_at == hasher.upto and data:
+            await asyncio.to_thread(hasher.h.update, data)  # hashlib drops the GIL
+            hasher.upto += len(data)
+        if hasher.upto < prefix_end:
+            await asyncio.to_thread(_feed_from_disk, hasher.h, path, hasher.upto, prefix_end)
+            hasher.upto = prefix_end
+
+    async def chunk_stored(self, upload_id: str, path: Path, offset: int, data: bytes, ranges: list[tuple[int, int]]) -> None:
+        """Called after a chunk is durably recorded; ranges include it."""
+        if upload_id not in self._hashers and offset != 0:
+            # another worker (or a previous process) owns this session's
+            # prefix; don't re-read it here, finalize catches up if needed
+            return
+        hasher = self._get(upload_id)
+        async with hasher.lock:
+            await self._advance(hasher, path, ranges, offset, data)
+
+    async def digest(self, upload_id: str, path: Path, total_size: int) -> str:
+        """sha256 of the complete part file."""
+        hasher = self._get(upload_id)
+        async with hasher.lock:
+            await self._advance(hasher, path, [(0, total_size)])
+            return hasher.h.hexdigest()
+
+    def forget(self, upload_id: str) -> None:
+        self._hashers.pop(upload_id, None)
+
+
+upload_hashers = IncrementalHashers(settings.upload_max_hashers)
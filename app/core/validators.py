@@ -1,6 +1,8 @@
 import re
+import sys
+from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Optional
+from typing import Iterable, Optional
 
 
 _phone_keep = re.compile(r"[^0-9+]+")
@@ -63,6 +65,8 @@ def parse_date_flexible(value: Optional[str]) -> Optional[date]:
 
     # Reject ambiguous formats like 2312025 (7 digits) or DDMMYYYY without separators
     raise ValueError("Invalid date format. Use YYYY-MM-DD, MM/DD/YYYY, or 8 digits MMDDYYYY.")
+
+
 def normalize_name(value: str) -> str:
     # Trim, collapse multiple spaces, keep letters/numbers/common name chars
     v = (value or "").strip()
@@ -72,3 +76,113 @@ def normalize_name(value: str) -> str:
     if len(v) > 100:
         raise ValueError("name must be at most 100 characters")
     return v
+
+
+# ---- Column-wise variants (imports / sync jobs) ----
+# Same results and error messages as the scalar functions above, but one
+# call per column, and regex shape dispatch instead of try/except cascades.
+
+@dataclass(frozen=True)
+class BatchResult:
+    values: list          # normalized value per index; None where errors has the index
+    errors: dict[int, str]
+
+
+_cc_shape = re.compile(r"\+?[0-9]{1,4}")
+_not_ascii_digit = re.compile(r"[^0-9]+")
+
+_iso_shape = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+_us_shape = re.compile(r"([0-9]{1,2})([/-])([0-9]{1,2})\2([0-9]{4})")
+_eight_digits = re.compile(r"[0-9]{8}")
+
+# date.fromisoformat() accepts YYYYMMDD from 3.11 on
+_ISO_BASIC = sys.version_info >= (3, 11)
+
+_DATE_ERROR = "Invalid date format. Use YYYY-MM-DD, MM/DD/YYYY, or 8 digits MMDDYYYY."
+
+
+def normalize_country_codes(values: Iterable[str]) -> BatchResult:
+    out: list = []
+    errors: dict[int, str] = {}
+    fullmatch = _cc_shape.fullmatch
+    for i, value in enumerate(values):
+        v = (value or "").strip()
+        if not v:
+            errors[i] = "country_code is required"
+            out.append(None)
+        elif fullmatch(v):
+            out.append(v if v[0] == "+" else "+" + v)
+        else:
+            errors[i] = "country_code must look like +1, +52, +44"
+            out.append(None)
+    return BatchResult(out, errors)
+
+
+def normalize_phone_numbers(values: Iterable[str]) -> BatchResult:
+    out: list = []
+    errors: dict[int, str] = {}
+    sub = _not_ascii_digit.sub
+    for i, value in enumerate(values):
+        v = (value or "").strip()
+        if not v:
+            errors[i] = "phone_number is required"
+            out.append(None)
+            continue
+        v = sub("", v)
+        if 7 <= len(v) <= 15:
+            out.append(v)
+        else:
+            errors[i] = "phone_number must be 7 to 15 digits after cleanup"
+            out.append(None)
+    return BatchResult(out, errors)
+
+
+def parse_dates_flexible(values: Iterable[Optional[str]]) -> BatchResult:
+    out: list = []
+    errors: dict[int, str] = {}
+    for i, value in enumerate(values):
+        if value is None:
+            out.append(None)
+            continue
+        v = str(value).strip()
+        if not v:
+            out.append(None)
+            continue
+
+        parsed = None
+        error = _DATE_ERROR
+        if m := _iso_shape.fullmatch(v):
+            try:
+                parsed = date(int(m[1]), int(m[2]), int(m[3]))
+            except ValueError:
+                pass
+        elif m := _us_shape.fullmatch(v):
+            try:
+                parsed = date(int(m[4]), int(m[1]), int(m[3]))
+            except ValueError:
+                pass
+        elif _eight_digits.fullmatch(v):
+            if _ISO_BASIC:
+                try:
+                    parsed = date(int(v[0:4]), int(v[4:6]), int(v[6:8]))
+                except ValueError:
+                    pass
+            if parsed is None:
+                # scalar lets date() raise here, with date()'s own message
+                try:
+                    parsed = date(int(v[4:8]), int(v[0:2]), int(v[2:4]))
+                except ValueError as e:
+                    error = str(e)
+        else:
+            # everything else goes to the scalar parser: date.fromisoformat
+            # accepts more shapes (week dates, times, non-ASCII digits, ...)
+            # than any regex here would keep in step with
+            try:
+                parsed = parse_date_flexible(v)
+            except ValueError as e:
+                error = str(e)
+
+        if parsed is None:
+            errors[i] = error
+        out.append(parsed)
+    return BatchResult(out, errors)
@@ -0,0 +1,392 @@
+"""Lock-aware helpers for alembic revisions on large, busy tables.
+
+Plain op.create_index / ALTER TABLE hold locks that block writes (or reads)
+for as long as the statement scans the table, and an ACCESS EXCLUSIVE
+request that waits behind a long transaction blocks everything queued
+after it. Use these instead inside upgrade():
+
+    from app.db import online
+
+    online.create_index_concurrently("ix_driver_documents_status", "driver_documents", ["status"])
+    op.add_column("driver_documents", sa.Column("region", sa.String(20), nullable=True))
+    online.backfill("driver_documents", "region = 'CA'", "region IS NULL")
+    online.set_not_null("driver_documents", "region")
+    online.execute_with_lock_retry("ALTER TABLE drivers ADD COLUMN nickname varchar(50)")
+
+Statements that need an exclusive lock only briefly run under a short
+lock_timeout and are retried with backoff, so they give way to application
+traffic instead of queueing it. In offline mode (alembic --sql) every helper
+just emits its SQL.
+
+split_statements / classify_statement back the dry-run report
+(scripts/migration_lock_report.py).
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger("alembic.online")
+
+LOCK_NOT_AVAILABLE = "55P03"
+DEFAULT_LOCK_TIMEOUT_MS = 2000
+DEFAULT_ATTEMPTS = 10
+MAX_BACKOFF_SECONDS = 30.0
+# marks a batched backfill in --sql output; see classify_statement
+BACKFILL_MARKER = "/* online.backfill */"
+
+
+def _sqlstate(exc: DBAPIError) -> str | None:
+    orig = exc.orig
+    for candidate in (orig, getattr(orig, "__cause__", None)):
+        code = getattr(candidate, "sqlstate", None) or getattr(candidate, "pgcode", None)
+        if code:
+            return code
+    return LOCK_NOT_AVAILABLE if "lock timeout" in str(orig) else None
+
+
+def _offline() -> bool:
+    return op.get_context().as_sql
+
+
+def _autocommit(bind) -> bool:
+    return bind.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def _backoff(attempt: int, base: float) -> float:
+    return min(MAX_BACKOFF_SECONDS, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+def execute_with_lock_retry(
+    statements: str | Sequence[str],
+    *,
+    lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS,
+    attempts: int = DEFAULT_ATTEMPTS,
+    backoff_seconds: float = 1.0,
+) -> None:
+    """Run statements under lock_timeout, retrying when a lock isn't granted.
+
+    Inside the migration transaction each attempt runs in a savepoint, so a
+    timed-out attempt is rolled back alone. Locks taken by earlier statements
+    of the same transaction are still held while waiting; put busy-table DDL
+    first in its revision.
+    """
+    if isinstance(statements, str):
+        statements = [statements]
+    if _offline():
+        op.execute(f"SET lock_timeout = {int(lock_timeout_ms)}")
+        for s in statements:
+            op.execute(s)
+        op.execute("RESET lock_timeout")
+        return
+
+    bind = op.get_bind()
+    in_tx = not _autocommit(bind)
+    previous = bind.exec_driver_sql("SHOW lock_timeout").scalar()
+    for attempt in range(1, attempts + 1):
+        savepoint = bind.begin_nested() if in_tx else None
+        try:
+            bind.exec_driver_sql(f"SET {'LOCAL ' if in_tx else ''}lock_timeout = {int(lock_timeout_ms)}")
+            for s in statements:
+                bind.execute(text(s))
+            if savepoint is not None:
+                savepoint.commit()
+            break
+        except DBAPIError as e:
+            if savepoint is not None:
+                savepoint.rollback()
+            if _sqlstate(e) != LOCK_NOT_AVAILABLE or attempt == attempts:
+                raise
+            wait = _backoff(attempt, backoff_seconds)
+            logger.warning("lock not granted (attempt %d/%d), retrying in %.1fs", attempt, attempts, wait)
+            time.sleep(wait)
+        finally:
+            if not in_tx:
+                bind.exec_driver_sql(f"SET lock_timeout = '{previous}'")
+    if in_tx:
+        bind.exec_driver_sql(f"SET LOCAL lock_timeout = '{previous}'")
+
+
+def _invalid_index(bind, name: str) -> bool:
+    return bool(
+        bind.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.oid = to_regclass(:name) AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).scalar()
+    )
+
+
+def _index_exists(bind, name: str) -> bool:
+    return bind.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence,
+    *,
+    unique: bool = False,
+    attempts: int = 3,
+    **kw,
+) -> None:
+    """CREATE INDEX CONCURRENTLY outside the migration transaction.
+
+    Writes keep flowing while it builds. A failed concurrent build leaves an
+    INVALID index behind; it is dropped before retrying, and a valid index of
+    the same name is left alone, so re-running a half-applied revision works.
+    """
+    ctx = op.get_context()
+    with ctx.autocommit_block():
+        if _offline():
+            op.create_index(index_name, table_name, columns, unique=unique, postgresql_concurrently=True, **kw)
+            return
+        bind = op.get_bind()
+        for attempt in range(1, attempts + 1):
+            if _invalid_index(bind, index_name):
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+            elif _index_exists(bind, index_name):
+                return
+            try:
+                op.create_index(index_name, table_name, columns, unique=unique, postgresql_concurrently=True, **kw)
+                return
+            except DBAPIError:
+                if attempt == attempts:
+                    raise
+                logger.warning("concurrent build of %s failed (attempt %d/%d)", index_name, attempt, attempts, exc_info=True)
+                time.sleep(_backoff(attempt, 5.0))
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    with op.get_context().autocommit_block():
+        if _offline() or _index_exists(op.get_bind(), index_name):
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+
+
+def backfill(
+    table_name: str,
+    set_clause: str,
+    where: str,
+    *,
+    key: str = "id",
+    batch_size: int = 5000,
+    pause_seconds: float = 0.05,
+    lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS,
+) -> int:
+    """UPDATE table SET <set_clause> WHERE <where>, in committed key-ordered
+    batches with a pause between them. Returns the number of rows updated.
+
+    Each batch is its own transaction, so row locks are held briefly and
+    autovacuum/replication keep up. `where` should stop matching rows once
+    they are backfilled (e.g. "col IS NULL") so a rerun resumes cheaply.
+    """
+    if _offline():
+        op.execute(f"UPDATE {table_name} SET {set_clause} WHERE {where} {BACKFILL_MARKER}")
+        return 0
+
+    stmt = text(
+        f"""
+        WITH batch AS (
+            SELECT {key} AS batch_key FROM {table_name}
+            WHERE {key} > :after AND ({where})
+            ORDER BY {key}
+            LIMIT :limit
+        )
+        UPDATE {table_name} SET {set_clause}
+        FROM batch WHERE {table_name}.{key} = batch.batch_key
+        RETURNING {table_name}.{key}
+        """
+    )
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # the session's own value (env.py sets MIGRATION_LOCK_TIMEOUT_MS), not the server default
+        previous = bind.exec_driver_sql("SHOW lock_timeout").scalar()
+        after = bind.execute(text(f"SELECT min({key}) FROM {table_name} WHERE {where}")).scalar()
+        if after is None:
+            return 0
+        after -= 1
+        while True:
+            for attempt in range(1, DEFAULT_ATTEMPTS + 1):
+                try:
+                    bind.exec_driver_sql(f"SET lock_timeout = {int(lock_timeout_ms)}")
+                    keys = bind.execute(stmt, {"after": after, "limit": batch_size}).scalars().all()
+                    break
+                except DBAPIError as e:
+                    if _sqlstate(e) != LOCK_NOT_AVAILABLE or attempt == DEFAULT_ATTEMPTS:
+                        raise
+                    time.sleep(_backoff(attempt, 0.5))
+                finally:
+                    bind.exec_driver_sql(f"SET lock_timeout = '{previous}'")
+            if not keys:
+                break
+            total += len(keys)
+            after = max(keys)
+            logger.info("backfill %s: %d rows (up to %s=%s)", table_name, total, key, after)
+            time.sleep(pause_seconds)
+    return total
+
+
+def set_not_null(table_name: str, column: str, **retry) -> None:
+    """SET NOT NULL without holding ACCESS EXCLUSIVE during a full scan.
+
+    A NOT VALID check is added (brief lock), validated under SHARE UPDATE
+    EXCLUSIVE (writes continue), after which SET NOT NULL skips its scan
+    (PostgreSQL 12+) and the check is dropped again.
+    """
+    name = f"ck_{table_name}_{column}_not_null"[:63]
+    with op.get_context().autocommit_block():
+        execute_with_lock_retry(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT {name} CHECK ({column} IS NOT NULL) NOT VALID", **retry
+        )
+        op.execute(f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {name}")
+        execute_with_lock_retry(f"ALTER TABLE {table_name} ALTER COLUMN {column} SET NOT NULL", **retry)
+        execute_with_lock_retry(f"ALTER TABLE {table_name} DROP CONSTRAINT {name}", **retry)
+
+
+# ---- dry run (scripts/migration_lock_report.py) ----
+
+@dataclass
+class LockImpact:
+    table: str | None
+    lock: str | None
+    # what the lock blocks while held: "-", "writes", "reads+writes"
+    blocks: str
+    # how long it is held: "none", "brief", "scan", "rewrite", "batched"
+    duration: str
+    statement: str
+
+
+_NO_LOCK = re.compile(
+    r"^(BEGIN|COMMIT|SET|RESET|SELECT|CREATE (OR REPLACE )?(FUNCTION|SEQUENCE|TYPE|SCHEMA|EXTENSION)"
+    r"|DROP (FUNCTION|SEQUENCE|TYPE|SCHEMA|EXTENSION)|COMMENT|INSERT INTO ALEMBIC_VERSION|UPDATE ALEMBIC_VERSION)"
+)
+# PostgreSQL 11+ adds a column with a constant or stable default without a
+# rewrite; volatile defaults, serials/identities and stored generated columns still rewrite
+_REWRITING_COLUMN = re.compile(
+    r"DEFAULT\s+(CLOCK_TIMESTAMP|RANDOM|GEN_RANDOM_UUID|UUID_GENERATE|NEXTVAL|TIMEOFDAY)"
+    r"|\b(SMALL|BIG)?SERIAL\b|AS IDENTITY|GENERATED ALWAYS AS \("
+)
+_NAME = r'"?(?:\w+"?\.)?"?(\w+)"?'
+
+
+def _table(sql: str, pattern: str) -> str | None:
+    m = re.search(pattern + _NAME, sql)
+    return m.group(1).lower() if m else None
+
+
+def split_statements(script: str) -> list[tuple[str | None, str]]:
+    """alembic --sql output -> [(revision, statement)]. Respects quotes and
+    dollar-quoted bodies; "-- Running upgrade a -> b" comments set the revision."""
+    out: list[tuple[str | None, str]] = []
+    revision = None
+    buf: list[str] = []
+    i, n = 0, len(script)
+    quote: str | None = None
+    while i < n:
+        ch = script[i]
+        if quote:
+            if script.startswith(quote, i):
+                buf.append(quote)
+                i += len(quote)
+                quote = None
+                continue
+            buf.append(ch)
+            i += 1
+            continue
+        if ch == "'":
+            quote = "'"
+        elif ch == "$":
+            m = re.match(r"\$\w*\$", script[i:])
+            if m:
+                quote = m.group(0)
+                buf.append(quote)
+                i += len(quote)
+                continue
+        elif script.startswith("--", i):
+            end = script.find("\n", i)
+            end = n if end < 0 else end
+            m = re.match(r"-- Running upgrade \S* ?-> (\w+)", script[i:end])
+            if m:
+                revision = m.group(1)
+            i = end
+            continue
+        elif ch == ";":
+            stmt = "".join(buf).strip()
+            if stmt:
+                out.append((revision, stmt))
+            buf = []
+            i += 1
+            continue
+        buf.append(ch)
+        i += 1
+    stmt = "".join(buf).strip()
+    if stmt:
+        out.append((revision, stmt))
+    return out
+
+
+def classify_statement(statement: str) -> LockImpact:
+    sql = " ".join(statement.split())
+    up = sql.upper()
+
+    def impact(table, lock, blocks, duration):
+        return LockImpact(table, lock, blocks, duration, sql)
+
+    if _NO_LOCK.match(up):
+        return impact(None, None, "-", "none")
+    if re.match(r"^CREATE (UNIQUE )?INDEX CONCURRENTLY", up):
+        return impact(_table(up, r" ON (?:ONLY )?"), "SHARE UPDATE EXCLUSIVE", "-", "scan")
+    if re.match(r"^CREATE (UNIQUE )?INDEX", up):
+        return impact(_table(up, r" ON (?:ONLY )?"), "SHARE", "writes", "scan")
+    if up.startswith("DROP INDEX CONCURRENTLY"):
+        return impact(None, "SHARE UPDATE EXCLUSIVE", "-", "brief")
+    if up.startswith("DROP INDEX"):
+        return impact(None, "ACCESS EXCLUSIVE", "reads+writes", "brief")
+    if up.startswith("CREATE TABLE"):
+        # new table; a foreign key briefly locks the referenced one
+        return impact(_table(up, r" REFERENCES "), "SHARE ROW EXCLUSIVE" if " REFERENCES " in up else None,
+                      "writes" if " REFERENCES " in up else "-", "brief" if " REFERENCES " in up else "none")
+    if up.startswith("DROP TABLE"):
+        return impact(_table(up, r"^DROP TABLE (?:IF EXISTS )?"), "ACCESS EXCLUSIVE", "reads+writes", "brief")
+    if up.startswith("CREATE TRIGGER"):
+        return impact(_table(up, r" ON "), "SHARE ROW EXCLUSIVE", "writes", "brief")
+    if up.startswith("DROP TRIGGER"):
+        return impact(_table(up, r" ON "), "ACCESS EXCLUSIVE", "reads+writes", "brief")
+    if up.startswith(("UPDATE", "DELETE")):
+        table = _table(up, r"^(?:UPDATE|DELETE FROM) (?:ONLY )?")
+        if BACKFILL_MARKER.upper() in up:
+            return impact(table, "ROW EXCLUSIVE", "-", "batched")
+        return impact(table, "ROW EXCLUSIVE", "writes", "scan")  # every matched row stays locked until commit
+    if up.startswith("INSERT"):
+        return impact(_table(up, r"^INSERT INTO "), "ROW EXCLUSIVE", "-", "scan" if " SELECT " in up else "brief")
+    if up.startswith("ALTER TABLE"):
+        table = _table(up, r"^ALTER TABLE (?:IF EXISTS )?(?:ONLY )?")
+        if "VALIDATE CONSTRAINT" in up:
+            return impact(table, "SHARE UPDATE EXCLUSIVE", "-", "scan")
+        if re.search(r"(SET DATA TYPE| TYPE )", up) and "ALTER COLUMN" in up:
+            return impact(table, "ACCESS EXCLUSIVE", "reads+writes", "rewrite")
+        if "ADD COLUMN" in up and _REWRITING_COLUMN.search(up):
+            return impact(table, "ACCESS EXCLUSIVE", "reads+writes", "rewrite")
+        if "SET NOT NULL" in up:
+            return impact(table, "ACCESS EXCLUSIVE", "reads+writes", "scan")
+        if "ADD CONSTRAINT" in up or "ADD PRIMARY KEY" in up or re.search(r"ADD (UNIQUE|CHECK|FOREIGN KEY|EXCLUDE)", up):
+            not_valid = "NOT VALID" in up
+            if "FOREIGN KEY" in up or "REFERENCES" in up:
+                return impact(table, "SHARE ROW EXCLUSIVE", "writes", "brief" if not_valid else "scan")
+            if re.search(r"(UNIQUE|PRIMARY KEY|EXCLUDE)", up) and "USING INDEX" not in up:
+                return impact(table, "ACCESS EXCLUSIVE", "reads+writes", "scan")  # builds an index
+            return impact(table, "ACCESS EXCLUSIVE", "reads+writes", "brief" if not_valid else "scan")
+        return impact(table, "ACCESS EXCLUSIVE", "reads+writes", "brief")
+    return impact(None, "?", "?", "?")
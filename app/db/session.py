@@ -2,10 +2,12 @@
 
 Old imports used: from app.db.session import get_db
 Canonical location: from app.core.database import get_db
+Read-only handlers: from app.core.replica import get_read_db
 
 We keep this file to avoid service crashes when older modules still import it.
 """
 
 from app.core.database import get_db  # re-export
+from app.core.replica import get_read_db  # re-export
 
-__all__ = ["get_db"]
+__all__ = ["get_db", "get_read_db"]
@@ -0,0 +1,162 @@
+"""Move long-inactive driver documents/files into the archived_* tables.
+
+Each batch is its own short transaction:
+
+- targets are picked through the partial "inactive" indexes with
+  FOR UPDATE SKIP LOCKED, so rows a request is touching are skipped;
+- DELETE ... RETURNING feeds INSERT INTO archived_* in one statement;
+- lock_timeout bounds any wait; a timed-out batch is retried after a pause;
+- the job sleeps between batches, so it can run during business hours.
+
+Reads with include_inactive=true union the archive back in, so archiving is
+invisible to API clients.
+
+Usage:
+    python -m app.jobs.archive_documents [--older-than-days 180] [--max-seconds 600] [--tenant acme]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.tenancy import tenant_schema, use_tenant
+from app.models.archived_driver_document import ArchivedDriverDocument, ArchivedDriverDocumentFile
+from app.models.driver_document import DriverDocument
+from app.models.driver_document_file import DriverDocumentFile
+
+logger = logging.getLogger("archive_documents")
+
+
+def _shared_columns(live, archive) -> str:
+    names = set(archive.__table__.columns.keys())
+    return ", ".join(c.name for c in live.__table__.columns if c.name in names)
+
+
+FILE_COLS = _shared_columns(DriverDocumentFile, ArchivedDriverDocumentFile)
+DOC_COLS = _shared_columns(DriverDocument, ArchivedDriverDocument)
+
+# Inactive files whose document is still live
+ARCHIVE_FILES = text(
+    f"""
+    WITH batch AS (
+        SELECT id FROM driver_document_files
+        WHERE NOT is_active AND COALESCE(deactivated_at, uploaded_at) < :cutoff
+        ORDER BY id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ), moved AS (
+        DELETE FROM driver_document_files f USING batch b
+        WHERE f.id = b.id
+        RETURNING {", ".join("f." + c for c in FILE_COLS.split(", "))}
+    ), ins AS (
+        INSERT INTO archived_driver_document_files ({FILE_COLS})
+        SELECT {FILE_COLS} FROM moved
+        RETURNING 1
+    )
+    SELECT 0 AS documents, (SELECT count(*) FROM ins) AS files
+    """
+)
+
+# Inactive documents, together with all of their files
+ARCHIVE_DOCUMENTS = text(
+    f"""
+    WITH batch AS (
+        SELECT id FROM driver_documents
+        WHERE NOT is_active AND COALESCE(deactivated_at, updated_at) < :cutoff
+        ORDER BY id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ), moved_files AS (
+        DELETE FROM driver_document_files f USING batch b
+        WHERE f.driver_document_id = b.id
+        RETURNING {", ".join("f." + c for c in FILE_COLS.split(", "))}
+    ), ins_files AS (
+        INSERT INTO archived_driver_document_files ({FILE_COLS})
+        SELECT {FILE_COLS} FROM moved_files
+        RETURNING 1
+    ), moved_docs AS (
+        DELETE FROM driver_documents d USING batch b
+        WHERE d.id = b.id
+        RETURNING {", ".join("d." + c for c in DOC_COLS.split(", "))}
+    ), ins_docs AS (
+        INSERT INTO archived_driver_documents ({DOC_COLS})
+        SELECT {DOC_COLS} FROM moved_docs
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM ins_docs) AS documents, (SELECT count(*) FROM ins_files) AS files
+    """
+)
+
+
+async def _run_batch(stmt, cutoff: datetime, limit: int, lock_timeout_ms: int) -> tuple[int, int]:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text(f"SET LOCAL lock_timeout = '{int(lock_timeout_ms)}ms'"))
+        row = (await db.execute(stmt, {"cutoff": cutoff, "limit": limit})).one()
+        await db.commit()
+        return row.documents, row.files
+
+
+async def archive(
+    older_than_days: int,
+    batch_size: int,
+    sleep_seconds: float,
+    lock_timeout_ms: int,
+    max_seconds: float | None = None,
+) -> dict[str, int]:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    totals = {"documents": 0, "files": 0, "batches": 0, "lock_timeouts": 0}
+
+    for stmt in (ARCHIVE_DOCUMENTS, ARCHIVE_FILES):
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                docs, files = await _run_batch(stmt, cutoff, batch_size, lock_timeout_ms)
+            except DBAPIError as e:
+                if "lock timeout" not in str(e.orig).lower():
+                    raise
+                totals["lock_timeouts"] += 1
+                logger.info("lock timeout, backing off")
+                await asyncio.sleep(sleep_seconds * 4)
+                continue
+
+            totals["documents"] += docs
+            totals["files"] += files
+            totals["batches"] += 1
+            if docs + files == 0 or (stmt is ARCHIVE_FILES and files < batch_size) or (
+                stmt is ARCHIVE_DOCUMENTS and docs < batch_size
+            ):
+                break
+            await asyncio.sleep(sleep_seconds)
+
+    return totals
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description="Archive long-inactive driver documents and files")
+    ap.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    ap.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    ap.add_argument("--sleep", type=float, default=settings.archive_batch_sleep_seconds)
+    ap.add_argument("--lock-timeout-ms", type=int, default=settings.archive_lock_timeout_ms)
+    ap.add_argument("--max-seconds", type=float, default=None, help="stop after this long (resume next run)")
+    ap.add_argument("--tenant", default=None, help="tenant slug (schema-per-tenant deployments)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    with use_tenant(tenant_schema(args.tenant) if args.tenant else None):
+        totals = await archive(
+            args.older_than_days, args.batch_size, args.sleep, args.lock_timeout_ms, args.max_seconds
+        )
+    logger.info("archived %s", totals)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
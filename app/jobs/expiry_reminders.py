@@ -0,0 +1,46 @@
+"""Send driver document expiry reminders (app.core.reminders).
+
+The API workers already run this daily; use the job for cron-driven
+deployments or to catch up by hand. Reruns are idempotent.
+
+Usage:
+    python -m app.jobs.expiry_reminders [--sink log|email|webhook] [--tenant acme]
+    python -m app.jobs.expiry_reminders --all-tenants
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+from app.core.reminders import SINKS, get_sink, reminder_scheduler, run_reminders
+from app.core.tenancy import tenant_schema, use_tenant
+
+logger = logging.getLogger("expiry_reminders")
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description="Send driver document expiry reminders")
+    ap.add_argument("--sink", choices=list(SINKS), default=None, help="default: settings.expiry_reminder_sink")
+    ap.add_argument("--tenant", default=None, help="tenant slug (schema-per-tenant deployments)")
+    ap.add_argument("--all-tenants", action="store_true", help="every tenant schema in turn")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    sink = get_sink(args.sink)
+    started = time.monotonic()
+    if args.all_tenants:
+        result = await reminder_scheduler.run_all(sink)
+    else:
+        with use_tenant(tenant_schema(args.tenant) if args.tenant else None):
+            result = await run_reminders(sink)
+        if result is None:
+            logger.info("another expiry reminder run holds the lock; exiting")
+            return
+    logger.info("done in %.1fs: %s", time.monotonic() - started, result)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
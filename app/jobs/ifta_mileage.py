@@ -0,0 +1,235 @@
+"""Recompute IFTA miles per truck, day and jurisdiction.
+
+Work comes from ifta_dirty (truck-days the ELD ingest marked when it stored
+new or late points), so a run only touches what changed. --since/--until
+marks every truck-day with breadcrumbs in that range first (full rebuild).
+
+Per truck, each run of consecutive dirty days is streamed in keyset chunks
+of settings.ifta_chunk_points into NumPy arrays (plus the last point before
+the run, so the first segment of the day is counted). Chunks are computed
+in a process pool (app.core.ifta), several trucks in flight at once. A
+truck's days are then replaced in one transaction, and only the dirty marks
+that were claimed are cleared: a mark refreshed meanwhile by the ingest
+(marked_at changed) stays for the next run.
+
+One run at a time (advisory lock).
+
+Usage:
+    python -m app.jobs.ifta_mileage [--workers 4] [--tenant acme]
+    python -m app.jobs.ifta_mileage --since 2026-07-01 --until 2026-09-30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import Date, DateTime, bindparam, insert, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.ifta import GridIndex, segment_mileage
+from app.core.tenancy import current_tenant_schema, tenant_schema, use_tenant
+from app.models.gps import IftaMileage
+
+logger = logging.getLogger("ifta_mileage")
+
+LOCK_KEY = "ifta_mileage"
+EPOCH = date(1970, 1, 1)
+
+MARK_RANGE = text(
+    """
+    INSERT INTO ifta_dirty (truck_id, day)
+    SELECT DISTINCT truck_id, (recorded_at AT TIME ZONE 'UTC')::date
+    FROM gps_breadcrumbs
+    WHERE recorded_at >= :since AND recorded_at < :until
+    ON CONFLICT (truck_id, day) DO UPDATE SET marked_at = now()
+    """
+)
+
+PREVIOUS_POINT = text(
+    """
+    SELECT recorded_at, lat, lon FROM gps_breadcrumbs
+    WHERE truck_id = :truck_id AND recorded_at < :start AND recorded_at >= :start - interval '1 day'
+    ORDER BY recorded_at DESC
+    LIMIT 1
+    """
+)
+
+CHUNK = text(
+    """
+    SELECT recorded_at, lat, lon FROM gps_breadcrumbs
+    WHERE truck_id = :truck_id AND recorded_at > :after AND recorded_at < :end
+    ORDER BY recorded_at
+    LIMIT :limit
+    """
+)
+
+CLEAR_DIRTY = text(
+    """
+    DELETE FROM ifta_dirty d
+    USING unnest(:days, :marks) AS c(day, marked_at)
+    WHERE d.truck_id = :truck_id AND d.day = c.day AND d.marked_at = c.marked_at
+    """
+).bindparams(
+    bindparam("days", type_=ARRAY(Date)),
+    bindparam("marks", type_=ARRAY(DateTime(timezone=True))),
+)
+
+DELETE_DAYS = text("DELETE FROM ifta_mileage WHERE truck_id = :truck_id AND day = ANY(:days)").bindparams(
+    bindparam("days", type_=ARRAY(Date)),
+)
+
+
+# ---- worker process ----
+
+_grid: GridIndex | None = None
+
+
+def _init_worker(grid: GridIndex) -> None:
+    global _grid
+    _grid = grid
+
+
+def _compute(ts: np.ndarray, lat: np.ndarray, lon: np.ndarray, max_speed_mph: float):
+    return segment_mileage(_grid, ts, lat, lon, max_speed_mph)
+
+
+# ---- parent ----
+
+def _day_runs(days: list[date]) -> list[tuple[date, date]]:
+    """Sorted days -> [(first, last)] of consecutive runs."""
+    runs: list[tuple[date, date]] = []
+    for d in days:
+        if runs and d == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
+
+
+def _utc_midnight(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+
+def _arrays(rows) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n = len(rows)
+    ts = np.fromiter((r[0].timestamp() for r in rows), dtype=np.float64, count=n)
+    lat = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+    lon = np.fromiter((r[2] for r in rows), dtype=np.float64, count=n)
+    return ts, lat, lon
+
+
+async def _truck_miles(pool, truck_id: int, days: list[date]) -> dict[tuple[date, str], float]:
+    loop = asyncio.get_running_loop()
+    wanted = set(days)
+    totals: dict[tuple[date, str], float] = defaultdict(float)
+    for first, last in _day_runs(days):
+        start, end = _utc_midnight(first), _utc_midnight(last + timedelta(days=1))
+        async with AsyncSessionLocal() as db:
+            carry = (await db.execute(PREVIOUS_POINT, {"truck_id": truck_id, "start": start})).all()
+            after = start - timedelta(microseconds=1)
+            while True:
+                rows = (
+                    await db.execute(
+                        CHUNK,
+                        {"truck_id": truck_id, "after": after, "end": end, "limit": settings.ifta_chunk_points},
+                    )
+                ).all()
+                if not rows:
+                    break
+                ts, lat, lon = _arrays(carry + rows)
+                result = await loop.run_in_executor(pool, _compute, ts, lat, lon, settings.ifta_max_speed_mph)
+                for day_number, code, miles in result:
+                    day = EPOCH + timedelta(days=day_number)
+                    if day in wanted:
+                        totals[(day, code)] += miles
+                carry, after = rows[-1:], rows[-1][0]
+                if len(rows) < settings.ifta_chunk_points:
+                    break
+    return totals
+
+
+async def _store(truck_id: int, claimed: list[tuple[date, datetime]], totals) -> None:
+    days = [d for d, _ in claimed]
+    async with AsyncSessionLocal() as db:
+        await db.execute(DELETE_DAYS, {"truck_id": truck_id, "days": days})
+        if totals:
+            await db.execute(
+                insert(IftaMileage),
+                [
+                    {"truck_id": truck_id, "day": day, "jurisdiction": code, "miles": round(miles, 3)}
+                    for (day, code), miles in totals.items()
+                ],
+            )
+        await db.execute(CLEAR_DIRTY, {"truck_id": truck_id, "days": days, "marks": [m for _, m in claimed]})
+        await db.commit()
+
+
+async def recompute(workers: int, since: date | None = None, until: date | None = None) -> dict[str, int]:
+    if not settings.ifta_boundaries_path:
+        raise SystemExit("IFTA_BOUNDARIES_PATH is not set (GeoJSON of state/province boundaries)")
+    grid = GridIndex.from_geojson(settings.ifta_boundaries_path, settings.ifta_code_property, settings.ifta_grid_degrees)
+
+    stats = {"trucks": 0, "truck_days": 0, "rows": 0}
+    lock_key = f"{LOCK_KEY}:{current_tenant_schema() or 'public'}"
+    async with engine.connect() as lock_conn:
+        if not await lock_conn.scalar(text("SELECT pg_try_advisory_lock(hashtext(:k))"), {"k": lock_key}):
+            logger.info("another ifta_mileage run holds the lock; exiting")
+            return stats
+        try:
+            async with AsyncSessionLocal() as db:
+                if since is not None:
+                    await db.execute(
+                        MARK_RANGE,
+                        {"since": _utc_midnight(since), "until": _utc_midnight((until or date.today()) + timedelta(days=1))},
+                    )
+                    await db.commit()
+                dirty = (await db.execute(text("SELECT truck_id, day, marked_at FROM ifta_dirty ORDER BY truck_id, day"))).all()
+
+            by_truck: dict[int, list[tuple[date, datetime]]] = defaultdict(list)
+            for truck_id, day, marked_at in dirty:
+                by_truck[truck_id].append((day, marked_at))
+
+            sem = asyncio.Semaphore(workers * 2)
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(grid,)) as pool:
+
+                async def one(truck_id: int, claimed: list[tuple[date, datetime]]) -> None:
+                    async with sem:
+                        totals = await _truck_miles(pool, truck_id, [d for d, _ in claimed])
+                        await _store(truck_id, claimed, totals)
+                        stats["trucks"] += 1
+                        stats["truck_days"] += len(claimed)
+                        stats["rows"] += len(totals)
+
+                await asyncio.gather(*(one(t, c) for t, c in by_truck.items()))
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext(:k))"), {"k": lock_key})
+    return stats
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description="Recompute IFTA mileage for dirty truck-days")
+    ap.add_argument("--workers", type=int, default=settings.ifta_workers)
+    ap.add_argument("--since", type=date.fromisoformat, default=None, help="mark all days from this date dirty first")
+    ap.add_argument("--until", type=date.fromisoformat, default=None, help="end of the --since range (default today)")
+    ap.add_argument("--tenant", default=None, help="tenant slug (schema-per-tenant deployments)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    started = time.monotonic()
+    with use_tenant(tenant_schema(args.tenant) if args.tenant else None):
+        stats = await recompute(args.workers, args.since, args.until)
+    logger.info("done in %.1fs: %s", time.monotonic() - started, stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
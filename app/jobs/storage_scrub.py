@@ -0,0 +1,301 @@
+"""Verify stored document files and find orphaned blobs.
+
+Two phases per pass, both resumable from a JSON checkpoint, so a pass over
+millions of files can be spread across nightly runs (--max-seconds):
+
+1. verify: stream driver_document_files and archived_driver_document_files
+   (server-side cursor, id order) and re-hash each blob in a thread pool,
+   with all reads sharing one bytes/second budget. Each row's blob is
+   reported as missing, size_mismatch or hash_mismatch. Rows with no
+   recorded sha256 are reported as unverified.
+2. orphans: list the storage directory (top level only; subdirectories such
+   as in-progress uploads are skipped), walk the names in sorted chunks and
+   look each chunk up in both file tables. Blobs younger than
+   --min-age-hours are skipped: their upload may still be committing.
+
+The checkpoint is saved after every batch. When a pass finishes, its report
+is written and the next run starts a fresh pass. With --tenant the default
+checkpoint and report names carry the tenant's schema, and a checkpoint
+records its tenant: resuming another tenant's pass is refused. --quarantine moves orphans
+into .orphans/ instead of only reporting them.
+
+Usage:
+    python -m app.jobs.storage_scrub --max-seconds 3600 --report scrub_report.json
+    python -m app.jobs.storage_scrub --phase orphans --quarantine
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import String, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.storage import hash_file, storage_path, storage_root
+from app.core.tenancy import current_tenant_schema, tenant_schema, use_tenant
+from app.models.archived_driver_document import ArchivedDriverDocumentFile
+from app.models.driver_document_file import DriverDocumentFile
+
+logger = logging.getLogger("storage_scrub")
+
+QUARANTINE_DIR = ".orphans"
+SEGMENT_ROWS = 20_000
+
+KNOWN_KEYS = text(
+    """
+    SELECT storage_key FROM driver_document_files WHERE storage_key = ANY(:keys)
+    UNION
+    SELECT storage_key FROM archived_driver_document_files WHERE storage_key = ANY(:keys)
+    """
+).bindparams(bindparam("keys", type_=ARRAY(String)))
+
+
+class ByteRateLimiter:
+    """Token bucket shared by all hashing threads."""
+
+    def __init__(self, bytes_per_second: float):
+        self.rate = bytes_per_second
+        self._allowance = bytes_per_second
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+                self._last = now
+                if self._allowance >= n or self._allowance >= self.rate:
+                    self._allowance -= n
+                    return
+                wait = (n - self._allowance) / self.rate
+            time.sleep(wait)
+
+
+def _new_pass() -> dict:
+    return {
+        "tenant": current_tenant_schema(),
+        "pass_started_at": datetime.now(timezone.utc).isoformat(),
+        "phase": "verify",
+        "last_id": {"live": 0, "archived": 0},
+        "last_orphan_name": "",
+        "counts": {"checked": 0, "bytes": 0, "ok": 0, "orphans_checked": 0},
+        "problems": [],
+        "orphans": [],
+    }
+
+
+def load_checkpoint(path: Path) -> dict:
+    if not path.exists():
+        return _new_pass()
+    with open(path) as f:
+        state = json.load(f)
+    # its last_id cursors mean nothing in another schema
+    if state.get("tenant") != current_tenant_schema():
+        raise SystemExit(
+            f"checkpoint {path} belongs to tenant schema {state.get('tenant') or '(default)'}, "
+            f"not {current_tenant_schema() or '(default)'}; pass --checkpoint"
+        )
+    return state
+
+
+def tenant_path(path: str, schema: str | None) -> str:
+    """storage_scrub_checkpoint.json -> storage_scrub_checkpoint.<schema>.json"""
+    if schema is None:
+        return path
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}.{schema}{p.suffix}"))
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)  # never leave a torn checkpoint
+
+
+def check_blob(row, limiter: ByteRateLimiter) -> tuple[str, int]:
+    """-> (status, bytes read). Runs in the thread pool."""
+    path = storage_path(row.storage_key)
+    try:
+        size, digest = hash_file(path, before_read=limiter.acquire)
+    except FileNotFoundError:
+        return "missing", 0
+    if row.file_size_bytes is not None and size != row.file_size_bytes:
+        return "size_mismatch", size
+    if not row.sha256:
+        return "unverified", size
+    if digest != row.sha256.lower():
+        return "hash_mismatch", size
+    return "ok", size
+
+
+async def verify(state: dict, checkpoint: Path, workers: int, batch_size: int, limiter, deadline: float | None) -> bool:
+    """True when both tables are done."""
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for source, model in (("live", DriverDocumentFile), ("archived", ArchivedDriverDocumentFile)):
+            while True:
+                # the cursor is reopened every segment so no transaction stays open for hours
+                q = (
+                    select(model.id, model.storage_key, model.file_size_bytes, model.sha256)
+                    .where(model.id > state["last_id"][source])
+                    .order_by(model.id)
+                    .limit(SEGMENT_ROWS)
+                    .execution_options(yield_per=batch_size)
+                )
+                seen = 0
+                async with AsyncSessionLocal() as db:
+                    result = await db.stream(q)
+                    async for batch in result.partitions(batch_size):
+                        statuses = await asyncio.gather(
+                            *(loop.run_in_executor(pool, check_blob, row, limiter) for row in batch)
+                        )
+                        for row, (status, nbytes) in zip(batch, statuses):
+                            state["counts"]["checked"] += 1
+                            state["counts"]["bytes"] += nbytes
+                            if status == "ok":
+                                state["counts"]["ok"] += 1
+                            else:
+                                state["problems"].append(
+                                    {"table": source, "id": row.id, "storage_key": row.storage_key, "status": status}
+                                )
+                        seen += len(batch)
+                        state["last_id"][source] = batch[-1].id
+                        save_checkpoint(checkpoint, state)
+                        if deadline is not None and time.monotonic() > deadline:
+                            return False
+                if seen < SEGMENT_ROWS:
+                    break
+    return True
+
+
+async def find_orphans(
+    state: dict, checkpoint: Path, chunk_size: int, min_age_hours: float, quarantine: bool, deadline: float | None
+) -> bool:
+    root = storage_root()
+    if not root.exists():
+        return True
+    young_after = time.time() - min_age_hours * 3600
+    after = state["last_orphan_name"]
+    # top-level regular files only; dot names and subdirectories are never blobs
+    names = sorted(
+        e.name for e in os.scandir(root) if e.is_file(follow_symlinks=False) and not e.name.startswith(".") and e.name > after
+    )
+    for i in range(0, len(names), chunk_size):
+        chunk = names[i:i + chunk_size]
+        async with AsyncSessionLocal() as db:
+            known = set((await db.execute(KNOWN_KEYS, {"keys": chunk})).scalars())
+        for name in chunk:
+            state["counts"]["orphans_checked"] += 1
+            if name in known:
+                continue
+            path = root / name
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if st.st_mtime > young_after:
+                continue
+            entry = {"storage_key": name, "size": st.st_size, "mtime": datetime.fromtimestamp(st.st_mtime, timezone.utc).isoformat()}
+            if quarantine:
+                (root / QUARANTINE_DIR).mkdir(exist_ok=True)
+                os.replace(path, root / QUARANTINE_DIR / name)
+                entry["quarantined"] = True
+            state["orphans"].append(entry)
+        state["last_orphan_name"] = chunk[-1]
+        save_checkpoint(checkpoint, state)
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+    return True
+
+
+def write_report(path: Path, state: dict) -> None:
+    by_status: dict[str, int] = {}
+    for p in state["problems"]:
+        by_status[p["status"]] = by_status.get(p["status"], 0) + 1
+    report = {
+        "tenant": state.get("tenant"),
+        "pass_started_at": state["pass_started_at"],
+        "pass_finished_at": datetime.now(timezone.utc).isoformat(),
+        "counts": state["counts"],
+        "problems_by_status": by_status,
+        "orphan_count": len(state["orphans"]),
+        "orphan_bytes": sum(o["size"] for o in state["orphans"]),
+        "problems": state["problems"],
+        "orphans": state["orphans"],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+async def scrub(args) -> dict:
+    checkpoint = Path(args.checkpoint)
+    state = load_checkpoint(checkpoint)
+    deadline = time.monotonic() + args.max_seconds if args.max_seconds else None
+    limiter = ByteRateLimiter(args.max_mb_per_second * 1024 * 1024)
+
+    if state["phase"] == "verify" and args.phase in ("all", "verify"):
+        if await verify(state, checkpoint, args.workers, args.batch_size, limiter, deadline):
+            state["phase"] = "orphans"
+            save_checkpoint(checkpoint, state)
+        else:
+            return state
+    if state["phase"] == "orphans" and args.phase in ("all", "orphans"):
+        if settings.tenancy_enabled:
+            # one storage directory, many schemas: a blob unknown to this
+            # tenant may well belong to another one
+            logger.warning("orphan phase skipped: storage is shared by all tenants")
+            state["phase"] = "done"
+        elif await find_orphans(state, checkpoint, args.chunk_size, args.min_age_hours, args.quarantine, deadline):
+            state["phase"] = "done"
+
+    if state["phase"] == "done":
+        write_report(Path(args.report), state)
+        logger.info("pass complete, report written to %s", args.report)
+        save_checkpoint(checkpoint, _new_pass())
+    else:
+        save_checkpoint(checkpoint, state)
+    return state
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description="Verify stored document files and find orphaned blobs")
+    ap.add_argument("--phase", choices=["all", "verify", "orphans"], default="all")
+    ap.add_argument("--checkpoint", default=None, help="default: settings.scrub_checkpoint_path, per tenant")
+    ap.add_argument("--report", default=None, help="default: settings.scrub_report_path, per tenant")
+    ap.add_argument("--workers", type=int, default=settings.scrub_workers)
+    ap.add_argument("--batch-size", type=int, default=200)
+    ap.add_argument("--chunk-size", type=int, default=5000, help="names per orphan lookup")
+    ap.add_argument("--max-mb-per-second", type=float, default=settings.scrub_max_mb_per_second)
+    ap.add_argument("--min-age-hours", type=float, default=settings.scrub_orphan_min_age_hours)
+    ap.add_argument("--max-seconds", type=float, default=None, help="stop after this long (resume next run)")
+    ap.add_argument("--quarantine", action="store_true", help=f"move orphans into {QUARANTINE_DIR}/")
+    ap.add_argument("--tenant", default=None, help="tenant slug (schema-per-tenant deployments)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    schema = tenant_schema(args.tenant) if args.tenant else None
+    args.checkpoint = args.checkpoint or tenant_path(settings.scrub_checkpoint_path, schema)
+    args.report = args.report or tenant_path(settings.scrub_report_path, schema)
+    with use_tenant(schema):
+        state = await scrub(args)
+    logger.info("phase=%s counts=%s problems=%d orphans=%d",
+                state["phase"], state["counts"], len(state["problems"]), len(state["orphans"]))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
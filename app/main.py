@@ -1,18 +1,85 @@
+import logging
+
 from fastapi import FastAPI
 
+from app.core.audit import audit_writer
 from app.core.config import settings
+from app.core.eld_ingest import eld_buffer
+from app.core.events import event_hub
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.phone_lookup import phone_lookup
+from app.core.reminders import reminder_scheduler
+from app.core.replica import ReadYourWritesMiddleware
+from app.core.tenancy import TenantMiddleware
 from app.routers.health import router as health_router
 from app.routers.drivers import router as drivers_router
 from app.routers.driver_phones import router as driver_phones_router
 from app.routers.driver_documents import router as driver_documents_router
+from app.routers.changes import router as changes_router
+from app.routers.events import router as events_router
+from app.routers.truck_assignments import router as truck_assignments_router
+from app.routers.eld import router as eld_router
+from app.routers.ifta import router as ifta_router
+from app.routers.dispatch import router as dispatch_router
+from app.routers.uploads import router as uploads_router
+from app.routers.packets import router as packets_router
+from app.routers.audit import router as audit_router
+from app.routers.reminders import router as reminders_router
 
 app = FastAPI(title=settings.app_name, version="0.1.0")
 
+app.add_middleware(ReadYourWritesMiddleware)
+# the tenant is set before anything touches the DB
+app.add_middleware(TenantMiddleware)
+# added last = outermost: rejected requests cost nothing else
+app.add_middleware(LoadSheddingMiddleware)
+
 # API routers
 app.include_router(health_router, prefix="/api/v1")
 app.include_router(drivers_router, prefix="/api/v1")
 app.include_router(driver_phones_router, prefix="/api/v1")
 app.include_router(driver_documents_router, prefix="/api/v1")
+app.include_router(changes_router, prefix="/api/v1")
+app.include_router(events_router, prefix="/api/v1")
+app.include_router(truck_assignments_router, prefix="/api/v1")
+app.include_router(eld_router, prefix="/api/v1")
+app.include_router(ifta_router, prefix="/api/v1")
+app.include_router(dispatch_router, prefix="/api/v1")
+app.include_router(uploads_router, prefix="/api/v1")
+app.include_router(packets_router, prefix="/api/v1")
+app.include_router(audit_router, prefix="/api/v1")
+app.include_router(reminders_router, prefix="/api/v1")
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    event_hub.start()
+    eld_buffer.start()
+    audit_writer.start()
+    if settings.expiry_reminders_enabled:
+        reminder_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await reminder_scheduler.stop()
+    await event_hub.stop()
+    # finishes the flush in progress, then writes buffered breadcrumbs
+    await eld_buffer.stop()
+    # finishes the flush in progress, then writes buffered audit records
+    await audit_writer.stop()
+
+
+@app.on_event("startup")
+async def warm_caches():
+    # Per-tenant maps are built lazily on first lookup
+    if settings.tenancy_enabled:
+        return
+    try:
+        await phone_lookup.warm()
+    except Exception:
+        logging.getLogger(__name__).warning("phone lookup warm-up failed", exc_info=True)
+
 
 # Optional: keep old root so bookmarks don't break
 @app.get("/", include_in_schema=False)
@@ -3,6 +3,12 @@ from app.models.base import Base
 from app.models.driver import Driver
 from app.models.driver_phone import DriverPhone
 from app.models.truck import Truck
+from app.models.truck_assignment import TruckAssignment
+from app.models.gps import GpsBreadcrumb, TruckPosition, IftaDirty, IftaMileage
 
 from app.models.driver_document import DriverDocument
 from app.models.driver_document_file import DriverDocumentFile
+from app.models.archived_driver_document import ArchivedDriverDocument, ArchivedDriverDocumentFile
+from app.models.upload_session import UploadSession, UploadChunk
+from app.models.audit_log import AuditLog
+from app.models.document_reminder import DocumentReminder, ReminderWatermark
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import String, Date, Boolean, DateTime, BigInteger, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+# Cold storage for long-inactive documents/files (see app.jobs.archive_documents).
+# Same columns and ids as the live tables, plus archived_at; no FKs so
+# archiving never contends with writes on drivers/driver_documents.
+
+class ArchivedDriverDocument(Base):
+    __tablename__ = "archived_driver_documents"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    driver_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+    doc_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    title: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    issue_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
+    expiry_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
+    status: Mapped[str] = mapped_column(String(30), nullable=False)
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    is_current: Mapped[bool] = mapped_column(Boolean, nullable=False)
+
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    deactivated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    deactivated_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class ArchivedDriverDocumentFile(Base):
+    __tablename__ = "archived_driver_document_files"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    driver_document_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+    storage_key: Mapped[str] = mapped_column(String(1024), nullable=False, index=True)
+    original_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    file_size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    deactivated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    deactivated_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    uploaded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
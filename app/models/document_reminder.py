@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Identity, Integer, SmallInteger, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class DocumentReminder(Base):
+    """An expiry reminder that was sent (app.core.reminders). The unique key
+    makes reruns idempotent; a renewed document (new expiry_date) gets its
+    reminders again."""
+
+    __tablename__ = "document_reminders"
+    __table_args__ = (
+        UniqueConstraint("driver_document_id", "tier", "expiry_date", name="uq_document_reminders_doc_tier_expiry"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    driver_document_id: Mapped[int] = mapped_column(
+        ForeignKey("driver_documents.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # days before expiry: 60 | 30 | 7 | 0 (0 = expired)
+    tier: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    expiry_date: Mapped[date] = mapped_column(Date, nullable=False)
+    days_left: Mapped[int] = mapped_column(Integer, nullable=False)
+    sink: Mapped[str] = mapped_column(String(20), nullable=False)
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class ReminderWatermark(Base):
+    """Scan progress of the reminder scheduler. name "tier:<days>": expiry
+    dates up to through_date have been scanned for that tier. name "changes":
+    change-feed cursor for documents created or edited behind a watermark."""
+
+    __tablename__ = "reminder_watermarks"
+
+    name: Mapped[str] = mapped_column(String(20), primary_key=True)
+    through_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    cursor: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
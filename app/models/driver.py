@@ -1,9 +1,17 @@
-from sqlalchemy import String, Date, Boolean, DateTime, func
+from sqlalchemy import String, Date, Boolean, DateTime, BigInteger, Integer, CheckConstraint, FetchedValue, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 
 class Driver(Base):
     __tablename__ = "drivers"
+    __table_args__ = (
+        CheckConstraint(
+            "termination_date IS NULL OR hire_date IS NULL OR termination_date >= hire_date",
+            name="ck_drivers_termination_after_hire",
+        ),
+        CheckConstraint("termination_date IS NULL OR NOT is_active", name="ck_drivers_terminated_inactive"),
+        Index("ix_drivers_change", "change_xid", "change_seq", postgresql_include=["id"]),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -22,6 +30,18 @@ class Driver(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Optimistic concurrency (ETag / If-Match)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("1"))
+    __mapper_args__ = {"version_id_col": version}
+
+    # Change feed (/changes); maintained by the set_change_seq trigger
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+
     phones = relationship(
         "DriverPhone",
         back_populates="driver",
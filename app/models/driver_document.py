@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import String, Date, Boolean, DateTime, Text, ForeignKey, func, text
+from sqlalchemy import String, Date, Boolean, DateTime, BigInteger, FetchedValue, Index, Integer, Text, ForeignKey, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -8,6 +8,18 @@ from app.models.base import Base
 
 class DriverDocument(Base):
     __tablename__ = "driver_documents"
+    __table_args__ = (
+        # walked by the archiver (app.jobs.archive_documents)
+        Index("ix_driver_documents_inactive_id", "id", postgresql_where=text("NOT is_active")),
+        Index("ix_driver_documents_change", "change_xid", "change_seq", postgresql_include=["id"]),
+        # keyset scan of the expiry reminder scheduler (app.core.reminders)
+        Index(
+            "ix_driver_documents_expiry_open",
+            "expiry_date",
+            "id",
+            postgresql_where=text("is_active AND is_current AND expiry_date IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -47,6 +59,18 @@ class DriverDocument(Base):
         onupdate=func.now(),
     )
 
+    # Optimistic concurrency (ETag / If-Match)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("1"))
+    __mapper_args__ = {"version_id_col": version}
+
+    # Change feed (/changes); maintained by the set_change_seq trigger
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+
     files = relationship(
         "DriverDocumentFile",
         back_populates="document",
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import String, Boolean, DateTime, BigInteger, ForeignKey, func
+from sqlalchemy import String, Boolean, DateTime, BigInteger, FetchedValue, Index, Integer, ForeignKey, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -10,6 +10,11 @@ from app.models.base import Base
 
 class DriverDocumentFile(Base):
     __tablename__ = "driver_document_files"
+    __table_args__ = (
+        # walked by the archiver (app.jobs.archive_documents)
+        Index("ix_driver_document_files_inactive_id", "id", postgresql_where=text("NOT is_active")),
+        Index("ix_driver_document_files_change", "change_xid", "change_seq", postgresql_include=["id"]),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -19,7 +24,7 @@ class DriverDocumentFile(Base):
         index=True,
     )
 
-    storage_key: Mapped[str] = mapped_column(String(1024), nullable=False)
+    storage_key: Mapped[str] = mapped_column(String(1024), nullable=False, index=True)
     original_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
     content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
@@ -27,6 +32,8 @@ class DriverDocumentFile(Base):
     sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, index=True)
+    deactivated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    deactivated_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
     uploaded_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -34,4 +41,16 @@ class DriverDocumentFile(Base):
         server_default=func.now(),
     )
 
+    # Optimistic concurrency (ETag / If-Match)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("1"))
+    __mapper_args__ = {"version_id_col": version}
+
+    # Change feed (/changes); maintained by the set_change_seq trigger
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+
     document = relationship("DriverDocument", back_populates="files")
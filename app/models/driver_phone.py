@@ -1,10 +1,20 @@
-from sqlalchemy import String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import String, Boolean, BigInteger, ForeignKey, DateTime, FetchedValue, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 
 
 class DriverPhone(Base):
     __tablename__ = "driver_phones"
+    __table_args__ = (
+        # one active primary phone per driver (decision 0002)
+        Index(
+            "ux_driver_primary_phone",
+            "driver_id",
+            unique=True,
+            postgresql_where=text("is_primary AND is_active"),
+        ),
+        Index("ix_driver_phones_change", "change_xid", "change_seq", postgresql_include=["id"]),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -30,4 +40,12 @@ class DriverPhone(Base):
     deactivated_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     deactivated_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # Change feed (/changes); maintained by the set_change_seq trigger
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue(), deferred=True
+    )
+
     driver = relationship("Driver", back_populates="phones")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Float, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+# ELD breadcrumbs (app.core.eld_ingest). Range-partitioned by day on
+# recorded_at; partitions are created on demand, see ensure_partitions.
+
+class GpsBreadcrumb(Base):
+    __tablename__ = "gps_breadcrumbs"
+    __table_args__ = (
+        Index(
+            "ix_gps_breadcrumbs_recorded_at_brin",
+            "recorded_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+    truck_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    lat: Mapped[float] = mapped_column(Float, nullable=False)
+    lon: Mapped[float] = mapped_column(Float, nullable=False)
+    speed_kph: Mapped[float | None] = mapped_column(Float, nullable=True)
+    odometer_km: Mapped[float | None] = mapped_column(Float, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class TruckPosition(Base):
+    """Latest known breadcrumb per truck."""
+
+    __tablename__ = "truck_positions"
+
+    truck_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    lat: Mapped[float] = mapped_column(Float, nullable=False)
+    lon: Mapped[float] = mapped_column(Float, nullable=False)
+    speed_kph: Mapped[float | None] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IftaDirty(Base):
+    """Truck-days with new or late points whose IFTA mileage is stale."""
+
+    __tablename__ = "ifta_dirty"
+
+    truck_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    marked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IftaMileage(Base):
+    """Miles per truck, UTC day and jurisdiction (app.jobs.ifta_mileage)."""
+
+    __tablename__ = "ifta_mileage"
+
+    truck_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    jurisdiction: Mapped[str] = mapped_column(String(8), primary_key=True)
+    miles: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
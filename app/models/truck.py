@@ -12,5 +12,5 @@ class Truck(Base):
     plate_number: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
     model: Mapped[str] = mapped_column(String(100), nullable=False)
 
-    # temporary field (we will replace later with driver_id FK)
+    # legacy free text; who drives the truck lives in truck_assignments
     driver_name: Mapped[str | None] = mapped_column(String(200), nullable=True)
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, String, func
+from sqlalchemy.dialects.postgresql import TSTZRANGE, ExcludeConstraint, Range
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TruckAssignment(Base):
+    """Who drove which truck when. period is [start, end); end NULL = current."""
+
+    __tablename__ = "truck_assignments"
+    __table_args__ = (
+        CheckConstraint("NOT isempty(period) AND NOT lower_inf(period)", name="ck_truck_assignments_period"),
+        ExcludeConstraint(("truck_id", "="), ("period", "&&"), name="ex_truck_assignments_truck", using="gist"),
+        ExcludeConstraint(("driver_id", "="), ("period", "&&"), name="ex_truck_assignments_driver", using="gist"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    truck_id: Mapped[int] = mapped_column(ForeignKey("trucks.id"), nullable=False)
+    driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id"), nullable=False)
+    period: Mapped[Range[datetime]] = mapped_column(TSTZRANGE(), nullable=False)
+    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    @property
+    def starts_at(self) -> datetime:
+        return self.period.lower
+
+    @property
+    def ends_at(self) -> datetime | None:
+        return self.period.upper
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class UploadSession(Base):
+    """A resumable upload (app.routers.uploads). Bytes live in
+    storage_root()/.uploads/<id>.part until finalize turns them into a
+    DriverDocumentFile."""
+
+    __tablename__ = "upload_sessions"
+    __table_args__ = (
+        Index("ix_upload_sessions_open_expires_at", "expires_at", postgresql_where=text("status = 'open'")),
+    )
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    driver_document_id: Mapped[int] = mapped_column(
+        ForeignKey("driver_documents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    original_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    total_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    expected_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    received_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+
+    # open | finalized | aborted
+    status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="open")
+    file_id: Mapped[int | None] = mapped_column(
+        ForeignKey("driver_document_files.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class UploadChunk(Base):
+    """One received byte range of an upload. Ranges never overlap."""
+
+    __tablename__ = "upload_chunks"
+
+    upload_id: Mapped[str] = mapped_column(
+        ForeignKey("upload_sessions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    offset: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
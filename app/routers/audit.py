@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_db
+from app.models.audit_log import AuditLog
+from app.schemas.audit import AuditLogOut, AuditLogPage
+from app.schemas.changes import FeedEntity
+
+router = APIRouter(prefix="/audit-log", tags=["Audit Log"])
+
+
+@router.get("", response_model=AuditLogPage)
+async def list_audit_log(
+    entity: FeedEntity | None = Query(None)
+    ,entity_id: int | None = Query(None, description="requires entity")
+    ,since: datetime | None = Query(None, description="occurred_at >= since")
+    ,until: datetime | None = Query(None, description="occurred_at < until")
+    ,before_id: int | None = Query(None, description="next_before_id from the previous page")
+    ,limit: int = Query(100, ge=1, le=1000)
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    """Newest first. entity + entity_id is one row's history
+    (ix_audit_log_entity); since/until is a time window (ix_audit_log_occurred_at).
+
+    Entries are written asynchronously by default, so the last second or so of
+    changes may not be visible yet."""
+    if entity_id is not None and entity is None:
+        raise HTTPException(status_code=400, detail="entity_id requires entity")
+    q = select(AuditLog)
+    if entity is not None:
+        q = q.where(AuditLog.entity == entity)
+    if entity_id is not None:
+        q = q.where(AuditLog.entity_id == entity_id)
+    if since is not None:
+        q = q.where(AuditLog.occurred_at >= since)
+    if until is not None:
+        q = q.where(AuditLog.occurred_at < until)
+    if before_id is not None:
+        q = q.where(AuditLog.id < before_id)
+    rows = (await db.scalars(q.order_by(AuditLog.id.desc()).limit(limit + 1))).all()
+    page = rows[:limit]
+    return AuditLogPage(
+        entries=[AuditLogOut.model_validate(r) for r in page],
+        next_before_id=page[-1].id if len(rows) > limit else None,
+    )
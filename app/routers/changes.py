@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.changes import changed_keys, decode_cursor, encode_cursor, load_changed_rows
+from app.db.session import get_read_db
+from app.schemas.changes import ChangeOut, ChangesPage, FeedEntity
+from app.schemas.driver import DriverOut
+from app.schemas.driver_documents import DriverDocumentFileOut, DriverDocumentOut
+from app.schemas.driver_phone import DriverPhoneRead
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+_OUT = {
+    "driver": DriverOut,
+    "driver_phone": DriverPhoneRead,
+    "driver_document": DriverDocumentOut,
+    "driver_document_file": DriverDocumentFileOut,
+}
+
+
+@router.get("", response_model=ChangesPage)
+async def list_changes(
+    since: str | None = Query(None, description="next_cursor from the previous page; omit for a full sync")
+    ,limit: int = Query(500, ge=1, le=5000)
+    ,entity: list[FeedEntity] | None = Query(None)
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    after = decode_cursor(since)
+    refs, has_more = await changed_keys(db, after, limit, entity)
+    rows = await load_changed_rows(db, refs)
+    return ChangesPage(
+        changes=[
+            ChangeOut(
+                entity=ref.entity,
+                id=ref.id,
+                data=_OUT[ref.entity].model_validate(obj).model_dump(mode="json"),
+            )
+            for ref, obj in rows
+        ],
+        next_cursor=encode_cursor(refs[-1].key if refs else after),
+        has_more=has_more,
+    )
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Query
+
+from app.core.dispatch import dispatch_index
+from app.schemas.dispatch import NearestDriverOut
+
+router = APIRouter(prefix="/dispatch", tags=["dispatch"])
+
+
+@router.get("/nearest-drivers", response_model=list[NearestDriverOut])
+async def nearest_drivers(
+    lat: float = Query(..., ge=-90, le=90)
+    ,lon: float = Query(..., ge=-180, le=180)
+    ,k: int = Query(10, ge=1, le=100)
+    ,max_km: float | None = Query(None, gt=0),
+):
+    """Closest active, document-compliant drivers by their truck's last position (straight-line km)."""
+    found = await dispatch_index.nearest(lat, lon, k, max_km)
+    return [
+        NearestDriverOut(
+            driver_id=n.spot.driver_id,
+            first_name=n.spot.first_name,
+            last_name=n.spot.last_name,
+            truck_id=n.spot.truck_id,
+            lat=n.spot.lat,
+            lon=n.spot.lon,
+            position_at=n.spot.recorded_at,
+            distance_km=round(n.distance_km, 2),
+        )
+        for n in found
+    ]
@@ -1,24 +1,51 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile, Query
+from sqlalchemy import insert, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.db.session import get_db
-from app.core.storage import save_driver_doc_upload_local
+from app.core import audit, fieldsets
+from app.core.concurrency import parse_if_match, precondition_failed
+from app.core.config import settings
+from app.db.session import get_db, get_read_db
+from app.core.storage import remove_stored, save_driver_doc_upload_local, save_stream_local
+from app.models.archived_driver_document import ArchivedDriverDocument, ArchivedDriverDocumentFile
 from app.models.driver_document import DriverDocument
 from app.models.driver_document_file import DriverDocumentFile
 from app.schemas.driver_documents import (
     DriverDocumentCreate,
     DriverDocumentOut,
     DriverDocumentFileOut,
+    DriverDocumentFileUploadItem,
+    DriverDocumentFilesUploadResult,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Driver Documents"])
 
 
+def _with_archive(live, archive, where, fields: tuple[str, ...] | None = None):
+    """live UNION ALL archived rows (same columns), newest id first.
+
+    Used for include_inactive=true so archiving stays invisible to clients.
+    `fields` narrows both sides of the union to those columns.
+    """
+    names = [c for c in live.__table__.columns.keys() if c in archive.__table__.columns]
+    if fields:
+        names = [n for n in names if n in fields]
+    u = union_all(
+        select(*[getattr(live, n) for n in names]).where(where(live)),
+        select(*[getattr(archive, n) for n in names]).where(where(archive)),
+    ).subquery()
+    return select(u).order_by(u.c.id.desc())
+
+
 @router.post("/driver-documents", response_model=DriverDocumentOut)
 async def create_driver_document(payload: DriverDocumentCreate, db: AsyncSession = Depends(get_db)):
     doc = DriverDocument(**payload.model_dump())
@@ -32,12 +59,22 @@ async def create_driver_document(payload: DriverDocumentCreate, db: AsyncSession
 async def list_driver_documents(
     driver_id: int = Query(...)
     ,include_inactive: bool = Query(False)
-    ,db: AsyncSession = Depends(get_db),
+    ,fields: str | None = Query(None, description="comma-separated subset of columns, e.g. id,doc_type,expiry_date")
+    ,db: AsyncSession = Depends(get_read_db),
 ):
-    q = select(DriverDocument).where(DriverDocument.driver_id == driver_id)
-    if not include_inactive:
-        q = q.where(DriverDocument.is_active.is_(True))
+    selected = fieldsets.parse_fields(fields, DriverDocumentOut, DriverDocument)
+    if include_inactive:
+        q = _with_archive(DriverDocument, ArchivedDriverDocument, lambda m: m.driver_id == driver_id, selected)
+        res = await db.execute(q)
+        if selected:
+            return fieldsets.sparse_response(DriverDocumentOut, selected, res.mappings().all())
+        return list(res.mappings().all())
+
+    q = select(*fieldsets.columns(DriverDocument, selected)) if selected else select(DriverDocument)
+    q = q.where(DriverDocument.driver_id == driver_id, DriverDocument.is_active.is_(True))
     res = await db.execute(q.order_by(DriverDocument.id.desc()))
+    if selected:
+        return fieldsets.sparse_response(DriverDocumentOut, selected, res.mappings().all())
     return list(res.scalars().all())
 
 
@@ -45,12 +82,16 @@ async def list_driver_documents(
 async def deactivate_driver_document(
     document_id: int,
     reason: str | None = None,
+    if_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
+    versions = parse_if_match(if_match)
     res = await db.execute(select(DriverDocument).where(DriverDocument.id == document_id))
     doc = res.scalar_one_or_none()
     if not doc:
         raise HTTPException(status_code=404, detail="Driver document not found")
+    if versions is not None and doc.version not in versions:
+        raise precondition_failed("Driver document")
 
     if not doc.is_active:
         return doc
@@ -58,7 +99,12 @@ async def deactivate_driver_document(
     doc.is_active = False
     doc.deactivated_at = datetime.utcnow()
     doc.deactivated_reason = reason
-    await db.commit()
+    try:
+        # version_id_col: the UPDATE is conditional on the version we read
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise precondition_failed("Driver document")
     await db.refresh(doc)
     return doc
 
@@ -94,16 +140,101 @@ async def upload_driver_document_file(
     return doc_file
 
 
+@router.post("/driver-documents/{document_id}/files/batch", response_model=DriverDocumentFilesUploadResult)
+async def upload_driver_document_files(
+    document_id: int,
+    files: list[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Several files for one document (both sides of a CDL, ...).
+
+    Files are copied and hashed in threads, settings.upload_parallelism at a
+    time, then all stored ones are inserted with one multi-row INSERT. A file
+    that fails to store is reported in its result and the others still go
+    through; if the INSERT fails, every stored blob is removed again.
+    """
+    if len(files) > settings.upload_max_files_per_request:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.upload_max_files_per_request} files per request"
+        )
+    res = await db.execute(select(DriverDocument).where(DriverDocument.id == document_id))
+    doc = res.scalar_one_or_none()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Driver document not found")
+    if not doc.is_active:
+        raise HTTPException(status_code=400, detail="Driver document is inactive")
+
+    sem = asyncio.Semaphore(settings.upload_parallelism)
+
+    async def store(f: UploadFile):
+        async with sem:
+            # multipart parsing already spooled f; its file object is read directly
+            return await asyncio.to_thread(
+                save_stream_local, f.file, f.filename, f.content_type, settings.upload_max_bytes
+            )
+
+    outcomes = await asyncio.gather(*(store(f) for f in files), return_exceptions=True)
+
+    results = [DriverDocumentFileUploadItem(index=i, filename=f.filename, ok=False) for i, f in enumerate(files)]
+    stored = []
+    for item, outcome in zip(results, outcomes):
+        if isinstance(outcome, ValueError):
+            item.error = str(outcome)
+        elif isinstance(outcome, BaseException):
+            logger.warning("storing upload %r failed", item.filename, exc_info=outcome)
+            item.error = "Could not store file"
+        else:
+            stored.append((item, outcome))
+
+    if stored:
+        try:
+            res = await db.execute(
+                insert(DriverDocumentFile).returning(DriverDocumentFile, sort_by_parameter_order=True),
+                [
+                    {
+                        "driver_document_id": document_id,
+                        "storage_key": s.storage_key,
+                        "original_filename": s.original_filename,
+                        "content_type": s.content_type,
+                        "file_size_bytes": s.file_size_bytes,
+                        "sha256": s.sha256,
+                        "is_active": True,
+                    }
+                    for _, s in stored
+                ],
+            )
+            rows = list(res.scalars())
+            for row in rows:
+                audit.record(db, "driver_document_file", row.id, "create", after=audit.snapshot(row))
+            await db.commit()
+        except BaseException:
+            for _, s in stored:
+                await asyncio.to_thread(remove_stored, s.storage_key)
+            raise
+        for (item, _), row in zip(stored, rows):
+            item.ok = True
+            item.file = DriverDocumentFileOut.model_validate(row)
+
+    return DriverDocumentFilesUploadResult(stored=len(stored), failed=len(files) - len(stored), results=results)
+
 
 @router.get("/driver-documents/{document_id}/files", response_model=list[DriverDocumentFileOut])
 async def list_driver_document_files(
     document_id: int,
     include_inactive: bool = Query(False),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    q = select(DriverDocumentFile).where(DriverDocumentFile.driver_document_id == document_id)
-    if not include_inactive:
-        q = q.where(DriverDocumentFile.is_active.is_(True))
+    if include_inactive:
+        q = _with_archive(
+            DriverDocumentFile, ArchivedDriverDocumentFile, lambda m: m.driver_document_id == document_id
+        )
+        res = await db.execute(q)
+        return list(res.mappings().all())
+
+    q = select(DriverDocumentFile).where(
+        DriverDocumentFile.driver_document_id == document_id,
+        DriverDocumentFile.is_active.is_(True),
+    )
     res = await db.execute(q.order_by(DriverDocumentFile.id.desc()))
     return list(res.scalars().all())
 
@@ -113,8 +244,10 @@ async def deactivate_driver_document_file(
     document_id: int,
     file_id: int,
     reason: str | None = None,
+    if_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
+    versions = parse_if_match(if_match)
     res_doc = await db.execute(select(DriverDocument).where(DriverDocument.id == document_id))
     doc = res_doc.scalar_one_or_none()
     if not doc:
@@ -129,6 +262,8 @@ async def deactivate_driver_document_file(
     doc_file = res.scalar_one_or_none()
     if not doc_file:
         raise HTTPException(status_code=404, detail="Driver document file not found")
+    if versions is not None and doc_file.version not in versions:
+        raise precondition_failed("Driver document file")
 
     if not doc_file.is_active:
         return doc_file
@@ -136,6 +271,10 @@ async def deactivate_driver_document_file(
     doc_file.is_active = False
     doc_file.deactivated_at = datetime.utcnow()
     doc_file.deactivated_reason = reason
-    await db.commit()
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise precondition_failed("Driver document file")
     await db.refresh(doc_file)
     return doc_file
@@ -1,22 +1,40 @@
+from collections import defaultdict, deque
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, String, and_, case, column, exists, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from datetime import datetime, timezone
 
-from app.db.session import get_db
+from app.core import audit, fieldsets
+from app.core.phone_lookup import phone_lookup
+from app.db.session import get_db, get_read_db
+from app.models.driver import Driver
 from app.models.driver_phone import DriverPhone
-from app.schemas.driver_phone import DriverPhoneCreate, DriverPhoneRead
+from app.schemas.driver_phone import (
+    DriverPhoneBatchItemResult,
+    DriverPhoneBatchRequest,
+    DriverPhoneBatchResponse,
+    DriverPhoneCreate,
+    DriverPhoneRead,
+)
 
 router = APIRouter(prefix="/driver-phones", tags=["Driver Phones"])
 
+PRIMARY_CONFLICT = "Driver already has an active primary phone"
+
 
 @router.get("", response_model=list[DriverPhoneRead])
 async def list_driver_phones(
     driver_id: int | None = None,
     include_inactive: bool = False,
-    db: AsyncSession = Depends(get_db),
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    stmt = select(DriverPhone)
+    selected = fieldsets.parse_fields(fields, DriverPhoneRead, DriverPhone)
+    stmt = select(*fieldsets.columns(DriverPhone, selected)) if selected else select(DriverPhone)
 
     if driver_id is not None:
         stmt = stmt.where(DriverPhone.driver_id == driver_id)
@@ -26,6 +44,8 @@ async def list_driver_phones(
 
     stmt = stmt.order_by(DriverPhone.id.asc())
     res = await db.execute(stmt)
+    if selected:
+        return fieldsets.sparse_response(DriverPhoneRead, selected, res.mappings().all())
     return res.scalars().all()
 
 
@@ -36,11 +56,165 @@ async def create_driver_phone(
 ):
     phone = DriverPhone(**payload.model_dump())
     db.add(phone)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        if payload.is_primary:
+            raise HTTPException(status_code=409, detail=PRIMARY_CONFLICT)
+        raise
+    phone_lookup.invalidate()
     await db.refresh(phone)
     return phone
 
 
+@router.post("/batch", response_model=DriverPhoneBatchResponse)
+async def batch_driver_phones(
+    payload: DriverPhoneBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Apply many create/deactivate/reactivate operations in one transaction.
+
+    One statement per operation type, applied in that order: deactivate,
+    reactivate, create (so a batch can swap a driver's primary phone).
+    """
+    ops = payload.operations
+    results: list[DriverPhoneBatchItemResult | None] = [None] * len(ops)
+
+    def result(i: int, status: str, phone: DriverPhone | None = None, detail: str | None = None) -> None:
+        results[i] = DriverPhoneBatchItemResult(
+            index=i,
+            op=ops[i].op,
+            status=status,
+            phone=DriverPhoneRead.model_validate(phone) if phone is not None else None,
+            detail=detail,
+        )
+
+    creates: list[int] = []
+    deactivates: dict[int, int] = {}  # phone id -> op index
+    reactivates: dict[int, int] = {}
+    for i, op in enumerate(ops):
+        if op.op == "create":
+            creates.append(i)
+        elif op.id in deactivates or op.id in reactivates:
+            result(i, "invalid", detail="Phone appears in more than one operation")
+        elif op.op == "deactivate":
+            deactivates[op.id] = i
+        else:
+            reactivates[op.id] = i
+
+    if deactivates:
+        now = datetime.now(timezone.utc)
+        v = values(column("id", Integer), column("reason", String), name="v").data(
+            [(pid, (ops[i].reason or "Deactivated").strip()[:255]) for pid, i in deactivates.items()]
+        )
+        # Already-inactive phones keep their original deactivation metadata (idempotent)
+        stmt = (
+            update(DriverPhone)
+            .where(DriverPhone.id == v.c.id)
+            .values(
+                is_active=False,
+                deactivated_at=case((DriverPhone.is_active, now), else_=DriverPhone.deactivated_at),
+                deactivated_reason=case((DriverPhone.is_active, v.c.reason), else_=DriverPhone.deactivated_reason),
+                updated_at=case((DriverPhone.is_active, func.now()), else_=DriverPhone.updated_at),
+            )
+            .returning(DriverPhone)
+            .execution_options(synchronize_session=False)
+        )
+        for phone in (await db.scalars(stmt)).all():
+            changed = phone.deactivated_at == now
+            result(deactivates.pop(phone.id), "ok" if changed else "unchanged", phone)
+            if changed:
+                audit.record(
+                    db, "driver_phone", phone.id, "deactivate",
+                    after={"is_active": False, "deactivated_at": now, "deactivated_reason": phone.deactivated_reason},
+                )
+        for i in deactivates.values():
+            result(i, "not_found", detail="Driver phone not found")
+
+    if reactivates:
+        ids = list(reactivates)
+        other = aliased(DriverPhone)
+        # A primary can come back only if no other primary for that driver is
+        # active, and among primaries reactivated together the lowest id wins.
+        blocked = exists().where(
+            other.driver_id == DriverPhone.driver_id,
+            other.is_primary.is_(True),
+            other.id != DriverPhone.id,
+            or_(other.is_active.is_(True), and_(other.id.in_(ids), other.id < DriverPhone.id)),
+        )
+        stmt = (
+            update(DriverPhone)
+            .where(DriverPhone.id.in_(ids), or_(DriverPhone.is_primary.is_(False), ~blocked))
+            .values(is_active=True, deactivated_at=None, deactivated_reason=None)
+            .returning(DriverPhone)
+            .execution_options(synchronize_session=False)
+        )
+        for phone in (await db.scalars(stmt)).all():
+            result(reactivates.pop(phone.id), "ok", phone)
+            audit.record(
+                db, "driver_phone", phone.id, "reactivate",
+                after={"is_active": True, "deactivated_at": None, "deactivated_reason": None},
+            )
+        if reactivates:
+            # only on the failure path: tell "missing" apart from "blocked"
+            existing = set(
+                (await db.scalars(select(DriverPhone.id).where(DriverPhone.id.in_(list(reactivates))))).all()
+            )
+            for pid, i in reactivates.items():
+                if pid in existing:
+                    result(i, "conflict", detail=PRIMARY_CONFLICT)
+                else:
+                    result(i, "not_found", detail="Driver phone not found")
+
+    if creates:
+        driver_ids = {ops[i].driver_id for i in creates}
+        known = set((await db.scalars(select(Driver.id).where(Driver.id.in_(driver_ids)))).all())
+
+        rows: list[dict] = []
+        pending: dict[tuple, deque[int]] = defaultdict(deque)
+        primary_in_batch: set[int] = set()
+        for i in creates:
+            data = ops[i].model_dump(exclude={"op"})
+            if data["driver_id"] not in known:
+                result(i, "not_found", detail="Driver not found")
+                continue
+            if data["is_primary"]:
+                if data["driver_id"] in primary_in_batch:
+                    result(i, "conflict", detail="More than one primary phone for this driver in batch")
+                    continue
+                primary_in_batch.add(data["driver_id"])
+            rows.append({**data, "is_active": True})
+            pending[_create_key(data)].append(i)
+
+        if rows:
+            # Rows that would violate ux_driver_primary_phone are skipped, not raised
+            stmt = (
+                pg_insert(DriverPhone)
+                .values(rows)
+                .on_conflict_do_nothing(
+                    index_elements=[DriverPhone.driver_id],
+                    index_where=and_(DriverPhone.is_primary, DriverPhone.is_active),
+                )
+                .returning(DriverPhone)
+            )
+            for phone in (await db.scalars(stmt)).all():
+                result(pending[_create_key(phone)].popleft(), "ok", phone)
+                audit.record(db, "driver_phone", phone.id, "create", after=audit.snapshot(phone))
+            for idxs in pending.values():
+                for i in idxs:
+                    result(i, "conflict", detail=PRIMARY_CONFLICT)
+
+    await db.commit()
+    phone_lookup.invalidate()
+    return DriverPhoneBatchResponse(results=results)
+
+
+def _create_key(src) -> tuple:
+    get = src.get if isinstance(src, dict) else lambda k: getattr(src, k)
+    return tuple(get(k) for k in ("driver_id", "phone", "label", "extension", "is_primary", "is_verified", "notes"))
+
+
 @router.delete("/{phone_id}", response_model=DriverPhoneRead)
 async def deactivate_driver_phone(
     phone_id: int,
@@ -59,6 +233,7 @@ async def deactivate_driver_phone(
     phone.deactivated_reason = (reason or "Deactivated").strip()[:255]
 
     await db.commit()
+    phone_lookup.invalidate()
     await db.refresh(phone)
     return phone
 
@@ -76,6 +251,11 @@ async def reactivate_driver_phone(
     phone.deactivated_at = None
     phone.deactivated_reason = None
 
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=PRIMARY_CONFLICT)
+    phone_lookup.invalidate()
     await db.refresh(phone)
     return phone
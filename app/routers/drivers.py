@@ -1,90 +1,317 @@
-from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.exceptions import RequestValidationError
-from sqlalchemy import select, or_
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response, status
+from sqlalchemy import case, func, select, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import audit, fieldsets
+from app.core.concurrency import etag, parse_if_match, precondition_failed
+from app.core.counting import CountMode, count_headers, total_count
 from app.core.database import get_db
+from app.core.phone_lookup import phone_lookup, phone_lookup_keys
+from app.core.replica import get_read_db
 from app.models.driver import Driver
-from app.schemas.driver import DriverCreate, DriverOut, DriverUpdate
+from app.models.driver_document import DriverDocument
+from app.models.driver_document_file import DriverDocumentFile
+from app.models.driver_phone import DriverPhone
+from app.schemas.driver import (
+    DriverBulkDeactivate,
+    DriverCreate,
+    DriverDeactivate,
+    DriverDeactivationResult,
+    DriverOut,
+    DriverPhoneMatch,
+    DriverUpdate,
+)
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
 
 @router.post("", response_model=DriverOut, status_code=status.HTTP_201_CREATED)
-async def create_driver(payload: DriverCreate, db: AsyncSession = Depends(get_db)):
+async def create_driver(payload: DriverCreate, response: Response, db: AsyncSession = Depends(get_db)):
     driver = Driver(**payload.model_dump())
     db.add(driver)
     await db.commit()
+    phone_lookup.invalidate()
     await db.refresh(driver)
+    response.headers["ETag"] = etag(driver.version)
     return driver
 
 @router.get("", response_model=list[DriverOut])
-async def list_drivers(db: AsyncSession = Depends(get_db), limit: int = 50, offset: int = 0, q: str | None = None, include_inactive: bool = False):
-    stmt = select(Driver).order_by(Driver.id.desc())
+async def list_drivers(response: Response, db: AsyncSession = Depends(get_read_db), limit: int = 50, offset: int = 0, q: str | None = None, include_inactive: bool = False, fields: str | None = None, count: CountMode | None = None):
+    selected = fieldsets.parse_fields(fields, DriverOut, Driver)
+    conds = []
 
     if not include_inactive:
-        stmt = stmt.where(Driver.is_active == True)
+        conds.append(Driver.is_active == True)
 
     if q:
         qq = f"%{q.strip()}%"
-        stmt = stmt.where(or_(
+        conds.append(or_(
             Driver.first_name.ilike(qq),
             Driver.last_name.ilike(qq),
             Driver.email.ilike(qq),
             Driver.phone.ilike(qq),
         ))
 
-    stmt = stmt.offset(offset).limit(limit)
+    stmt = select(*fieldsets.columns(Driver, selected)) if selected else select(Driver)
+    stmt = stmt.where(*conds).order_by(Driver.id.desc()).offset(offset).limit(limit)
 
     result = await db.execute(stmt)
+    headers = count_headers(*await total_count(db, Driver, conds, count)) if count else {}
+    if selected:
+        sparse = fieldsets.sparse_response(DriverOut, selected, result.mappings().all())
+        sparse.headers.update(headers)
+        return sparse
+    response.headers.update(headers)
     return list(result.scalars().all())
 
+@router.get("/by-phone/{number}", response_model=list[DriverPhoneMatch])
+async def get_drivers_by_phone(number: str, country_code: str | None = None, db: AsyncSession = Depends(get_read_db)):
+    # Inbound-call identification: drivers.phone + active driver_phones, suffix match
+    try:
+        keys = phone_lookup_keys(number, country_code)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await phone_lookup.lookup(db, keys)
+
 @router.get("/{driver_id}", response_model=DriverOut)
-async def get_driver(driver_id: int, db: AsyncSession = Depends(get_db)):
+async def get_driver(driver_id: int, response: Response, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Driver).where(Driver.id == driver_id))
     driver = result.scalar_one_or_none()
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
+    response.headers["ETag"] = etag(driver.version)
     return driver
 
-@router.patch("/{driver_id}", response_model=DriverOut)
-async def update_driver(driver_id: int, payload: DriverUpdate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Driver).where(Driver.id == driver_id))
-    driver = result.scalar_one_or_none()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
+# DB CHECK constraints on drivers -> message shown to the client
+_CHECK_MESSAGES = {
+    "ck_drivers_termination_after_hire": "termination_date cannot be before hire_date",
+    "ck_drivers_terminated_inactive": "Driver with termination_date cannot be active",
+}
+
 
+def _integrity_detail(exc: IntegrityError) -> str:
+    msg = str(exc.orig)
+    for name, detail in _CHECK_MESSAGES.items():
+        if name in msg:
+            return detail
+    return "Driver update violates a database constraint"
+
+
+@router.patch("/{driver_id}", response_model=DriverOut)
+async def update_driver(
+    driver_id: int,
+    payload: DriverUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    versions = parse_if_match(if_match)
     data = payload.model_dump(exclude_unset=True)
 
-    # ✅ Cross-field validation with existing DB values (important for PATCH)
-    merged = {
-        "first_name": data.get("first_name", driver.first_name),
-        "last_name": data.get("last_name", driver.last_name),
-        "email": data.get("email", driver.email),
-        "phone": data.get("phone", driver.phone),
-        "hire_date": data.get("hire_date", driver.hire_date),
-        "is_active": data.get("is_active", driver.is_active),
-        "termination_date": data.get("termination_date", driver.termination_date),
-    }
+    if not data:
+        driver = await db.get(Driver, driver_id)
+        if not driver:
+            raise HTTPException(status_code=404, detail="Driver not found")
+        if versions is not None and driver.version not in versions:
+            raise precondition_failed("Driver")
+        response.headers["ETag"] = etag(driver.version)
+        return driver
 
-    # Re-validate using DriverCreate (has cross-field rules)
+    # One round trip: conditional UPDATE ... FROM (locked old row) RETURNING
+    # both, so the audit record holds real before/after values. Cross-field
+    # rules against the stored row are enforced by CHECK constraints.
+    conds = [Driver.id == driver_id]
+    if versions is not None:
+        conds.append(Driver.version.in_(versions))
+    old = (
+        select(Driver.id, Driver.version, *(getattr(Driver, k) for k in data))
+        .where(*conds)
+        .with_for_update()
+        .subquery("old")
+    )
+    stmt = (
+        update(Driver)
+        .where(Driver.id == old.c.id)
+        .values(**data, version=Driver.version + 1)
+        .returning(Driver, *(old.c[k].label(f"old_{k}") for k in ("version", *data)))
+        .execution_options(synchronize_session=False)
+    )
     try:
-        DriverCreate(**merged)
-    except (ValueError, RequestValidationError) as e:
-        # Return a proper 422 instead of 500
-        raise HTTPException(status_code=422, detail=str(e))
+        row = (await db.execute(stmt)).one_or_none()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=_integrity_detail(e))
 
-    for k, v in data.items():
-        setattr(driver, k, v)
+    if row is None:
+        # failure path only: missing vs. stale version
+        await db.rollback()
+        if await db.scalar(select(Driver.id).where(Driver.id == driver_id)) is None:
+            raise HTTPException(status_code=404, detail="Driver not found")
+        raise precondition_failed("Driver")
 
+    driver = row[0]
+    changed = [k for k in data if row._mapping[f"old_{k}"] != getattr(driver, k)]
+    if changed:
+        before = {k: row._mapping[f"old_{k}"] for k in changed}
+        after = {k: getattr(driver, k) for k in changed}
+        audit.record(
+            db,
+            "driver",
+            driver.id,
+            audit.change_action(before, after),
+            after={**after, "version": driver.version},
+            before={**before, "version": row._mapping["old_version"]},
+        )
     await db.commit()
-    await db.refresh(driver)
+    if {"phone", "first_name", "last_name", "is_active"} & set(changed):
+        phone_lookup.invalidate()
+    response.headers["ETag"] = etag(driver.version)
     return driver
 
+async def _cascade_deactivate(
+    db: AsyncSession,
+    driver_ids: list[int],
+    reason: str | None,
+    termination_date: date | None,
+) -> DriverDeactivationResult:
+    """Deactivate drivers and every active phone/document/file they own.
+
+    One set-based UPDATE per table, sharing deactivated_at/reason. The caller
+    commits.
+    """
+    now = datetime.now(timezone.utc)
+    reason = (reason or "Driver deactivated").strip()[:255]
+
+    # Lock the targets and remember who was active, so the driver UPDATE can
+    # report real changes and the cascade still runs for drivers deactivated
+    # earlier via PATCH.
+    target = (
+        select(Driver.id, Driver.is_active.label("was_active"))
+        .where(Driver.id.in_(driver_ids))
+        .with_for_update()
+        .cte("target")
+    )
+    values = {
+        "is_active": False,
+        "version": case((Driver.is_active, Driver.version + 1), else_=Driver.version),
+    }
+    if termination_date is not None:
+        values["termination_date"] = func.coalesce(Driver.termination_date, termination_date)
+    res = await db.execute(
+        update(Driver)
+        .where(Driver.id == target.c.id)
+        .values(**values)
+        .returning(Driver.id, target.c.was_active)
+        .execution_options(synchronize_session=False)
+    )
+    rows = res.all()
+    found = [r.id for r in rows]
+    driver_after = {"is_active": False}
+    if termination_date is not None:
+        driver_after["termination_date"] = termination_date
+    for r in rows:
+        if r.was_active:
+            audit.record(db, "driver", r.id, "deactivate", after=driver_after)
+    result = DriverDeactivationResult(
+        drivers=sum(1 for r in rows if r.was_active),
+        phones=0,
+        documents=0,
+        files=0,
+        deactivated_at=now,
+        not_found=sorted(set(driver_ids) - set(found)),
+    )
+    if not found:
+        return result
+
+    res = await db.execute(
+        update(DriverPhone)
+        .where(DriverPhone.driver_id.in_(found), DriverPhone.is_active.is_(True))
+        .values(is_active=False, deactivated_at=now, deactivated_reason=reason)
+        .returning(DriverPhone.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = res.scalars().all()
+    for pid in ids:
+        audit.record(db, "driver_phone", pid, "deactivate", after={"is_active": False, "deactivated_at": now, "deactivated_reason": reason})
+    result.phones = len(ids)
+
+    # files first: UPDATE ... FROM driver_documents, regardless of doc state
+    res = await db.execute(
+        update(DriverDocumentFile)
+        .where(
+            DriverDocumentFile.driver_document_id == DriverDocument.id,
+            DriverDocument.driver_id.in_(found),
+            DriverDocumentFile.is_active.is_(True),
+        )
+        .values(
+            is_active=False,
+            deactivated_at=now,
+            deactivated_reason=reason,
+            version=DriverDocumentFile.version + 1,
+        )
+        .returning(DriverDocumentFile.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = res.scalars().all()
+    for fid in ids:
+        audit.record(db, "driver_document_file", fid, "deactivate", after={"is_active": False, "deactivated_at": now, "deactivated_reason": reason})
+    result.files = len(ids)
+
+    res = await db.execute(
+        update(DriverDocument)
+        .where(DriverDocument.driver_id.in_(found), DriverDocument.is_active.is_(True))
+        .values(
+            is_active=False,
+            deactivated_at=now,
+            deactivated_reason=reason,
+            version=DriverDocument.version + 1,
+        )
+        .returning(DriverDocument.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = res.scalars().all()
+    for did in ids:
+        audit.record(db, "driver_document", did, "deactivate", after={"is_active": False, "deactivated_at": now, "deactivated_reason": reason})
+    result.documents = len(ids)
+    return result
+
+
+@router.post("/deactivate", response_model=DriverDeactivationResult)
+async def bulk_deactivate_drivers(payload: DriverBulkDeactivate, db: AsyncSession = Depends(get_db)):
+    # Fleet offboarding: same cascade for many drivers, one transaction
+    try:
+        result = await _cascade_deactivate(db, payload.driver_ids, payload.reason, payload.termination_date)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=_integrity_detail(e))
+    phone_lookup.invalidate()
+    return result
+
+
+@router.post("/{driver_id}/deactivate", response_model=DriverDeactivationResult)
+async def deactivate_driver(
+    driver_id: int,
+    payload: DriverDeactivate | None = Body(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    payload = payload or DriverDeactivate()
+    try:
+        result = await _cascade_deactivate(db, [driver_id], payload.reason, payload.termination_date)
+        if result.not_found:
+            raise HTTPException(status_code=404, detail="Driver not found")
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=_integrity_detail(e))
+    phone_lookup.invalidate()
+    return result
+
 @router.api_route("/{driver_id}", methods=["DELETE"], include_in_schema=False)
 async def delete_driver(driver_id: int):
     raise HTTPException(
         status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-        detail="Hard delete is not supported. Use PATCH to deactivate/terminate the driver."
+        detail="Hard delete is not supported. Use POST /drivers/{id}/deactivate (or PATCH) to deactivate/terminate the driver."
     )
 
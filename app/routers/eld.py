@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.config import settings
+from app.core.eld_ingest import PayloadError, eld_buffer, gunzip, parse_breadcrumbs
+from app.core.tenancy import current_tenant_schema
+from app.schemas.eld import BreadcrumbIngestResult
+
+router = APIRouter(prefix="/eld", tags=["ELD"])
+
+MAX_ERRORS = 20
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=f"Body exceeds {limit} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail=f"Body exceeds {limit} bytes")
+    return bytes(body)
+
+
+@router.post("/breadcrumbs", response_model=BreadcrumbIngestResult, status_code=202)
+async def ingest_breadcrumbs(request: Request):
+    """NDJSON GPS points, optionally gzip/deflate (Content-Encoding or a gzip content type)."""
+    limit = settings.eld_max_body_bytes
+    body = await _read_body(request, limit)
+
+    encoding = request.headers.get("content-encoding", "").lower()
+    content_type = request.headers.get("content-type", "").lower()
+    if encoding in ("gzip", "deflate") or "gzip" in content_type:
+        try:
+            body = await asyncio.to_thread(gunzip, body, limit)
+        except PayloadError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    tenant = current_tenant_schema()
+    known = await eld_buffer.known_trucks(tenant)
+    # big batches take a while to parse; keep the event loop free
+    rows, errors = await asyncio.to_thread(parse_breadcrumbs, body, known)
+
+    if rows and not eld_buffer.offer(tenant, rows):
+        raise HTTPException(status_code=503, detail="Ingest buffer full; retry later", headers={"Retry-After": "5"})
+
+    messages = [f"line {n}: {msg}" for n, msg in sorted(errors.items())[:MAX_ERRORS]]
+    return BreadcrumbIngestResult(accepted=len(rows), rejected=len(errors), errors=messages)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.events import PING_FRAME, RESET_FRAME, Subscriber, event_hub
+from app.core.tenancy import current_tenant_schema
+from app.schemas.changes import FeedEntity
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_events(
+    driver_id: list[int] | None = Query(None)
+    ,doc_type: list[str] | None = Query(None)
+    ,entity: list[FeedEntity] | None = Query(None)
+    ,last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """text/event-stream of driver/phone/document/file changes.
+
+    Events carry ids only (entity, op, id, driver_id, doc_type); fetch the row
+    through the regular endpoints. On `reset`, reload whatever the page shows.
+    """
+    sub = Subscriber(
+        schema=current_tenant_schema() or "public",
+        driver_ids=set(driver_id) if driver_id else None,
+        doc_types=set(doc_type) if doc_type else None,
+        entities=set(entity) if entity else None,
+    )
+    backlog = event_hub.subscribe(sub, last_event_id)
+
+    async def frames():
+        try:
+            yield b"retry: 3000\n\n"
+            if backlog is None:
+                yield RESET_FRAME
+            else:
+                for frame in backlog:
+                    yield frame
+            while not sub.overflowed:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), settings.events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    frame = PING_FRAME
+                if sub.overflowed:
+                    break
+                yield frame
+        finally:
+            event_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,24 @@
 from fastapi import APIRouter
 
+from app.core.audit import audit_writer
+from app.core.eld_ingest import eld_buffer
+from app.core.events import event_hub
+from app.core.load_shedding import load_shedder
+from app.core.reminders import reminder_scheduler
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 @router.get("", summary="Health check")
 def health():
     return {"status": "ok"}
+
+
+@router.get("/metrics", summary="In-process counters (this worker)")
+def metrics():
+    return {
+        "load_shedding": load_shedder.snapshot(),
+        "events": dict(event_hub.stats),
+        "eld_ingest": dict(eld_buffer.stats),
+        "audit": dict(audit_writer.stats),
+        "expiry_reminders": dict(reminder_scheduler.stats),
+    }
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_db
+from app.models.gps import IftaDirty, IftaMileage
+from app.schemas.ifta import IftaJurisdictionMiles, IftaQuarterReport
+
+router = APIRouter(prefix="/ifta", tags=["IFTA"])
+
+
+@router.get("/mileage", response_model=IftaQuarterReport)
+async def quarter_mileage(
+    year: int = Query(..., ge=2000, le=2100)
+    ,quarter: int = Query(..., ge=1, le=4)
+    ,truck_id: int | None = Query(None)
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    start = date(year, 3 * quarter - 2, 1)
+    end = date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)
+
+    q = (
+        select(IftaMileage.truck_id, IftaMileage.jurisdiction, func.sum(IftaMileage.miles).label("miles"))
+        .where(IftaMileage.day >= start, IftaMileage.day < end)
+        .group_by(IftaMileage.truck_id, IftaMileage.jurisdiction)
+        .order_by(IftaMileage.truck_id, IftaMileage.jurisdiction)
+    )
+    pending = select(func.count()).select_from(IftaDirty).where(IftaDirty.day >= start, IftaDirty.day < end)
+    if truck_id is not None:
+        q = q.where(IftaMileage.truck_id == truck_id)
+        pending = pending.where(IftaDirty.truck_id == truck_id)
+
+    rows = (await db.execute(q)).all()
+    return IftaQuarterReport(
+        year=year,
+        quarter=quarter,
+        start=start,
+        end=end,
+        rows=[IftaJurisdictionMiles(truck_id=r.truck_id, jurisdiction=r.jurisdiction, miles=round(r.miles, 1)) for r in rows],
+        pending_truck_days=(await db.execute(pending)).scalar_one(),
+    )
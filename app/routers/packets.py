@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.packets import PacketEntry, safe_part, stream_zip
+from app.db.session import get_read_db
+from app.models.driver import Driver
+from app.models.driver_document import DriverDocument
+from app.models.driver_document_file import DriverDocumentFile
+
+router = APIRouter(prefix="/drivers", tags=["Document Packets"])
+
+
+def _packet_query():
+    """Active files of current, active documents, grouped per driver in the ZIP."""
+    return (
+        select(
+            Driver.id.label("driver_id"),
+            Driver.first_name,
+            Driver.last_name,
+            DriverDocument.id.label("document_id"),
+            DriverDocument.doc_type,
+            DriverDocument.title,
+            DriverDocument.issue_date,
+            DriverDocument.expiry_date,
+            DriverDocument.status,
+            DriverDocumentFile.id.label("file_id"),
+            DriverDocumentFile.storage_key,
+            DriverDocumentFile.original_filename,
+            DriverDocumentFile.content_type,
+            DriverDocumentFile.file_size_bytes,
+            DriverDocumentFile.sha256,
+            DriverDocumentFile.uploaded_at,
+        )
+        .join(DriverDocument, DriverDocument.driver_id == Driver.id)
+        .join(DriverDocumentFile, DriverDocumentFile.driver_document_id == DriverDocument.id)
+        .where(
+            DriverDocument.is_active.is_(True),
+            DriverDocument.is_current.is_(True),
+            DriverDocumentFile.is_active.is_(True),
+        )
+        .order_by(Driver.last_name, Driver.first_name, Driver.id, DriverDocument.doc_type, DriverDocument.id, DriverDocumentFile.id)
+    )
+
+
+def _entries(rows) -> list[PacketEntry]:
+    entries = []
+    for r in rows:
+        folder = f"{safe_part(r.last_name, 'driver')}_{safe_part(r.first_name, 'driver')}_{r.driver_id}"
+        name = f"{r.document_id}_{r.file_id}_{safe_part(r.original_filename or r.storage_key)}"
+        entries.append(
+            PacketEntry(
+                arcname=f"{folder}/{safe_part(r.doc_type, 'document')}/{name}",
+                storage_key=r.storage_key,
+                content_type=r.content_type,
+                uploaded_at=r.uploaded_at,
+                manifest={
+                    "driver_id": r.driver_id,
+                    "driver_name": f"{r.first_name} {r.last_name}",
+                    "document_id": r.document_id,
+                    "doc_type": r.doc_type,
+                    "title": r.title,
+                    "issue_date": r.issue_date,
+                    "expiry_date": r.expiry_date,
+                    "status": r.status,
+                    "file_id": r.file_id,
+                    "original_filename": r.original_filename,
+                    "content_type": r.content_type,
+                    "file_size_bytes": r.file_size_bytes,
+                    "sha256": r.sha256,
+                },
+            )
+        )
+    return entries
+
+
+def _zip_response(entries: list[PacketEntry], filename: str) -> StreamingResponse:
+    # metadata is fetched up front; only file bytes are streamed
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/documents/packet.zip", response_class=StreamingResponse)
+async def fleet_documents_packet(
+    doc_type: list[str] | None = Query(None, description="repeatable, e.g. doc_type=CDL&doc_type=MEDICAL")
+    ,driver_id: list[int] | None = Query(None)
+    ,include_inactive_drivers: bool = Query(False)
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    q = _packet_query()
+    if doc_type:
+        q = q.where(DriverDocument.doc_type.in_(doc_type))
+    if driver_id:
+        q = q.where(Driver.id.in_(driver_id))
+    if not include_inactive_drivers:
+        q = q.where(Driver.is_active.is_(True))
+    rows = (await db.execute(q)).all()
+    return _zip_response(_entries(rows), f"fleet-packet-{date.today().isoformat()}.zip")
+
+
+@router.get("/{driver_id}/documents/packet.zip", response_class=StreamingResponse)
+async def driver_documents_packet(driver_id: int, db: AsyncSession = Depends(get_read_db)):
+    driver = await db.get(Driver, driver_id)
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    rows = (await db.execute(_packet_query().where(Driver.id == driver_id))).all()
+    return _zip_response(_entries(rows), f"driver-{driver_id}-packet.zip")
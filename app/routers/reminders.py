@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.reminders import get_sink, run_reminders
+from app.db.session import get_read_db
+from app.models.document_reminder import DocumentReminder
+from app.schemas.reminders import DocumentReminderOut, ReminderRunResult
+
+router = APIRouter(prefix="/expiry-reminders", tags=["Expiry Reminders"])
+
+
+@router.post("/run", response_model=ReminderRunResult)
+async def run_expiry_reminders(sink: str | None = Query(None, description="log | email | webhook; default from settings")):
+    """Run now for this tenant instead of waiting for the daily run. Only
+    reminders not sent before go out."""
+    try:
+        reminder_sink = get_sink(sink)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await run_reminders(reminder_sink)
+    if result is None:
+        raise HTTPException(status_code=409, detail="A reminder run is already in progress")
+    return result
+
+
+@router.get("", response_model=list[DocumentReminderOut])
+async def list_expiry_reminders(
+    driver_document_id: int | None = Query(None)
+    ,since: datetime | None = Query(None, description="sent_at >= since")
+    ,limit: int = Query(100, ge=1, le=1000)
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    q = select(DocumentReminder)
+    if driver_document_id is not None:
+        q = q.where(DocumentReminder.driver_document_id == driver_document_id)
+    if since is not None:
+        q = q.where(DocumentReminder.sent_at >= since)
+    res = await db.scalars(q.order_by(DocumentReminder.id.desc()).limit(limit))
+    return list(res.all())
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy import DateTime, Integer, bindparam, func, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, Range
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db, get_read_db
+from app.models.truck_assignment import TruckAssignment
+from app.schemas.truck_assignment import (
+    AssignmentResolved,
+    AssignmentResolveRequest,
+    AssignmentResolveResponse,
+    TruckAssignmentCreate,
+    TruckAssignmentEnd,
+    TruckAssignmentOut,
+)
+
+router = APIRouter(tags=["Truck Assignments"])
+
+_CONSTRAINT_MESSAGES = {
+    "ex_truck_assignments_truck": "Truck already has a driver assigned during that period",
+    "ex_truck_assignments_driver": "Driver is already assigned to a truck during that period",
+    "truck_assignments_truck_id_fkey": "Truck not found",
+    "truck_assignments_driver_id_fkey": "Driver not found",
+}
+
+
+def _integrity_detail(exc: IntegrityError) -> str:
+    msg = str(exc.orig)
+    for name, detail in _CONSTRAINT_MESSAGES.items():
+        if name in msg:
+            return detail
+    return "Assignment violates a database constraint"
+
+
+def _at_or_now(at: datetime | None) -> datetime:
+    if at is None:
+        return datetime.now(timezone.utc)
+    if at.tzinfo is None:
+        raise HTTPException(status_code=422, detail="at must include a timezone offset")
+    return at
+
+
+@router.post("/truck-assignments", response_model=TruckAssignmentOut, status_code=201)
+async def create_truck_assignment(payload: TruckAssignmentCreate, db: AsyncSession = Depends(get_db)):
+    assignment = TruckAssignment(
+        truck_id=payload.truck_id,
+        driver_id=payload.driver_id,
+        period=Range(payload.starts_at, payload.ends_at, bounds="[)"),
+        note=payload.note,
+    )
+    db.add(assignment)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=_integrity_detail(e))
+    await db.refresh(assignment)
+    return assignment
+
+
+@router.post("/truck-assignments/{assignment_id}/end", response_model=TruckAssignmentOut)
+async def end_truck_assignment(
+    assignment_id: int,
+    payload: TruckAssignmentEnd | None = Body(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    ends_at = _at_or_now(payload.ends_at if payload else None)
+    stmt = (
+        update(TruckAssignment)
+        .where(
+            TruckAssignment.id == assignment_id,
+            func.upper_inf(TruckAssignment.period),
+            func.lower(TruckAssignment.period) < ends_at,
+        )
+        .values(period=func.tstzrange(func.lower(TruckAssignment.period), ends_at, "[)"))
+        .returning(TruckAssignment)
+    )
+    assignment = (await db.execute(stmt)).scalar_one_or_none()
+    if assignment is None:
+        existing = await db.get(TruckAssignment, assignment_id)
+        if existing is None:
+            raise HTTPException(status_code=404, detail="Assignment not found")
+        if existing.ends_at is not None:
+            raise HTTPException(status_code=409, detail="Assignment already ended")
+        raise HTTPException(status_code=409, detail="ends_at must be after the assignment start")
+    await db.commit()
+    return assignment
+
+
+@router.get("/trucks/{truck_id}/driver", response_model=TruckAssignmentOut)
+async def get_truck_driver(
+    truck_id: int
+    ,at: datetime | None = Query(None, description="default: now")
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    q = select(TruckAssignment).where(
+        TruckAssignment.truck_id == truck_id,
+        TruckAssignment.period.contains(_at_or_now(at)),
+    )
+    assignment = (await db.execute(q)).scalar_one_or_none()
+    if assignment is None:
+        raise HTTPException(status_code=404, detail="No driver assigned to this truck at that time")
+    return assignment
+
+
+@router.get("/drivers/{driver_id}/truck", response_model=TruckAssignmentOut)
+async def get_driver_truck(
+    driver_id: int
+    ,at: datetime | None = Query(None, description="default: now")
+    ,db: AsyncSession = Depends(get_read_db),
+):
+    q = select(TruckAssignment).where(
+        TruckAssignment.driver_id == driver_id,
+        TruckAssignment.period.contains(_at_or_now(at)),
+    )
+    assignment = (await db.execute(q)).scalar_one_or_none()
+    if assignment is None:
+        raise HTTPException(status_code=404, detail="Driver has no truck assigned at that time")
+    return assignment
+
+
+# One round trip for any number of pairs: the arrays are unnested server-side
+# and each pair probes the (truck_id, period) GiST index.
+_RESOLVE = text(
+    """
+    SELECT p.ord, a.id AS assignment_id, a.driver_id
+    FROM unnest(CAST(:truck_ids AS integer[]), CAST(:ats AS timestamptz[])) WITH ORDINALITY AS p(truck_id, at, ord)
+    LEFT JOIN truck_assignments a ON a.truck_id = p.truck_id AND a.period @> p.at
+    ORDER BY p.ord
+    """
+).bindparams(
+    bindparam("truck_ids", type_=ARRAY(Integer)),
+    bindparam("ats", type_=ARRAY(DateTime(timezone=True))),
+)
+
+
+@router.post("/truck-assignments/resolve", response_model=AssignmentResolveResponse)
+async def resolve_truck_assignments(payload: AssignmentResolveRequest, db: AsyncSession = Depends(get_read_db)):
+    pairs = payload.pairs
+    if any(p.at.tzinfo is None for p in pairs):
+        raise HTTPException(status_code=422, detail="at must include a timezone offset")
+    res = await db.execute(_RESOLVE, {"truck_ids": [p.truck_id for p in pairs], "ats": [p.at for p in pairs]})
+    return AssignmentResolveResponse(
+        results=[
+            AssignmentResolved(
+                truck_id=pairs[row.ord - 1].truck_id,
+                at=pairs[row.ord - 1].at,
+                driver_id=row.driver_id,
+                assignment_id=row.assignment_id,
+            )
+            for row in res
+        ]
+    )
@@ -0,0 +1,263 @@
+"""Resumable uploads for document files.
+
+    POST   /driver-documents/{id}/uploads   {filename, content_type, size, sha256?} -> session
+    PUT    /uploads/{upload_id}             one chunk; Content-Range: bytes a-b/size,
+                                            optional X-Chunk-SHA256; any order
+    GET    /uploads/{upload_id}             received ranges; Upload-Offset header
+    POST   /uploads/{upload_id}/finalize    -> DriverDocumentFile (idempotent)
+    DELETE /uploads/{upload_id}             abort
+
+A chunk that exactly repeats a stored one (same range and checksum) is
+accepted as a no-op, so clients can blindly retry a PUT whose response was
+lost. Any other overlap is a 409.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import new_storage_key, storage_path, upload_part_path
+from app.core.uploads import create_part, merge_ranges, parse_content_range, remove_part, upload_hashers, write_chunk
+from app.db.session import get_db
+from app.models.driver_document import DriverDocument
+from app.models.driver_document_file import DriverDocumentFile
+from app.models.upload_session import UploadChunk, UploadSession
+from app.schemas.driver_documents import DriverDocumentFileOut
+from app.schemas.uploads import UploadSessionCreate, UploadSessionOut
+
+router = APIRouter(tags=["Uploads"])
+
+PURGE_BATCH = 100
+
+
+def _out(session: UploadSession, ranges: list[tuple[int, int]]) -> UploadSessionOut:
+    out = UploadSessionOut.model_validate(session)
+    out.ranges = ranges
+    out.next_offset = ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+    return out
+
+
+async def _ranges(db: AsyncSession, upload_id: str) -> list[tuple[int, int]]:
+    res = await db.execute(select(UploadChunk.offset, UploadChunk.length).where(UploadChunk.upload_id == upload_id))
+    return merge_ranges([tuple(r) for r in res.all()])
+
+
+async def _active_document(db: AsyncSession, document_id: int) -> DriverDocument:
+    doc = (await db.execute(select(DriverDocument).where(DriverDocument.id == document_id))).scalar_one_or_none()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Driver document not found")
+    if not doc.is_active:
+        raise HTTPException(status_code=400, detail="Driver document is inactive")
+    return doc
+
+
+async def _session(db: AsyncSession, upload_id: str, lock: bool = False) -> UploadSession:
+    q = select(UploadSession).where(UploadSession.id == upload_id)
+    if lock:
+        # serializes chunk writes and finalize across workers
+        q = q.with_for_update()
+    session = (await db.execute(q)).scalar_one_or_none()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+def _require_open(session: UploadSession) -> None:
+    if session.status == "aborted":
+        raise HTTPException(status_code=410, detail="Upload was aborted")
+    if session.status == "finalized":
+        raise HTTPException(status_code=409, detail="Upload is already finalized")
+    if session.expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=410, detail="Upload session expired")
+
+
+async def _purge_expired(db: AsyncSession) -> None:
+    res = await db.execute(
+        select(UploadSession.id)
+        .where(UploadSession.status == "open", UploadSession.expires_at < datetime.now(timezone.utc))
+        .limit(PURGE_BATCH)
+        .with_for_update(skip_locked=True)
+    )
+    ids = list(res.scalars())
+    if not ids:
+        return
+    await db.execute(delete(UploadSession).where(UploadSession.id.in_(ids)))
+    await db.commit()
+    for upload_id in ids:
+        upload_hashers.forget(upload_id)
+        await asyncio.to_thread(remove_part, upload_part_path(upload_id))
+
+
+async def _read_chunk(request: Request, length: int) -> bytes:
+    body = bytearray()
+    async for part in request.stream():
+        body += part
+        if len(body) > length:
+            raise HTTPException(status_code=400, detail="Body is longer than its Content-Range")
+    if len(body) != length:
+        raise HTTPException(status_code=400, detail="Body is shorter than its Content-Range")
+    return bytes(body)
+
+
+@router.post("/driver-documents/{document_id}/uploads", response_model=UploadSessionOut, status_code=201)
+async def create_upload(document_id: int, payload: UploadSessionCreate, db: AsyncSession = Depends(get_db)):
+    if payload.size > settings.upload_max_bytes:
+        raise HTTPException(status_code=413, detail=f"Files are limited to {settings.upload_max_bytes} bytes")
+    await _active_document(db, document_id)
+    await _purge_expired(db)
+
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        driver_document_id=document_id,
+        original_filename=os.path.basename(payload.filename) if payload.filename else None,
+        content_type=payload.content_type,
+        total_size=payload.size,
+        expected_sha256=payload.sha256.lower() if payload.sha256 else None,
+        received_bytes=0,
+        status="open",
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.upload_session_ttl_hours),
+    )
+    await asyncio.to_thread(create_part, upload_part_path(session.id), payload.size)
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    return _out(session, [])
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionOut)
+async def put_upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    content_range: str | None = Header(default=None),
+    x_chunk_sha256: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        start, end, total = parse_content_range(content_range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if end - start > settings.upload_max_chunk_bytes:
+        raise HTTPException(status_code=413, detail=f"Chunks are limited to {settings.upload_max_chunk_bytes} bytes")
+
+    data = await _read_chunk(request, end - start)
+    digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+    if x_chunk_sha256 and x_chunk_sha256.strip().lower() != digest:
+        raise HTTPException(status_code=422, detail="Chunk checksum mismatch")
+
+    session = await _session(db, upload_id, lock=True)
+    _require_open(session)
+    if total != session.total_size:
+        raise HTTPException(status_code=400, detail=f"Content-Range total must be {session.total_size}")
+
+    res = await db.execute(
+        select(UploadChunk).where(
+            UploadChunk.upload_id == upload_id,
+            UploadChunk.offset < end,
+            UploadChunk.offset + UploadChunk.length > start,
+        )
+    )
+    overlapping = list(res.scalars())
+    if overlapping:
+        same = overlapping[0]
+        if len(overlapping) > 1 or (same.offset, same.offset + same.length, same.sha256) != (start, end, digest):
+            raise HTTPException(status_code=409, detail="Chunk overlaps bytes already received")
+        out = _out(session, await _ranges(db, upload_id))
+        await db.rollback()
+        response.headers["Upload-Offset"] = str(out.next_offset)
+        return out
+
+    # bytes first: a chunk row is only committed for data that is on disk
+    path = upload_part_path(upload_id)
+    await asyncio.to_thread(write_chunk, path, start, data)
+    db.add(UploadChunk(upload_id=upload_id, offset=start, length=end - start, sha256=digest))
+    session.received_bytes += end - start
+    session.expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.upload_session_ttl_hours)
+    await db.flush()
+    ranges = await _ranges(db, upload_id)
+    await db.commit()
+
+    await upload_hashers.chunk_stored(upload_id, path, start, data, ranges)
+    out = _out(session, ranges)
+    response.headers["Upload-Offset"] = str(out.next_offset)
+    return out
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionOut)
+async def get_upload(upload_id: str, response: Response, db: AsyncSession = Depends(get_db)):
+    # primary, not the replica: clients resume from this right after a failed PUT
+    session = await _session(db, upload_id)
+    out = _out(session, await _ranges(db, upload_id))
+    response.headers["Upload-Offset"] = str(out.next_offset)
+    return out
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=DriverDocumentFileOut)
+async def finalize_upload(upload_id: str, db: AsyncSession = Depends(get_db)):
+    session = await _session(db, upload_id, lock=True)
+    if session.status == "finalized":
+        doc_file = await db.get(DriverDocumentFile, session.file_id) if session.file_id else None
+        if not doc_file:
+            raise HTTPException(status_code=410, detail="Finalized file no longer exists")
+        return doc_file
+    _require_open(session)
+    if session.received_bytes != session.total_size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {session.received_bytes} of {session.total_size} bytes received",
+        )
+    await _active_document(db, session.driver_document_id)
+
+    part = upload_part_path(upload_id)
+    sha256 = await upload_hashers.digest(upload_id, part, session.total_size)
+    if session.expected_sha256 and sha256 != session.expected_sha256:
+        raise HTTPException(status_code=422, detail="File checksum mismatch")
+
+    key = new_storage_key(session.original_filename)
+    dest = storage_path(key)
+    await asyncio.to_thread(os.replace, part, dest)
+    try:
+        doc_file = DriverDocumentFile(
+            driver_document_id=session.driver_document_id,
+            storage_key=key,
+            original_filename=session.original_filename,
+            content_type=session.content_type,
+            file_size_bytes=session.total_size,
+            sha256=sha256,
+            is_active=True,
+        )
+        db.add(doc_file)
+        await db.flush()
+        session.file_id = doc_file.id
+        session.status = "finalized"
+        await db.commit()
+    except BaseException:
+        # keep the bytes where a retried finalize will look for them
+        await asyncio.to_thread(os.replace, dest, part)
+        raise
+
+    upload_hashers.forget(upload_id)
+    await db.refresh(doc_file)
+    return doc_file
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def abort_upload(upload_id: str, db: AsyncSession = Depends(get_db)):
+    session = await _session(db, upload_id, lock=True)
+    if session.status == "finalized":
+        raise HTTPException(status_code=409, detail="Upload is already finalized")
+    if session.status == "open":
+        session.status = "aborted"
+        await db.commit()
+    upload_hashers.forget(upload_id)
+    await asyncio.to_thread(remove_part, upload_part_path(upload_id))
+    return Response(status_code=204)
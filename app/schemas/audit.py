@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.schemas.changes import FeedEntity
+
+
+class AuditLogOut(BaseModel):
+    id: int
+    occurred_at: datetime
+    entity: FeedEntity
+    entity_id: int
+    action: str
+    before: dict[str, Any] | None = None
+    after: dict[str, Any] | None = None
+    actor: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class AuditLogPage(BaseModel):
+    entries: list[AuditLogOut]
+    # pass back as ?before_id= for the next (older) page; null on the last page
+    next_before_id: int | None
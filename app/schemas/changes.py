@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+FeedEntity = Literal["driver", "driver_phone", "driver_document", "driver_document_file"]
+
+
+class ChangeOut(BaseModel):
+    entity: FeedEntity
+    id: int
+    # full current row, same shape as the entity's regular GET/list response
+    data: dict[str, Any]
+
+
+class ChangesPage(BaseModel):
+    changes: list[ChangeOut]
+    # pass back as ?since= ; unchanged when there was nothing new
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class NearestDriverOut(BaseModel):
+    driver_id: int
+    first_name: str
+    last_name: str
+    truck_id: int
+    lat: float
+    lon: float
+    position_at: datetime
+    distance_km: float
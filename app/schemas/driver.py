@@ -7,7 +7,7 @@ def normalize_name(v: str):
     v = re.sub(r"\s+", " ", v)
     return v
 
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator, ConfigDict
@@ -32,7 +32,7 @@ class DriverBase(BaseModel):
     @field_validator("phone")
     @classmethod
     def v_phone(cls, v: Optional[str]) -> Optional[str]:
-        return normalize_phone(v)
+        return None if v is None else normalize_phone(v)
 
     @model_validator(mode="after")
     def v_dates(self):
@@ -76,11 +76,29 @@ class DriverUpdate(BaseModel):
     @field_validator("phone")
     @classmethod
     def v_phone(cls, v: Optional[str]) -> Optional[str]:
-        return normalize_phone(v)
+        return None if v is None else normalize_phone(v)
+
+    @model_validator(mode="after")
+    def v_dates(self):
+        # Rules that only need the payload. Rules that involve stored values
+        # (e.g. new termination_date vs existing hire_date) are CHECK
+        # constraints on drivers, so PATCH needs no extra read.
+        if self.hire_date and self.termination_date and self.termination_date < self.hire_date:
+            raise ValueError("termination_date cannot be before hire_date")
+        if self.termination_date is not None and self.is_active:
+            raise ValueError("Driver with termination_date cannot be active")
+
+        today = date.today()
+        if self.hire_date and self.hire_date > today:
+            raise ValueError("hire_date cannot be in the future")
+        if self.termination_date and self.termination_date > today:
+            raise ValueError("termination_date cannot be in the future")
+        return self
 
 
 class DriverOut(DriverBase):
     id: int
+    version: int
     model_config = ConfigDict(from_attributes=True)
     # === Cross-field validation ===
     @model_validator(mode="after")
@@ -88,3 +106,43 @@ class DriverOut(DriverBase):
         if self.termination_date is not None and self.is_active:
             raise ValueError("Driver with termination_date cannot be active")
         return self
+
+
+class DriverPhoneMatch(BaseModel):
+    """GET /drivers/by-phone/{number}"""
+    driver_id: int
+    first_name: str
+    last_name: str
+    is_active: bool
+    source: str  # "driver" (drivers.phone) or "driver_phone"
+    phone_id: Optional[int] = None
+    phone: str
+    label: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DriverDeactivate(BaseModel):
+    reason: Optional[str] = Field(default=None, max_length=255)
+    # kept if the driver already has one
+    termination_date: Optional[date] = None
+
+    @field_validator("termination_date")
+    @classmethod
+    def v_termination(cls, v: Optional[date]) -> Optional[date]:
+        if v and v > date.today():
+            raise ValueError("termination_date cannot be in the future")
+        return v
+
+
+class DriverBulkDeactivate(DriverDeactivate):
+    driver_ids: list[int] = Field(..., min_length=1, max_length=5000)
+
+
+class DriverDeactivationResult(BaseModel):
+    # rows changed by this call (already-inactive rows are not counted)
+    drivers: int
+    phones: int
+    documents: int
+    files: int
+    deactivated_at: datetime
+    not_found: list[int] = []
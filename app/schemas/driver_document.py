@@ -42,5 +42,6 @@ class DriverDocumentOut(DriverDocumentBase):
     is_active: bool = True
     deactivated_at: datetime | None = None
     deactivated_reason: str | None = None
+    version: int
     class Config:
         from_attributes = True
@@ -24,6 +24,7 @@ class DriverDocumentFileOut(DriverDocumentFileBase):
     id: int
     driver_document_id: int
     uploaded_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
@@ -32,6 +32,7 @@ class DriverDocumentOut(BaseModel):
 
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
@@ -46,7 +47,25 @@ class DriverDocumentFileOut(BaseModel):
     file_size_bytes: int | None
     sha256: str | None
     is_active: bool
+    deactivated_at: datetime | None = None
+    deactivated_reason: str | None = None
     uploaded_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
+
+
+class DriverDocumentFileUploadItem(BaseModel):
+    # position in the multipart request
+    index: int
+    filename: str | None
+    ok: bool
+    file: DriverDocumentFileOut | None = None
+    error: str | None = None
+
+
+class DriverDocumentFilesUploadResult(BaseModel):
+    stored: int
+    failed: int
+    results: list[DriverDocumentFileUploadItem]
@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import Annotated, Literal, Union
+
 from pydantic import BaseModel, Field
 
 
@@ -38,3 +40,45 @@ class DriverPhoneRead(DriverPhoneBase):
 
     class Config:
         from_attributes = True
+
+
+# ---- batch mutations (POST /driver-phones/batch) ----
+
+class DriverPhoneBatchCreate(DriverPhoneCreate):
+    op: Literal["create"]
+
+
+class DriverPhoneBatchDeactivate(BaseModel):
+    op: Literal["deactivate"]
+    id: int
+    reason: str | None = None
+
+
+class DriverPhoneBatchReactivate(BaseModel):
+    op: Literal["reactivate"]
+    id: int
+
+
+DriverPhoneBatchOp = Annotated[
+    Union[DriverPhoneBatchCreate, DriverPhoneBatchDeactivate, DriverPhoneBatchReactivate],
+    Field(discriminator="op"),
+]
+
+
+class DriverPhoneBatchRequest(BaseModel):
+    operations: list[DriverPhoneBatchOp] = Field(..., min_length=1, max_length=1000)
+
+
+class DriverPhoneBatchItemResult(BaseModel):
+    index: int
+    op: Literal["create", "deactivate", "reactivate"]
+    # ok: applied | unchanged: already in the requested state
+    # not_found: phone/driver missing | conflict: would break one-primary rule
+    # invalid: rejected before touching the DB
+    status: Literal["ok", "unchanged", "not_found", "conflict", "invalid"]
+    phone: DriverPhoneRead | None = None
+    detail: str | None = None
+
+
+class DriverPhoneBatchResponse(BaseModel):
+    results: list[DriverPhoneBatchItemResult]
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class BreadcrumbIngestResult(BaseModel):
+    # queued for writing; duplicates of stored points are dropped later
+    accepted: int
+    rejected: int
+    # first few problems, "line N: message"
+    errors: list[str]
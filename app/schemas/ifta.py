@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class IftaJurisdictionMiles(BaseModel):
+    truck_id: int
+    jurisdiction: str
+    miles: float
+
+
+class IftaQuarterReport(BaseModel):
+    year: int
+    quarter: int
+    start: date
+    end: date
+    rows: list[IftaJurisdictionMiles]
+    # truck-days in the quarter waiting for app.jobs.ifta_mileage
+    pending_truck_days: int
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+class DocumentReminderOut(BaseModel):
+    id: int
+    driver_document_id: int
+    tier: int
+    expiry_date: date
+    days_left: int
+    sink: str
+    sent_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ReminderRunResult(BaseModel):
+    date: date
+    sink: str
+    # documents read by the window scans / taken from the change feed
+    scanned: int
+    changed_documents: int
+    sent: int
+    by_tier: dict[int, int]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class TruckAssignmentCreate(BaseModel):
+    truck_id: int
+    driver_id: int
+    starts_at: datetime
+    # None = open-ended (current assignment)
+    ends_at: datetime | None = None
+    note: str | None = Field(default=None, max_length=255)
+
+    @model_validator(mode="after")
+    def v_period(self):
+        if self.starts_at.tzinfo is None or (self.ends_at and self.ends_at.tzinfo is None):
+            raise ValueError("starts_at/ends_at must include a timezone offset")
+        if self.ends_at is not None and self.ends_at <= self.starts_at:
+            raise ValueError("ends_at must be after starts_at")
+        return self
+
+
+class TruckAssignmentEnd(BaseModel):
+    # default: now
+    ends_at: datetime | None = None
+
+
+class TruckAssignmentOut(BaseModel):
+    id: int
+    truck_id: int
+    driver_id: int
+    starts_at: datetime
+    ends_at: datetime | None
+    note: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AssignmentQuery(BaseModel):
+    truck_id: int
+    at: datetime
+
+
+class AssignmentResolveRequest(BaseModel):
+    pairs: list[AssignmentQuery] = Field(..., min_length=1, max_length=10000)
+
+
+class AssignmentResolved(BaseModel):
+    truck_id: int
+    at: datetime
+    # both None when nobody was assigned at that time
+    driver_id: int | None
+    assignment_id: int | None
+
+
+class AssignmentResolveResponse(BaseModel):
+    # same order as the request pairs
+    results: list[AssignmentResolved]
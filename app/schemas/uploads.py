@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str | None = Field(default=None, max_length=255)
+    content_type: str | None = Field(default=None, max_length=100)
+    size: int = Field(..., gt=0)
+    # whole-file digest; finalize rejects the upload if it doesn't match
+    sha256: str | None = Field(default=None, pattern=r"^[0-9a-fA-F]{64}$")
+
+
+class UploadSessionOut(BaseModel):
+    id: str
+    driver_document_id: int
+    original_filename: str | None
+    content_type: str | None
+    total_size: int
+    received_bytes: int
+    status: str
+    file_id: int | None
+    created_at: datetime
+    expires_at: datetime
+    # received [start, end) ranges, merged
+    ranges: list[tuple[int, int]] = []
+    # end of the contiguous prefix from byte 0 (where a sequential client resumes)
+    next_offset: int = 0
+
+    class Config:
+        from_attributes = True
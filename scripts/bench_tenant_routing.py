@@ -0,0 +1,120 @@
+"""Benchmark: schema-per-tenant routing on a single shared pool.
+
+Creates N tenant schemas (each with a drivers table cloned from public),
+then fires point reads through AsyncSessionLocal with and without a tenant
+set, and reports:
+
+- per-request latency (p50/p95/p99) and the overhead of SET LOCAL search_path
+- pool behaviour (size, peak checked-out, overflow) across all tenants
+- SQLAlchemy compiled-cache size before/after (should not grow per tenant)
+
+Usage (from the project root, DATABASE_URL in .env):
+
+    python -m scripts.bench_tenant_routing --tenants 500 --requests 20000 --concurrency 32
+    python -m scripts.bench_tenant_routing --tenants 500 --teardown
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.tenancy import tenant_schema, use_tenant
+from app.models.driver import Driver
+
+SLUG = "bench{:04d}"
+
+
+async def setup(tenants: int, rows: int) -> None:
+    async with engine.begin() as conn:
+        for i in range(tenants):
+            schema = tenant_schema(SLUG.format(i))
+            await conn.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            await conn.exec_driver_sql(
+                f'CREATE TABLE IF NOT EXISTS "{schema}".drivers (LIKE public.drivers INCLUDING ALL)'
+            )
+            await conn.exec_driver_sql(
+                f'INSERT INTO "{schema}".drivers (id, first_name, last_name, is_active) '
+                f"SELECT g, 'First' || g, 'Tenant{i}', true FROM generate_series(1, {rows}) g "
+                "ON CONFLICT DO NOTHING"
+            )
+
+
+async def teardown(tenants: int) -> None:
+    async with engine.begin() as conn:
+        for i in range(tenants):
+            await conn.exec_driver_sql(f'DROP SCHEMA IF EXISTS "{tenant_schema(SLUG.format(i))}" CASCADE')
+
+
+def compiled_cache_size() -> int:
+    cache = getattr(engine.sync_engine, "_compiled_cache", None)
+    return len(cache) if cache is not None else -1
+
+
+async def run(label: str, tenants: int, requests: int, concurrency: int, rows: int, tenanted: bool) -> list[float]:
+    pool = engine.sync_engine.pool
+    latencies: list[float] = []
+    peak_checked_out = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(n: int) -> None:
+        nonlocal peak_checked_out
+        schema = tenant_schema(SLUG.format(n % tenants)) if tenanted else None
+        async with sem:
+            with use_tenant(schema):
+                t0 = time.perf_counter()
+                async with AsyncSessionLocal() as db:
+                    res = await db.execute(select(Driver).where(Driver.id == random.randint(1, rows)))
+                    res.scalar_one_or_none()
+                    peak_checked_out = max(peak_checked_out, pool.checkedout())
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    cache_before = compiled_cache_size()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    wall = time.perf_counter() - t0
+
+    q = statistics.quantiles(latencies, n=100)
+    print(f"\n[{label}] {requests} requests, concurrency={concurrency}, tenants={tenants if tenanted else 0}")
+    print(f"  throughput   {requests / wall:,.0f} req/s")
+    print(f"  latency ms   p50={q[49]:.3f} p95={q[94]:.3f} p99={q[98]:.3f}")
+    print(f"  pool         {pool.status()} peak_checked_out={peak_checked_out}")
+    print(f"  compiled     cache entries {cache_before} -> {compiled_cache_size()}")
+    return latencies
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tenants", type=int, default=500)
+    ap.add_argument("--rows", type=int, default=200, help="drivers per tenant schema")
+    ap.add_argument("--requests", type=int, default=20000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--skip-setup", action="store_true")
+    ap.add_argument("--teardown", action="store_true", help="drop the bench schemas and exit")
+    args = ap.parse_args()
+
+    if args.teardown:
+        await teardown(args.tenants)
+        return
+    if not args.skip_setup:
+        await setup(args.tenants, args.rows)
+
+    # warm the pool and caches so neither run pays connect/compile costs
+    await run("warmup", args.tenants, min(args.requests, 2000), args.concurrency, args.rows, True)
+
+    base = await run("single schema", args.tenants, args.requests, args.concurrency, args.rows, False)
+    tenanted = await run("tenant routed", args.tenants, args.requests, args.concurrency, args.rows, True)
+
+    overhead = statistics.median(tenanted) - statistics.median(base)
+    print(f"\nper-request overhead of tenant routing (median): {overhead:.3f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""Fake ELD vendor: drives N simulated trucks and POSTs their breadcrumbs.
+
+Each truck starts somewhere around the Great Lakes and drives at highway
+speed, changing heading now and then, pinging every --ping-seconds. Points
+are sent as NDJSON (optionally gzipped) to POST /api/v1/eld/breadcrumbs, one
+request per truck per --batch-seconds of simulated time, like vendors that
+push on an interval. A fraction of batches is retransmitted (--dup-rate) and
+a fraction of points is held back and delivered in a later batch
+(--late-rate) to exercise dedup and late-point handling.
+
+By default, simulated time runs as fast as the API accepts it (load test),
+ending at "now" so every point is inside the API's accepted window. Pass
+--realtime to pace it against the wall clock instead.
+
+The truck ids must exist in `trucks` (unknown ids are rejected per line).
+
+Usage (API running locally):
+
+    python -m scripts.fake_eld_feeder --trucks 300 --hours 24 --gzip
+    python -m scripts.fake_eld_feeder --truck-id-start 1 --trucks 50 --realtime --tenant acme
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+
+class SimTruck:
+    def __init__(self, truck_id: int, rng: random.Random):
+        self.truck_id = truck_id
+        self.rng = rng
+        self.lat = rng.uniform(41.5, 45.5)
+        self.lon = rng.uniform(-88.0, -76.0)
+        self.heading = rng.uniform(0, 2 * math.pi)
+        self.speed_kph = rng.uniform(70, 105)
+        self.odometer_km = rng.uniform(50_000, 900_000)
+        self.held: list[dict] = []
+
+    def step(self, ts: datetime, seconds: float) -> dict:
+        if self.rng.random() < 0.02:
+            self.heading += self.rng.uniform(-1.0, 1.0)
+            self.speed_kph = self.rng.choice([0.0, self.rng.uniform(70, 105)])
+        km = self.speed_kph * seconds / 3600
+        self.lat += km / 111.2 * math.cos(self.heading)
+        self.lon += km / (111.2 * math.cos(math.radians(self.lat))) * math.sin(self.heading)
+        self.odometer_km += km
+        return {
+            "truck_id": self.truck_id,
+            "ts": ts.isoformat().replace("+00:00", "Z"),
+            "lat": round(self.lat, 6),
+            "lon": round(self.lon, 6),
+            "speed_kph": round(self.speed_kph, 1),
+            "odometer_km": round(self.odometer_km, 2),
+        }
+
+
+def post(url: str, points: list[dict], use_gzip: bool, tenant: str | None) -> tuple[int, float]:
+    body = "\n".join(json.dumps(p) for p in points).encode()
+    headers = {"Content-Type": "application/x-ndjson"}
+    if use_gzip:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    if tenant:
+        headers["X-Tenant"] = tenant
+    req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError:
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:8000/api/v1/eld/breadcrumbs")
+    ap.add_argument("--tenant", default=None)
+    ap.add_argument("--trucks", type=int, default=300)
+    ap.add_argument("--truck-id-start", type=int, default=1)
+    ap.add_argument("--hours", type=float, default=1.0, help="simulated time span")
+    ap.add_argument("--ping-seconds", type=float, default=30.0)
+    ap.add_argument("--batch-seconds", type=float, default=300.0)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--gzip", action="store_true")
+    ap.add_argument("--dup-rate", type=float, default=0.02)
+    ap.add_argument("--late-rate", type=float, default=0.01)
+    ap.add_argument("--realtime", action="store_true")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    trucks = [SimTruck(args.truck_id_start + i, rng) for i in range(args.trucks)]
+    end = datetime.now(timezone.utc)
+    sim = end - timedelta(hours=args.hours)
+    pings_per_batch = max(1, int(args.batch_seconds // args.ping_seconds))
+
+    statuses: dict[int, int] = {}
+    latencies: list[float] = []
+    points_sent = 0
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        while sim < end:
+            wall_batch_start = time.perf_counter()
+            batches = []
+            for truck in trucks:
+                points = list(truck.held)
+                truck.held.clear()
+                ts = sim
+                for _ in range(pings_per_batch):
+                    ts += timedelta(seconds=args.ping_seconds)
+                    p = truck.step(ts, args.ping_seconds)
+                    (truck.held if rng.random() < args.late_rate else points).append(p)
+                batches.append(points)
+                if rng.random() < args.dup_rate:
+                    batches.append(points)  # vendor retransmit
+            sim += timedelta(seconds=pings_per_batch * args.ping_seconds)
+
+            for status, ms in pool.map(lambda b: post(args.url, b, args.gzip, args.tenant), batches):
+                statuses[status] = statuses.get(status, 0) + 1
+                latencies.append(ms)
+            points_sent += sum(len(b) for b in batches)
+
+            if args.realtime:
+                time.sleep(max(0.0, args.batch_seconds - (time.perf_counter() - wall_batch_start)))
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+    print(f"requests: {len(latencies)}  points: {points_sent}  elapsed: {elapsed:.1f}s")
+    print(f"throughput: {points_sent / elapsed:,.0f} points/s")
+    print(f"latency ms: p50={pct(0.50):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} "
+          f"mean={statistics.fmean(latencies) if latencies else 0:.1f}")
+    print("status:", ", ".join(f"{k or 'conn error'}={v}" for k, v in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Dry run: estimated lock impact of pending alembic revisions on a live database.
+
+Nothing is migrated. The script reads the database's current revision,
+renders the pending revisions as SQL (alembic upgrade --sql), classifies
+each statement's lock (app.db.online.classify_statement) and weighs it
+against the live catalog:
+
+- table size (pg_class) -> rough time a scan, index build or rewrite holds
+  its lock, at --scan-mb-per-second;
+- locks are held until their transaction commits, so a brief ACCESS
+  EXCLUSIVE followed by a long scan in the same transaction blocks for the
+  whole scan ("held" column);
+- sessions currently holding locks on the table: an exclusive request queues
+  behind them and everything after it queues too.
+
+A statement is HIGH when it blocks writes on a table for longer than
+--max-block-seconds, WAIT when it needs a conflicting lock on a table that
+has open transactions right now. Exit status is 1 with --strict if anything
+is HIGH.
+
+Revisions whose upgrade() inspects the database cannot be rendered as SQL;
+the error is reported instead.
+
+Usage (from the project root):
+    python -m scripts.migration_lock_report
+    python -m scripts.migration_lock_report --database-url postgresql+asyncpg://... --schema tenant_acme --strict
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+from dataclasses import dataclass
+
+LOCK_ORDER = [
+    None,
+    "ACCESS SHARE",
+    "ROW SHARE",
+    "ROW EXCLUSIVE",
+    "SHARE UPDATE EXCLUSIVE",
+    "SHARE",
+    "SHARE ROW EXCLUSIVE",
+    "EXCLUSIVE",
+    "ACCESS EXCLUSIVE",
+]
+# what an index build / rewrite costs relative to one heap scan
+DURATION_FACTOR = {"none": 0.0, "brief": 0.0, "batched": 0.0, "scan": 1.0, "rewrite": 2.0}
+
+CATALOG = """
+SELECT c.relname, greatest(c.reltuples, 0)::bigint AS est_rows,
+       pg_relation_size(c.oid) AS heap_bytes, pg_total_relation_size(c.oid) AS total_bytes
+FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = :schema AND c.relname = ANY(:tables) AND c.relkind IN ('r', 'p')
+"""
+
+HOLDERS = """
+SELECT c.relname, count(DISTINCT a.pid) AS sessions,
+       coalesce(max(extract(epoch FROM now() - a.xact_start)), 0) AS oldest_xact_seconds
+FROM pg_locks l
+JOIN pg_class c ON c.oid = l.relation
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_stat_activity a ON a.pid = l.pid
+WHERE n.nspname = :schema AND c.relname = ANY(:tables)
+  AND a.pid <> pg_backend_pid() AND a.xact_start IS NOT NULL
+GROUP BY c.relname
+"""
+
+
+@dataclass
+class Row:
+    revision: str | None
+    impact: object  # app.db.online.LockImpact
+    seconds: float = 0.0
+    held_seconds: float = 0.0
+    verdict: str = "low"
+
+
+def pending_sql(current: str | None) -> str:
+    from alembic import command
+    from alembic.config import Config
+
+    buf = io.StringIO()
+    command.upgrade(Config("alembic.ini", output_buffer=buf), f"{current}:head" if current else "head", sql=True)
+    return buf.getvalue()
+
+
+async def current_revision(conn, schema: str) -> str | None:
+    from sqlalchemy import text
+
+    await conn.execute(text(f'SET search_path TO "{schema}"'))
+    if not await conn.scalar(text("SELECT to_regclass('alembic_version') IS NOT NULL")):
+        return None
+    versions = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars().all()
+    if len(versions) > 1:
+        raise SystemExit(f"database has several heads ({', '.join(versions)}); report them one at a time")
+    return versions[0] if versions else None
+
+
+def analyse(statements, sizes: dict, holders: dict, mb_per_second: float, max_block: float) -> list[Row]:
+    from app.db.online import classify_statement
+
+    rows = [Row(rev, classify_statement(sql)) for rev, sql in statements]
+    bytes_per_second = mb_per_second * 1024 * 1024
+    for r in rows:
+        size = sizes.get(r.impact.table)
+        if size is not None:
+            nbytes = size.total_bytes if r.impact.duration == "rewrite" else size.heap_bytes
+            r.seconds = DURATION_FACTOR.get(r.impact.duration, 0.0) * nbytes / bytes_per_second
+
+    # a lock is held from its statement to the end of its transaction
+    segment: list[Row] = []
+    segments = [segment]
+    for r in rows:
+        head = r.impact.statement.upper()
+        if head.startswith(("COMMIT", "BEGIN")):
+            segment = []
+            segments.append(segment)
+        else:
+            segment.append(r)
+    for seg in segments:
+        for i, r in enumerate(seg):
+            if r.impact.table is None or r.impact.lock is None:
+                continue
+            r.held_seconds = sum(x.seconds for x in seg[i:])
+            blocks_writes = r.impact.blocks in ("writes", "reads+writes")
+            if blocks_writes and r.held_seconds > max_block:
+                r.verdict = "HIGH"
+            elif r.impact.lock not in LOCK_ORDER:
+                r.verdict = "?"
+            elif LOCK_ORDER.index(r.impact.lock) >= LOCK_ORDER.index("SHARE") and r.impact.table in holders:
+                r.verdict = "WAIT"
+    return rows
+
+
+def _human_bytes(n: float) -> str:
+    for unit in ("B", "kB", "MB", "GB", "TB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.0f} PB"
+
+
+def render(rows: list[Row], sizes: dict, holders: dict) -> str:
+    lines = []
+    revision = object()
+    for r in rows:
+        if r.impact.lock is None:
+            continue
+        if r.revision != revision:
+            revision = r.revision
+            lines += ["", f"== revision {revision or '(none)'}"]
+        i = r.impact
+        size = sizes.get(i.table)
+        table = f"{i.table} ({size.est_rows:,} rows, {_human_bytes(size.total_bytes)})" if size else (i.table or "-")
+        lines.append(
+            f"[{r.verdict:>4}] {i.lock:<22} blocks={i.blocks:<12} {i.duration:<8} "
+            f"est={r.seconds:7.1f}s held={r.held_seconds:7.1f}s  {table}"
+        )
+        lines.append(f"       {i.statement[:140]}")
+        h = holders.get(i.table)
+        if r.verdict == "WAIT" and h is not None:
+            lines.append(f"       {h.sessions} session(s) hold locks on it now; oldest transaction {h.oldest_xact_seconds:.0f}s")
+    if not lines:
+        return "No pending statements take locks."
+    return "\n".join(lines).lstrip("\n")
+
+
+async def run(args) -> int:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.db.online import classify_statement, split_statements
+
+    engine = create_async_engine(args.database_url)
+    try:
+        async with engine.connect() as conn:
+            current = await current_revision(conn, args.schema)
+        try:
+            script = await asyncio.to_thread(pending_sql, current)
+        except Exception as e:
+            print(f"could not render pending revisions as SQL: {e}", file=sys.stderr)
+            return 2
+        statements = split_statements(script)
+        tables = sorted({t for t in (classify_statement(sql).table for _, sql in statements) if t})
+        params = {"schema": args.schema, "tables": tables}
+        async with engine.connect() as conn:
+            sizes = {r.relname: r for r in await conn.execute(text(CATALOG), params)}
+            holders = {r.relname: r for r in await conn.execute(text(HOLDERS), params)}
+    finally:
+        await engine.dispose()
+
+    rows = analyse(statements, sizes, holders, args.scan_mb_per_second, args.max_block_seconds)
+    print(f"current revision: {current or '(empty database)'}  schema: {args.schema}")
+    print(render(rows, sizes, holders))
+    high = sum(r.verdict == "HIGH" for r in rows)
+    wait = sum(r.verdict == "WAIT" for r in rows)
+    print(f"\n{high} HIGH, {wait} WAIT")
+    return 1 if args.strict and high else 0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    ap.add_argument("--schema", default="public")
+    ap.add_argument("--scan-mb-per-second", type=float, default=200.0)
+    ap.add_argument("--max-block-seconds", type=float, default=5.0)
+    ap.add_argument("--strict", action="store_true", help="exit 1 if any statement is HIGH")
+    args = ap.parse_args()
+    if not args.database_url:
+        ap.error("--database-url (or DATABASE_URL) is required")
+    os.environ["DATABASE_URL"] = args.database_url
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
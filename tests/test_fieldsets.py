@@ -0,0 +1,41 @@
+"""A sparse (?fields=) row must show the same values as the full response."""
+
+from datetime import date
+from itertools import combinations
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("email_validator")
+
+from app.core.fieldsets import partial_schema  # noqa: E402
+from app.schemas.driver import DriverOut  # noqa: E402
+
+ROW = {
+    "id": 7,
+    "version": 3,
+    "first_name": "  Ann   Marie ",
+    "last_name": "Lee\t Jones",
+    "email": "ann@example.com",
+    "phone": "+1 (416) 555-0102",
+    "hire_date": date(2020, 5, 1),
+    "is_active": True,
+    "termination_date": None,
+}
+
+FIELDS = [f for f in DriverOut.model_fields if f != "id"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, len(FIELDS)])
+def test_sparse_matches_full(size):
+    full = DriverOut.model_validate(ROW).model_dump()
+    for chosen in combinations(FIELDS, size):
+        fields = ("id", *chosen)
+        sparse = partial_schema(DriverOut, fields).model_validate({f: ROW[f] for f in fields}).model_dump()
+        assert sparse == {f: full[f] for f in fields}
+
+
+def test_model_validators_still_run_when_their_fields_are_selected():
+    schema = partial_schema(DriverOut, ("id", "is_active", "termination_date"))
+    with pytest.raises(ValueError):
+        schema.model_validate({"id": 1, "is_active": True, "termination_date": date(2020, 1, 1)})
@@ -0,0 +1,43 @@
+"""stop() must not lose rows taken out of the buffer by a flush in progress."""
+
+import asyncio
+
+from app.core.flusher import BackgroundFlusher
+
+
+def test_stop_finishes_flush_in_progress_and_drains():
+    async def run():
+        buffer, written = [], []
+
+        async def flush():
+            rows = buffer[:]
+            buffer.clear()
+            await asyncio.sleep(0.2)  # still writing when stop() is called
+            written.extend(rows)
+            return True
+
+        flusher = BackgroundFlusher("test", flush, lambda: len(buffer), 0.01)
+        flusher.start()
+        buffer.extend(range(5))
+        await asyncio.sleep(0.05)
+        buffer.extend(range(5, 8))  # arrives mid-flush
+        await flusher.stop()
+        assert not flusher.running
+        return written
+
+    assert sorted(asyncio.run(run())) == list(range(8))
+
+
+def test_stop_drains_without_running_loop():
+    async def run():
+        buffer, written = [1, 2], []
+
+        async def flush():
+            written.extend(buffer)
+            buffer.clear()
+            return True
+
+        await BackgroundFlusher("test", flush, lambda: len(buffer), 1).stop()
+        return written
+
+    assert asyncio.run(run()) == [1, 2]
@@ -0,0 +1,125 @@
+"""The column-wise validators must agree with the scalar ones on every input:
+same normalized value, same error message, same index."""
+
+import random
+
+import pytest
+
+from app.core.validators import (
+    normalize_country_code,
+    normalize_country_codes,
+    normalize_phone_number,
+    normalize_phone_numbers,
+    parse_date_flexible,
+    parse_dates_flexible,
+)
+
+SEEDS = range(20)
+PER_SEED = 500
+
+_DIGITS = "0123456789"
+# full-width and Arabic-Indic digits, separators, letters, whitespace
+_NOISE = "+-/ ()._xX#\t １٣aZ"
+# what date.fromisoformat() may accept around a date: week dates, times, offsets
+_ISO_NOISE = "W:._T+Z-"
+
+
+def _country_code(rng: random.Random):
+    kind = rng.randrange(6)
+    if kind == 0:
+        return rng.choice([None, "", "   ", "+", "++1"])
+    n = rng.randint(1, 6)
+    body = "".join(rng.choice(_DIGITS) for _ in range(n))
+    if kind == 1:
+        body = "+" + body
+    elif kind == 2:
+        pos = rng.randint(0, len(body))
+        body = body[:pos] + rng.choice(_NOISE) + body[pos:]
+    return rng.choice(["", " "]) + body + rng.choice(["", " ", "\t"])
+
+
+def _phone(rng: random.Random):
+    kind = rng.randrange(5)
+    if kind == 0:
+        return rng.choice([None, "", "  ", "()", "+"])
+    n = rng.randint(3, 18)
+    chars = [rng.choice(_DIGITS) for _ in range(n)]
+    for _ in range(rng.randint(0, 6)):
+        chars.insert(rng.randint(0, len(chars)), rng.choice(_NOISE))
+    return "".join(chars)
+
+
+def _date(rng: random.Random):
+    y, m, d = rng.randint(1, 9999), rng.randint(0, 13), rng.randint(0, 32)
+    kind = rng.randrange(10)
+    if kind == 0:
+        return rng.choice([None, "", "  ", "2024-02-30", "13/01/2024", "2312025", "2024-W05-3", "20240230"])
+    if kind == 1:
+        return f"{y:04d}-{m:02d}-{d:02d}"
+    if kind == 2:
+        return f"{m}/{d}/{y:04d}"
+    if kind == 3:
+        return f"{m:02d}-{d:02d}-{y:04d}"
+    if kind == 4:
+        return f"{m:02d}{d:02d}{y:04d}"
+    if kind == 5:
+        return f"{y:04d}{m:02d}{d:02d}"
+    if kind == 6:
+        return f" {y:04d}-{m:02d}-{d:02d}\t"
+    if kind == 7:
+        # mixed separators and stray characters
+        return f"{m}{rng.choice('/- .')}{d}{rng.choice('/- .')}{y}"
+    if kind == 8:
+        return "".join(rng.choice(_DIGITS + _NOISE + _ISO_NOISE) for _ in range(rng.randint(1, 12)))
+    return rng.randint(0, 99999999)  # non-string input
+
+
+def _scalar(fn, values):
+    out, errors = [], {}
+    for i, v in enumerate(values):
+        try:
+            out.append(fn(v))
+        except ValueError as e:
+            out.append(None)
+            errors[i] = str(e)
+    return out, errors
+
+
+@pytest.mark.parametrize(
+    "scalar, batch, gen",
+    [
+        (normalize_country_code, normalize_country_codes, _country_code),
+        (normalize_phone_number, normalize_phone_numbers, _phone),
+        (parse_date_flexible, parse_dates_flexible, _date),
+    ],
+    ids=["country_codes", "phone_numbers", "dates"],
+)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_matches_scalar(scalar, batch, gen, seed):
+    rng = random.Random(seed)
+    values = [gen(rng) for _ in range(PER_SEED)]
+    expected_values, expected_errors = _scalar(scalar, values)
+
+    result = batch(values)
+
+    assert len(result.values) == len(values)
+    for i, v in enumerate(values):
+        assert (result.values[i], result.errors.get(i)) == (expected_values[i], expected_errors.get(i)), repr(v)
+    assert result.errors == expected_errors
+
+
+# shapes no fast path matches but date.fromisoformat() parses (3.11+)
+@pytest.mark.parametrize(
+    "value",
+    ["11420401:0", "40830501.6", "73190103_0", "1132W332.3", "2024W053", "2024-W05-3", "20240201T10", "2024-02-01 10:00"],
+)
+def test_batch_matches_scalar_on_iso_extras(value):
+    expected_values, expected_errors = _scalar(parse_date_flexible, [value])
+    result = parse_dates_flexible([value])
+    assert (result.values, result.errors) == (expected_values, expected_errors)
+
+
+def test_empty_batches():
+    assert normalize_country_codes([]).values == []
+    assert normalize_phone_numbers([]).errors == {}
+    assert parse_dates_flexible(iter(())).values == []